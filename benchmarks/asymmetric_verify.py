@@ -0,0 +1,54 @@
+"""
+Compare RS256 and ES256 verify throughput when the public key is given as
+PEM text (parsed on every decode) and as the key object prepared by
+AuthJWT.load_config.
+
+    $ python benchmarks/asymmetric_verify.py
+"""
+import os, sys, timeit, jwt
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from cryptography.hazmat.backends import default_backend
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, rsa
+from fastapi_jwt_auth import AuthJWT
+
+ROUNDS = 2000
+
+def pem_keys(private_key):
+    private_pem = private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption()
+    ).decode('utf-8')
+    public_pem = private_key.public_key().public_bytes(
+        serialization.Encoding.PEM,
+        serialization.PublicFormat.SubjectPublicKeyInfo
+    ).decode('utf-8')
+    return private_pem, public_pem
+
+KEYS = {
+    "RS256": pem_keys(rsa.generate_private_key(65537, 2048, default_backend())),
+    "ES256": pem_keys(ec.generate_private_key(ec.SECP256R1(), default_backend()))
+}
+
+if __name__ == '__main__':
+    for algorithm, (private_pem, public_pem) in KEYS.items():
+        @AuthJWT.load_config
+        def get_config():
+            return [
+                ("authjwt_algorithm", algorithm),
+                ("authjwt_private_key", private_pem),
+                ("authjwt_public_key", public_pem)
+            ]
+
+        Authorize = AuthJWT()
+        token = Authorize.create_access_token(subject='test')
+        public_key = Authorize._get_secret_key(algorithm, "decode")
+
+        for name, key in [("pem", public_pem), ("prepared", public_key)]:
+            elapsed = timeit.timeit(
+                lambda: jwt.decode(token, key, algorithms=[algorithm]),
+                number=ROUNDS
+            )
+            print("{} {:<8} {:>8.0f} verify/s".format(algorithm, name, ROUNDS / elapsed))
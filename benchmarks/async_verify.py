@@ -0,0 +1,64 @@
+"""
+Measure how long the event loop is blocked while many RS256 requests are
+authorized concurrently with jwt_required and with jwt_required_async.
+
+    $ python benchmarks/async_verify.py
+"""
+import os, sys, time, asyncio
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from cryptography.hazmat.backends import default_backend
+from cryptography.hazmat.primitives.asymmetric import rsa
+from benchmarks.asymmetric_verify import pem_keys
+from fastapi_jwt_auth import AuthJWT
+
+REQUESTS = 2000
+CONCURRENCY = 50
+TICK = 0.001
+
+async def authorize(token, use_async):
+    Authorize = AuthJWT()
+    if use_async:
+        await Authorize.jwt_required_async("websocket", token=token)
+    else:
+        Authorize.jwt_required("websocket", token=token)
+
+async def run(token, use_async):
+    lags = []
+    done = False
+
+    async def ticker():
+        while not done:
+            start = time.perf_counter()
+            await asyncio.sleep(TICK)
+            lags.append(time.perf_counter() - start - TICK)
+
+    async def worker():
+        for _ in range(REQUESTS // CONCURRENCY):
+            await authorize(token, use_async)
+            await asyncio.sleep(0)
+
+    tick = asyncio.ensure_future(ticker())
+    await asyncio.gather(*[worker() for _ in range(CONCURRENCY)])
+    done = True
+    await tick
+
+    lags.sort()
+    return lags[int(len(lags) * 0.99)], lags[-1]
+
+if __name__ == '__main__':
+    private_pem, public_pem = pem_keys(rsa.generate_private_key(65537, 2048, default_backend()))
+
+    @AuthJWT.load_config
+    def get_config():
+        return [
+            ("authjwt_algorithm", "RS256"),
+            ("authjwt_private_key", private_pem),
+            ("authjwt_public_key", public_pem)
+        ]
+
+    token = AuthJWT().create_access_token(subject='test')
+    loop = asyncio.get_event_loop()
+    for name, use_async in [("jwt_required", False), ("jwt_required_async", True)]:
+        p99, worst = loop.run_until_complete(run(token, use_async))
+        print("{:<20} loop lag p99 {:>7.2f} ms max {:>7.2f} ms".format(name, p99 * 1000, worst * 1000))
@@ -0,0 +1,41 @@
+"""
+Compare lookup throughput of concurrent async requests against AsyncRedisDenylist,
+one EXISTS per lookup, and against BatchingDenylist, one MGET per batch, using the
+in-process Redis stand-in of the tests.
+
+    $ python benchmarks/batching_denylist.py
+"""
+import os, sys, time, uuid, asyncio
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fastapi_jwt_auth.denylist import AsyncRedisDenylist, BatchingDenylist
+from tests.resp_server import RespServer
+
+LOOKUPS = 5000
+CONCURRENCY = 100
+
+async def rate(denylist, raw_tokens):
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+
+    async def lookup(raw_token):
+        async with semaphore:
+            return await denylist(raw_token)
+
+    start = time.perf_counter()
+    assert not any(await asyncio.gather(*[lookup(raw_token) for raw_token in raw_tokens]))
+    return LOOKUPS / (time.perf_counter() - start)
+
+async def main(url):
+    raw_tokens = [{'jti': str(uuid.uuid4())} for _ in range(LOOKUPS)]
+    backend = AsyncRedisDenylist(url=url, max_connections=CONCURRENCY)
+    print("unbatched {:>8.0f} lookups/s".format(await rate(backend, raw_tokens)))
+
+    denylist = BatchingDenylist(backend)
+    print("batched   {:>8.0f} lookups/s".format(await rate(denylist, raw_tokens)))
+    print("          {:>8.1f} jtis per batch".format(denylist.info().jtis / denylist.info().batches))
+    await backend.close()
+
+if __name__ == '__main__':
+    server = RespServer().start()
+    asyncio.run(main(server.url))
+    server.stop()
@@ -0,0 +1,35 @@
+"""
+Compare HS256 sign and verify throughput of AuthJWT through PyJWT and with
+authjwt_hmac_fast_path enabled.
+
+    $ python benchmarks/hmac_fast_path.py
+"""
+import os, sys, timeit
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fastapi_jwt_auth import AuthJWT
+
+ROUNDS = 20000
+
+if __name__ == '__main__':
+    for fast_path in [False, True]:
+        @AuthJWT.load_config
+        def get_config():
+            return [
+                ("authjwt_secret_key", "secret"),
+                ("authjwt_hmac_fast_path", fast_path)
+            ]
+
+        Authorize = AuthJWT()
+        token = Authorize.create_access_token(subject='test')
+
+        sign = timeit.timeit(
+            lambda: Authorize.create_access_token(subject='test'),
+            number=ROUNDS
+        )
+        verify = timeit.timeit(
+            lambda: Authorize._decode_token(token),
+            number=ROUNDS
+        )
+        name = "fast path" if fast_path else "pyjwt"
+        print("HS256 {:<10} {:>8.0f} sign/s {:>8.0f} verify/s".format(name, ROUNDS / sign, ROUNDS / verify))
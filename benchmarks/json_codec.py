@@ -0,0 +1,39 @@
+"""
+Compare encode and decode throughput of a token with large user claims
+with the stdlib json codec and the orjson codec.
+
+    $ python benchmarks/json_codec.py
+"""
+import os, sys, timeit
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fastapi_jwt_auth import AuthJWT
+
+ROUNDS = 5000
+
+USER_CLAIMS = {
+    "roles": ["role-{}".format(i) for i in range(100)],
+    "tenants": {"tenant-{}".format(i): {"admin": i % 2 == 0, "level": i} for i in range(50)}
+}
+
+if __name__ == '__main__':
+    for codec in ["json", "orjson"]:
+        @AuthJWT.load_config
+        def get_config():
+            return [
+                ("authjwt_secret_key", "secret"),
+                ("authjwt_json_codec", codec)
+            ]
+
+        Authorize = AuthJWT()
+        token = Authorize.create_access_token(subject='test', user_claims=USER_CLAIMS)
+
+        encode = timeit.timeit(
+            lambda: Authorize.create_access_token(subject='test', user_claims=USER_CLAIMS),
+            number=ROUNDS
+        )
+        decode = timeit.timeit(
+            lambda: Authorize._decode_token(token),
+            number=ROUNDS
+        )
+        print("{:<8} {:>8.0f} encode/s {:>8.0f} decode/s".format(codec, ROUNDS / encode, ROUNDS / decode))
@@ -0,0 +1,57 @@
+"""
+Count how many times the token is decoded while serving one protected
+request and measure the time spent in AuthJWT for that request.
+
+    $ python benchmarks/protected_request.py
+"""
+import os, sys, timeit
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fastapi import Request
+from fastapi_jwt_auth import AuthJWT
+
+DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'tests'))
+ROUNDS = 2000
+
+with open(os.path.join(DIR, 'private_key.txt')) as f:
+    PRIVATE_KEY = f.read().strip()
+
+with open(os.path.join(DIR, 'public_key.txt')) as f:
+    PUBLIC_KEY = f.read().strip()
+
+@AuthJWT.load_config
+def get_config():
+    return [
+        ("authjwt_algorithm", "RS256"),
+        ("authjwt_private_key", PRIVATE_KEY),
+        ("authjwt_public_key", PUBLIC_KEY)
+    ]
+
+decoded = 0
+decode_token = AuthJWT._decode_token
+
+def counting_decode_token(self, *args, **kwargs):
+    global decoded
+    decoded += 1
+    return decode_token(self, *args, **kwargs)
+
+AuthJWT._decode_token = counting_decode_token
+
+token = AuthJWT().create_access_token(subject='test', fresh=True)
+scope = {
+    'type': 'http',
+    'method': 'GET',
+    'path': '/protected',
+    'headers': [(b'authorization', 'Bearer {}'.format(token).encode('latin-1'))]
+}
+
+def protected_request():
+    Authorize = AuthJWT(Request(scope))
+    Authorize.fresh_jwt_required()
+    Authorize.get_jwt_subject()
+    Authorize.get_raw_jwt()
+
+if __name__ == '__main__':
+    elapsed = timeit.timeit(protected_request, number=ROUNDS)
+    print("decodes per request: {:.2f}".format(decoded / ROUNDS))
+    print("time per request: {:.1f} us".format(elapsed / ROUNDS * 1e6))
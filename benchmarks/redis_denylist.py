@@ -0,0 +1,45 @@
+"""
+Compare revocation throughput of RedisDenylist with one SET per round-trip and
+with pipelined revoke_many, and lookup throughput from several threads sharing
+the connection pool, against the in-process Redis stand-in of the tests.
+
+    $ python benchmarks/redis_denylist.py
+"""
+import os, sys, time, uuid
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from concurrent.futures import ThreadPoolExecutor
+from fastapi_jwt_auth.denylist import RedisDenylist
+from tests.resp_server import RespServer
+
+JTIS = 5000
+THREADS = 8
+
+def rate(count, func, *args):
+    start = time.perf_counter()
+    func(*args)
+    return count / (time.perf_counter() - start)
+
+if __name__ == '__main__':
+    server = RespServer().start()
+    denylist = RedisDenylist(url=server.url, max_connections=THREADS)
+    expires_at = int(time.time()) + 900
+    jtis = [str(uuid.uuid4()) for _ in range(JTIS)]
+
+    def revoke_each():
+        for jti in jtis:
+            denylist.revoke_jti(jti, expires_at)
+
+    print("revoke_jti    {:>8.0f} revocations/s".format(rate(JTIS, revoke_each)))
+    server.data.clear()
+    print("revoke_many   {:>8.0f} revocations/s".format(rate(JTIS, denylist.revoke_many, [(jti, expires_at) for jti in jtis])))
+
+    def lookup(workers):
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            assert all(executor.map(denylist.is_revoked, jtis))
+
+    for workers in [1, THREADS]:
+        print("is_revoked {:>2} {:>8.0f} lookups/s".format(workers, rate(JTIS, lookup, workers)))
+
+    denylist.close()
+    server.stop()
@@ -0,0 +1,37 @@
+"""
+Compare lookups per second of SharedMemoryDenylist with MemoryDenylist, half of
+the lookups are for revoked tokens.
+
+    $ python benchmarks/shared_denylist.py
+"""
+import os, sys, time, uuid, tempfile
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fastapi_jwt_auth.denylist import MemoryDenylist, SharedMemoryDenylist
+
+REVOKED = 50000
+LOOKUPS = 200000
+
+def run(denylist, jtis):
+    start = time.perf_counter()
+    for jti in jtis:
+        denylist.is_revoked(jti)
+    return len(jtis) / (time.perf_counter() - start)
+
+if __name__ == '__main__':
+    directory = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    path = os.path.join(directory, "authjwt-benchmark-{}".format(os.getpid()))
+    revoked = [str(uuid.uuid4()) for _ in range(REVOKED)]
+    jtis = [revoked[i % REVOKED] if i % 2 else str(uuid.uuid4()) for i in range(LOOKUPS)]
+    expires_at = int(time.time()) + 900
+
+    try:
+        for name, denylist in [
+            ("memory", MemoryDenylist()),
+            ("shared memory", SharedMemoryDenylist(path, capacity=REVOKED))
+        ]:
+            for jti in revoked:
+                denylist.revoke_jti(jti, expires_at)
+            print("{:<14} {:>10.0f} lookups/s".format(name, run(denylist, jtis)))
+    finally:
+        os.unlink(path)
@@ -0,0 +1,50 @@
+"""
+Measure SQLiteDenylist lookups per second with one reader process and with one
+reader process per processor, while another process keeps revoking tokens.
+
+    $ python benchmarks/sqlite_denylist.py
+"""
+import os, sys, time, uuid, tempfile
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from multiprocessing import Event, Pool, Process
+from fastapi_jwt_auth.denylist import SQLiteDenylist
+
+REVOKED = 100000
+LOOKUPS = 50000
+
+def read(path, jtis):
+    denylist = SQLiteDenylist(path, compact_interval=None)
+    start = time.perf_counter()
+    for jti in jtis:
+        denylist.is_revoked(jti)
+    return len(jtis), time.perf_counter() - start
+
+def write(path, stop):
+    denylist = SQLiteDenylist(path, compact_interval=None)
+    while not stop.is_set():
+        denylist.revoke_many([(str(uuid.uuid4()), int(time.time()) + 900) for _ in range(100)])
+        time.sleep(0.01)
+
+if __name__ == '__main__':
+    path = os.path.join(tempfile.mkdtemp(), "denylist.db")
+    denylist = SQLiteDenylist(path, compact_interval=None)
+    revoked = [str(uuid.uuid4()) for _ in range(REVOKED)]
+    denylist.revoke_many([(jti, int(time.time()) + 900) for jti in revoked])
+    # half of the lookups are for revoked tokens
+    jtis = [revoked[i] if i % 2 else str(uuid.uuid4()) for i in range(LOOKUPS)]
+
+    stop = Event()
+    writer = Process(target=write, args=(path, stop))
+    writer.start()
+
+    for processes in sorted({1, os.cpu_count() or 1}):
+        with Pool(processes) as pool:
+            start = time.perf_counter()
+            results = pool.starmap(read, [(path, jtis)] * processes)
+            elapsed = time.perf_counter() - start
+        lookups = sum(count for count, _ in results)
+        print("{:>2} readers {:>10.0f} lookups/s".format(processes, lookups / elapsed))
+
+    stop.set()
+    writer.join()
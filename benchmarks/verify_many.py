@@ -0,0 +1,44 @@
+"""
+Compare RS256 verify throughput of AuthJWT.verify_many with one worker
+and with one worker per processor, threads and processes.
+
+    $ python benchmarks/verify_many.py
+"""
+import os, sys, time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from cryptography.hazmat.backends import default_backend
+from cryptography.hazmat.primitives.asymmetric import rsa
+from benchmarks.asymmetric_verify import pem_keys
+from fastapi_jwt_auth import AuthJWT
+
+TOKENS = 4000
+
+def run(Authorize, tokens, executor):
+    start = time.perf_counter()
+    results = Authorize.verify_many(tokens, executor=executor)
+    elapsed = time.perf_counter() - start
+    assert all(isinstance(result, dict) for result in results)
+    return len(tokens) / elapsed
+
+if __name__ == '__main__':
+    private_pem, public_pem = pem_keys(rsa.generate_private_key(65537, 2048, default_backend()))
+
+    @AuthJWT.load_config
+    def get_config():
+        return [
+            ("authjwt_algorithm", "RS256"),
+            ("authjwt_private_key", private_pem),
+            ("authjwt_public_key", public_pem)
+        ]
+
+    Authorize = AuthJWT()
+    tokens = [Authorize.create_access_token(subject=str(i)) for i in range(TOKENS)]
+    cpus = os.cpu_count() or 1
+
+    for workers in sorted({1, cpus}):
+        for name, pool in [("threads", ThreadPoolExecutor), ("processes", ProcessPoolExecutor)]:
+            with pool(max_workers=workers) as executor:
+                rate = run(Authorize, tokens, executor)
+            print("RS256 {:>2} {:<10} {:>8.0f} verify/s".format(workers, name, rate))
@@ -0,0 +1,88 @@
+from fastapi import FastAPI, HTTPException, Depends, Request
+from fastapi.responses import JSONResponse
+from fastapi_jwt_auth import AuthJWT
+from fastapi_jwt_auth.exceptions import AuthJWTException
+from pydantic import BaseModel
+from datetime import timedelta
+from redis.asyncio import Redis
+
+app = FastAPI()
+
+class User(BaseModel):
+    username: str
+    password: str
+
+class Settings(BaseModel):
+    authjwt_secret_key: str = "secret"
+    authjwt_denylist_enabled: bool = True
+    authjwt_denylist_token_checks: set = {"access","refresh"}
+    authjwt_denylist_callback_timeout: float = 0.5
+    access_expires: int = timedelta(minutes=15)
+    refresh_expires: int = timedelta(days=30)
+
+
+settings = Settings()
+
+@AuthJWT.load_config
+def get_config():
+    return settings
+
+@app.exception_handler(AuthJWTException)
+def authjwt_exception_handler(request: Request, exc: AuthJWTException):
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"detail": exc.message}
+    )
+
+
+# Setup our async redis connection for storing the denylist tokens
+redis_conn = Redis(host='localhost', port=6379, db=0, decode_responses=True)
+
+# The callback is a coroutine function, it's awaited by the *_async functions.
+# When redis doesn't answer within authjwt_denylist_callback_timeout seconds,
+# the token is treated as revoked
+@AuthJWT.token_in_denylist_loader
+async def check_if_token_in_denylist(decrypted_token):
+    jti = decrypted_token['jti']
+    entry = await redis_conn.get(jti)
+    return entry and entry == 'true'
+
+@app.post('/login')
+async def login(user: User, Authorize: AuthJWT = Depends()):
+    if user.username != "test" or user.password != "test":
+        raise HTTPException(status_code=401,detail="Bad username or password")
+
+    access_token = Authorize.create_access_token(subject=user.username)
+    refresh_token = Authorize.create_refresh_token(subject=user.username)
+    return {"access_token": access_token, "refresh_token": refresh_token}
+
+@app.post('/refresh')
+async def refresh(Authorize: AuthJWT = Depends()):
+    await Authorize.jwt_refresh_token_required_async()
+
+    current_user = Authorize.get_jwt_subject()
+    new_access_token = Authorize.create_access_token(subject=current_user)
+    return {"access_token": new_access_token}
+
+@app.delete('/access-revoke')
+async def access_revoke(Authorize: AuthJWT = Depends()):
+    await Authorize.jwt_required_async()
+
+    jti = Authorize.get_raw_jwt()['jti']
+    await redis_conn.setex(jti,settings.access_expires,'true')
+    return {"detail":"Access token has been revoke"}
+
+@app.delete('/refresh-revoke')
+async def refresh_revoke(Authorize: AuthJWT = Depends()):
+    await Authorize.jwt_refresh_token_required_async()
+
+    jti = Authorize.get_raw_jwt()['jti']
+    await redis_conn.setex(jti,settings.refresh_expires,'true')
+    return {"detail":"Refresh token has been revoke"}
+
+@app.get('/protected')
+async def protected(Authorize: AuthJWT = Depends()):
+    await Authorize.jwt_required_async()
+
+    current_user = Authorize.get_jwt_subject()
+    return {"user": current_user}
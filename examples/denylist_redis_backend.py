@@ -0,0 +1,77 @@
+from fastapi import FastAPI, HTTPException, Depends, Request
+from fastapi.responses import JSONResponse
+from fastapi_jwt_auth import AuthJWT
+from fastapi_jwt_auth.denylist import AsyncRedisDenylist
+from fastapi_jwt_auth.exceptions import AuthJWTException
+from pydantic import BaseModel
+
+app = FastAPI()
+
+class User(BaseModel):
+    username: str
+    password: str
+
+class Settings(BaseModel):
+    authjwt_secret_key: str = "secret"
+    authjwt_denylist_enabled: bool = True
+    authjwt_denylist_token_checks: set = {"access","refresh"}
+    authjwt_denylist_callback_timeout: float = 0.5
+
+@AuthJWT.load_config
+def get_config():
+    return Settings()
+
+@app.exception_handler(AuthJWTException)
+def authjwt_exception_handler(request: Request, exc: AuthJWTException):
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"detail": exc.message}
+    )
+
+
+# The built in redis denylist takes connections from a pool of 20,
+# a revoked token is stored until its exp claim has passed
+denylist = AsyncRedisDenylist(url="redis://localhost:6379/0",max_connections=20)
+AuthJWT.token_in_denylist_loader(denylist)
+
+@app.on_event("shutdown")
+async def close_denylist():
+    await denylist.close()
+
+@app.post('/login')
+async def login(user: User, Authorize: AuthJWT = Depends()):
+    if user.username != "test" or user.password != "test":
+        raise HTTPException(status_code=401,detail="Bad username or password")
+
+    access_token = Authorize.create_access_token(subject=user.username)
+    refresh_token = Authorize.create_refresh_token(subject=user.username)
+    return {"access_token": access_token, "refresh_token": refresh_token}
+
+@app.post('/refresh')
+async def refresh(Authorize: AuthJWT = Depends()):
+    await Authorize.jwt_refresh_token_required_async()
+
+    current_user = Authorize.get_jwt_subject()
+    new_access_token = Authorize.create_access_token(subject=current_user)
+    return {"access_token": new_access_token}
+
+@app.delete('/access-revoke')
+async def access_revoke(Authorize: AuthJWT = Depends()):
+    await Authorize.jwt_required_async()
+
+    await denylist.revoke_until_exp(Authorize.get_raw_jwt())
+    return {"detail":"Access token has been revoke"}
+
+@app.delete('/refresh-revoke')
+async def refresh_revoke(Authorize: AuthJWT = Depends()):
+    await Authorize.jwt_refresh_token_required_async()
+
+    await denylist.revoke_until_exp(Authorize.get_raw_jwt())
+    return {"detail":"Refresh token has been revoke"}
+
+@app.get('/protected')
+async def protected(Authorize: AuthJWT = Depends()):
+    await Authorize.jwt_required_async()
+
+    current_user = Authorize.get_jwt_subject()
+    return {"user": current_user}
@@ -1,28 +1,72 @@
+import re, inspect, threading
 from fastapi_jwt_auth.config import LoadConfig
+from fastapi_jwt_auth.cache import TTLCache, DenylistCache, CacheInfo
+from fastapi_jwt_auth.codec import get_default_json_codec
+from fastapi_jwt_auth.singleflight import SingleFlight, AsyncSingleFlight
+from fastapi_jwt_auth.jwks import JWKS
+from fastapi_jwt_auth.keyring import Keyring
+from fastapi_jwt_auth.keyfiles import KeyFileWatcher, KeySnapshot, read_key_files
+from fastapi_jwt_auth.compiled_config import CompiledConfig, ConfigMeta, compile_lock, deferred_compile
+from fastapi_jwt_auth.jws import HMACEngine
+from jwt.algorithms import get_default_algorithms, requires_cryptography, has_crypto
 from pydantic import ValidationError
-from typing import Callable, List
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Mapping, Optional, Type
 from datetime import timedelta
 
-class AuthConfig:
+# where a request's token is verified from, chosen once for authjwt_token_location
+_token_location_extractors = {
+    frozenset({'headers'}): lambda auth: 'headers',
+    frozenset({'cookies'}): lambda auth: 'cookies',
+    # a token in the headers wins, the cookies are only looked at without one
+    frozenset({'headers','cookies'}): lambda auth: 'headers' if auth._token else 'cookies'
+}
+
+# profiles by the class they were made from and their name
+_profiles = {}
+_profiles_lock = threading.Lock()
+_executors_lock = threading.Lock()
+
+class AuthConfig(metaclass=ConfigMeta):
     _token = None
+    _algorithms = get_default_algorithms()
     _token_location = {'headers'}
 
     _secret_key = None
     _public_key = None
     _private_key = None
+    _key_id = None
+    _verify_keys = None
+    # verification keys by kid, None without authjwt_key_id and authjwt_verify_keys
+    _keyring = None
+    # keys of the key files, every instance copies the snapshot that is published when it's made
+    _key_snapshot = None
+    _key_watcher = None
     _algorithm = "HS256"
     _decode_algorithms = None
     _decode_leeway = 0
     _encode_issuer = None
     _decode_issuer = None
     _decode_audience = None
+    _hmac_fast_path = False
+    _hmac_engine = None
+    _json_codec = get_default_json_codec()
+    _verify_max_workers = None
+    _async_max_workers = None
+    # thread pools of verify_many and the *_async methods by name and number of threads
+    _executors = {}
+    _max_token_length = 8192
+    _max_header_length = 1024
     _denylist_enabled = False
     _denylist_token_checks = {'access','refresh'}
     _header_name = "Authorization"
     _header_type = "Bearer"
     _token_in_denylist_callback = None
+    _token_in_denylist_callback_is_async = False
+    _denylist_callback_timeout = None
     _access_token_expires = timedelta(minutes=15)
     _refresh_token_expires = timedelta(days=30)
+    # asymmetric keys parsed into key objects, per algorithm family
+    _prepared_keys = {}
 
     # option for create cookies
     _access_cookie_key = "access_token_cookie"
@@ -44,6 +88,37 @@ class AuthConfig:
     _refresh_csrf_header_name = "X-CSRF-Token"
     _csrf_methods = {'POST','PUT','PATCH','DELETE'}
 
+    # option for verified token cache
+    _token_cache_enabled = False
+    _token_cache_size = 1024
+    _token_cache = TTLCache(1024)
+
+    # option for rejected token cache
+    _rejected_token_cache_enabled = False
+    _rejected_token_cache_size = 1024
+    _rejected_token_cache_ttl = 10
+    _rejected_token_cache = TTLCache(1024)
+
+    # option for denylist verdict cache
+    _denylist_cache_enabled = False
+    _denylist_cache_size = 1024
+    _denylist_cache_ttl = 1
+    _denylist_cache = DenylistCache(1024)
+
+    # option for coalescing concurrent verifications
+    _singleflight_enabled = False
+    _singleflight = SingleFlight()
+    _async_singleflight = AsyncSingleFlight()
+
+    # option for key sets of identity providers
+    _jwks = None
+
+    # snapshot of the values above that every instance copies, compiled per class
+    _compiled_config = None
+    # name of the profile and the class it was made from, None for the class that isn't one
+    _profile_name = None
+    _profile_base = None
+
     @property
     def jwt_in_cookies(self) -> bool:
         return 'cookies' in self._token_location
@@ -56,46 +131,385 @@ class AuthConfig:
     def load_config(cls, settings: Callable[...,List[tuple]]) -> "AuthConfig":
         try:
             config = LoadConfig(**{key.lower():value for key,value in settings()})
-
-            cls._token_location = config.authjwt_token_location
-            cls._secret_key = config.authjwt_secret_key
-            cls._public_key = config.authjwt_public_key
-            cls._private_key = config.authjwt_private_key
-            cls._algorithm = config.authjwt_algorithm
-            cls._decode_algorithms = config.authjwt_decode_algorithms
-            cls._decode_leeway = config.authjwt_decode_leeway
-            cls._encode_issuer = config.authjwt_encode_issuer
-            cls._decode_issuer = config.authjwt_decode_issuer
-            cls._decode_audience = config.authjwt_decode_audience
-            cls._denylist_enabled = config.authjwt_denylist_enabled
-            cls._denylist_token_checks = config.authjwt_denylist_token_checks
-            cls._header_name = config.authjwt_header_name
-            cls._header_type = config.authjwt_header_type
-            cls._access_token_expires = config.authjwt_access_token_expires
-            cls._refresh_token_expires = config.authjwt_refresh_token_expires
-            # option for create cookies
-            cls._access_cookie_key = config.authjwt_access_cookie_key
-            cls._refresh_cookie_key = config.authjwt_refresh_cookie_key
-            cls._access_cookie_path = config.authjwt_access_cookie_path
-            cls._refresh_cookie_path = config.authjwt_refresh_cookie_path
-            cls._cookie_max_age = config.authjwt_cookie_max_age
-            cls._cookie_domain = config.authjwt_cookie_domain
-            cls._cookie_secure = config.authjwt_cookie_secure
-            cls._cookie_samesite = config.authjwt_cookie_samesite
-            # option for double submit csrf protection
-            cls._cookie_csrf_protect = config.authjwt_cookie_csrf_protect
-            cls._access_csrf_cookie_key = config.authjwt_access_csrf_cookie_key
-            cls._refresh_csrf_cookie_key = config.authjwt_refresh_csrf_cookie_key
-            cls._access_csrf_cookie_path = config.authjwt_access_csrf_cookie_path
-            cls._refresh_csrf_cookie_path = config.authjwt_refresh_csrf_cookie_path
-            cls._access_csrf_header_name = config.authjwt_access_csrf_header_name
-            cls._refresh_csrf_header_name = config.authjwt_refresh_csrf_header_name
-            cls._csrf_methods = config.authjwt_csrf_methods
         except ValidationError:
             raise
         except Exception:
             raise TypeError("Config must be pydantic 'BaseSettings' or list of tuple")
 
+        # everything is built and checked before the class is changed, so a config
+        # that fails to load leaves the one before it in place
+        attributes = {
+            "_token_location": config.authjwt_token_location,
+            "_secret_key": config.authjwt_secret_key,
+            "_public_key": config.authjwt_public_key,
+            "_private_key": config.authjwt_private_key,
+            "_key_id": config.authjwt_key_id,
+            "_verify_keys": config.authjwt_verify_keys,
+            "_algorithm": config.authjwt_algorithm,
+            "_decode_algorithms": config.authjwt_decode_algorithms,
+            "_decode_leeway": config.authjwt_decode_leeway,
+            "_encode_issuer": config.authjwt_encode_issuer,
+            "_decode_issuer": config.authjwt_decode_issuer,
+            "_decode_audience": config.authjwt_decode_audience,
+            "_hmac_fast_path": config.authjwt_hmac_fast_path,
+            "_json_codec": config.authjwt_json_codec or get_default_json_codec(),
+            "_verify_max_workers": config.authjwt_verify_max_workers,
+            "_async_max_workers": config.authjwt_async_max_workers,
+            "_max_token_length": config.authjwt_max_token_length,
+            "_max_header_length": config.authjwt_max_header_length,
+            "_denylist_enabled": config.authjwt_denylist_enabled,
+            "_denylist_token_checks": config.authjwt_denylist_token_checks,
+            "_denylist_callback_timeout": config.authjwt_denylist_callback_timeout,
+            "_header_name": config.authjwt_header_name,
+            "_header_type": config.authjwt_header_type,
+            "_access_token_expires": config.authjwt_access_token_expires,
+            "_refresh_token_expires": config.authjwt_refresh_token_expires,
+            # option for create cookies
+            "_access_cookie_key": config.authjwt_access_cookie_key,
+            "_refresh_cookie_key": config.authjwt_refresh_cookie_key,
+            "_access_cookie_path": config.authjwt_access_cookie_path,
+            "_refresh_cookie_path": config.authjwt_refresh_cookie_path,
+            "_cookie_max_age": config.authjwt_cookie_max_age,
+            "_cookie_domain": config.authjwt_cookie_domain,
+            "_cookie_secure": config.authjwt_cookie_secure,
+            "_cookie_samesite": config.authjwt_cookie_samesite,
+            # option for double submit csrf protection
+            "_cookie_csrf_protect": config.authjwt_cookie_csrf_protect,
+            "_access_csrf_cookie_key": config.authjwt_access_csrf_cookie_key,
+            "_refresh_csrf_cookie_key": config.authjwt_refresh_csrf_cookie_key,
+            "_access_csrf_cookie_path": config.authjwt_access_csrf_cookie_path,
+            "_refresh_csrf_cookie_path": config.authjwt_refresh_csrf_cookie_path,
+            "_access_csrf_header_name": config.authjwt_access_csrf_header_name,
+            "_refresh_csrf_header_name": config.authjwt_refresh_csrf_header_name,
+            "_csrf_methods": config.authjwt_csrf_methods,
+            # option for verified token cache
+            "_token_cache_enabled": config.authjwt_token_cache_enabled,
+            "_token_cache_size": config.authjwt_token_cache_size,
+            # keys or algorithms may have changed, drop everything verified before
+            "_token_cache": TTLCache(config.authjwt_token_cache_size),
+            # option for rejected token cache
+            "_rejected_token_cache_enabled": config.authjwt_rejected_token_cache_enabled,
+            "_rejected_token_cache_size": config.authjwt_rejected_token_cache_size,
+            "_rejected_token_cache_ttl": config.authjwt_rejected_token_cache_ttl,
+            "_rejected_token_cache": TTLCache(config.authjwt_rejected_token_cache_size),
+            # option for denylist verdict cache
+            "_denylist_cache_enabled": config.authjwt_denylist_cache_enabled,
+            "_denylist_cache_size": config.authjwt_denylist_cache_size,
+            "_denylist_cache_ttl": config.authjwt_denylist_cache_ttl,
+            "_denylist_cache": DenylistCache(config.authjwt_denylist_cache_size),
+            # option for coalescing concurrent verifications
+            "_singleflight_enabled": config.authjwt_singleflight_enabled
+        }
+
+        # keys in files are read now and reloaded by a watcher when the files change
+        key_files = {
+            name: path for name, path in [
+                ("_secret_key", config.authjwt_secret_key_file),
+                ("_private_key", config.authjwt_private_key_file),
+                ("_public_key", config.authjwt_public_key_file)
+            ] if path
+        }
+        version = None
+        if key_files:
+            for name in key_files:
+                if attributes[name]:
+                    raise ValueError("authjwt{0} and authjwt{0}_file can't both be set".format(name))
+            try:
+                keys, version = read_key_files(key_files)
+            except OSError as err:
+                raise ValueError("The key files could not be read: {}".format(err))
+            attributes.update(keys)
+
+        # option for key sets of identity providers
+        jwks = config.authjwt_jwks
+        if isinstance(jwks,str):
+            jwks = JWKS(
+                jwks,
+                refresh_interval=config.authjwt_jwks_refresh_interval,
+                max_stale=config.authjwt_jwks_max_stale
+            )
+        attributes["_jwks"] = jwks
+
+        try:
+            # parse the keys now, so invalid keys are reported at startup instead of the first request
+            keys = cls._parse_keys(attributes)
+            # the first fetch happens here, requests only read the keys that are loaded
+            if jwks is not None:
+                jwks.load()
+        except Exception:
+            # a key set made for this config must not keep refreshing
+            if jwks is not None and jwks is not config.authjwt_jwks:
+                jwks.close()
+            raise
+        attributes.update(keys)
+
+        # requests keep the snapshot that is published until the whole config is assigned
+        with deferred_compile():
+            # a profile must not close the key set or the watcher it inherits
+            own_jwks = cls.__dict__.get('_jwks')
+            if own_jwks is not None and own_jwks is not jwks:
+                own_jwks.close()
+            own_watcher = cls.__dict__.get('_key_watcher')
+            if own_watcher is not None:
+                own_watcher.close()
+
+            for name, value in attributes.items():
+                setattr(cls,name,value)
+            cls._key_snapshot = KeySnapshot(keys,version) if key_files else None
+            cls._key_watcher = None
+            if key_files and config.authjwt_key_reload_interval is not None:
+                cls._key_watcher = KeyFileWatcher(
+                    key_files,
+                    cls._build_key_snapshot,
+                    cls._publish_key_snapshot,
+                    config.authjwt_key_reload_interval,
+                    version
+                ).start()
+        cls._publish_compiled_config()
+
+    @classmethod
+    def _parse_keys(cls, attributes: Mapping[str,Any]) -> Dict[str,Any]:
+        """
+        Parse the keys of a config, an invalid key raises ValueError
+
+        :param attributes: keys, key ids and algorithms of the config by attribute name
+        :return: the keys and everything parsed from them by attribute name
+        """
+        secret_key, private_key, public_key = (
+            attributes["_secret_key"], attributes["_private_key"], attributes["_public_key"]
+        )
+        algorithms = {attributes["_algorithm"], *(attributes["_decode_algorithms"] or [])}
+        return {
+            "_secret_key": secret_key,
+            "_private_key": private_key,
+            "_public_key": public_key,
+            "_hmac_engine": HMACEngine(secret_key) if secret_key else None,
+            "_prepared_keys": cls._prepare_keys(private_key,public_key,algorithms),
+            "_keyring": cls._build_keyring(secret_key,public_key,attributes["_key_id"],attributes["_verify_keys"])
+        }
+
+    @classmethod
+    def _build_keyring(
+        cls,
+        secret_key: Optional[str],
+        public_key: Optional[str],
+        key_id: Optional[str],
+        verify_keys: Optional[Dict[str,str]]
+    ) -> Optional[Keyring]:
+        """
+        :param secret_key: secret for symmetric algorithms
+        :param public_key: PEM formatted public key
+        :param key_id: authjwt_key_id, kid of the secret or the key pair
+        :param verify_keys: authjwt_verify_keys
+        :return: keyring of authjwt_key_id and authjwt_verify_keys, None when both are unset
+        """
+        if key_id is None and not verify_keys:
+            return None
+
+        keys = dict(verify_keys or {})
+        if key_id in keys:
+            raise ValueError("authjwt_key_id must not be one of authjwt_verify_keys")
+        active = [key for key in (secret_key, public_key) if key]
+        if active:
+            keys[key_id] = active
+        return Keyring(keys,key_id)
+
+    @classmethod
+    def _prepare_keys(
+        cls,
+        private_key: Optional[str],
+        public_key: Optional[str],
+        algorithms: Iterable[str]
+    ) -> Dict[tuple,tuple]:
+        """
+        Parse the asymmetric keys for the configured algorithms
+
+        :param private_key: PEM formatted private key
+        :param public_key: PEM formatted public key
+        :param algorithms: authjwt_algorithm and authjwt_decode_algorithms
+        :return: PEM and key object by algorithm family and process, like _prepared_keys
+        """
+        prepared_keys = {}
+        for algorithm in algorithms:
+            if algorithm not in requires_cryptography or not has_crypto:
+                continue
+            for process, key, name in [
+                ("encode", private_key, "authjwt_private_key"),
+                ("decode", public_key, "authjwt_public_key")
+            ]:
+                if not key: continue
+                try:
+                    cls._prepare_key(algorithm,process,key,prepared_keys)
+                except Exception as err:
+                    raise ValueError("{} could not be loaded for algorithm {}: {}".format(name,algorithm,err))
+        return prepared_keys
+
+    @classmethod
+    def _build_key_snapshot(cls, keys: Dict[str,str], version: tuple) -> KeySnapshot:
+        """
+        Parse the keys read from the key files, runs on the thread of the watcher
+
+        :param keys: content of the key files by attribute name
+        :param version: stat of the key files
+        :return: snapshot with the keys and everything parsed from them
+        """
+        attributes = {
+            name: getattr(cls,name) for name in
+            ("_secret_key","_private_key","_public_key","_key_id","_verify_keys","_algorithm","_decode_algorithms")
+        }
+        attributes.update(keys)
+        return KeySnapshot(cls._parse_keys(attributes),version)
+
+    @classmethod
+    def _publish_key_snapshot(cls, snapshot: KeySnapshot) -> None:
+        # one snapshot, a request sees the old keys or the new ones and never a mix.
+        # the class attributes are assigned too, for the instances made without a request
+        with deferred_compile():
+            cls._key_snapshot = snapshot
+            for name, value in snapshot.attributes.items():
+                setattr(cls,name,value)
+        cls._publish_compiled_config()
+
+    @classmethod
+    def _compile_config(cls) -> Dict[str,Any]:
+        """
+        :return: the configuration values of this class with the keys of the key
+                 snapshot and the values requests derive from them
+        """
+        attributes = {name: getattr(cls,name) for name in _config_attributes}
+        snapshot = cls._key_snapshot
+        if snapshot is not None:
+            attributes.update(snapshot.attributes)
+
+        header_type = attributes['_header_type']
+        algorithms = tuple(attributes['_decode_algorithms'] or [attributes['_algorithm']])
+        attributes.update(
+            _header_key=attributes['_header_name'].lower(),
+            _header_type_pattern=re.compile(r"{}\s".format(header_type)) if header_type else None,
+            _allowed_algorithms=algorithms,
+            # HMAC is cheaper than handing the token to a thread
+            _verify_off_thread=any(algorithm in requires_cryptography for algorithm in algorithms),
+            _token_location_extractor=_token_location_extractors.get(
+                frozenset(attributes['_token_location']),lambda auth: None
+            )
+        )
+        return attributes
+
+    @classmethod
+    def _publish_compiled_config(cls) -> CompiledConfig:
+        """
+        Compile the configuration of this class and swap it in with one assignment
+
+        :return: the snapshot that was published
+        """
+        with compile_lock:
+            compiled = CompiledConfig(cls._compile_config(),ConfigMeta.generation)
+            cls._compiled_config = compiled
+        return compiled
+
+    @classmethod
+    def _get_compiled_config(cls) -> CompiledConfig:
+        """
+        :return: the snapshot of this class, compiled again when a class attribute
+                 was assigned after it was published
+        """
+        compiled = cls.__dict__.get('_compiled_config')
+        if compiled is None or compiled.generation != ConfigMeta.generation:
+            with compile_lock:
+                compiled = cls.__dict__.get('_compiled_config')
+                if compiled is None or compiled.generation != ConfigMeta.generation:
+                    compiled = cls._publish_compiled_config()
+        return compiled
+
+    @classmethod
+    def _prepare_key(
+        cls,
+        algorithm: str,
+        process: str,
+        key: str,
+        prepared_keys: Optional[Dict[tuple,tuple]] = None
+    ) -> Any:
+        """
+        Parse a PEM key into the key object of the algorithm family (RSA or EC),
+        the object is kept and reused until the key changes
+
+        :param algorithm: asymmetric algorithm for decode and encode token
+        :param process: for indicating key for encode or decode token
+        :param key: PEM formatted key
+        :param prepared_keys: the parsed keys to look in and add to, by default _prepared_keys
+
+        :return: key object of cryptography
+        """
+        if prepared_keys is None:
+            prepared_keys = cls._prepared_keys
+        family = ("EC" if algorithm.startswith("ES") else "RSA", process)
+
+        prepared = prepared_keys.get(family)
+        if prepared is None or prepared[0] != key:
+            prepared = (key, cls._algorithms[algorithm].prepare_key(key))
+            prepared_keys[family] = prepared
+        return prepared[1]
+
+    @classmethod
+    def profile(cls, name: Hashable, create: bool = True) -> Type["AuthConfig"]:
+        """
+        Return the configuration profile with the name, a subclass with its own config,
+        keys and caches that is used like the class itself, for example
+        Depends(AuthJWT.profile("tenant-a")). a new profile follows the config of this
+        class until load_config is called on it, and the thread pools are shared
+
+        :param name: name of the profile, like the key of a tenant
+        :param create: False to raise KeyError when the profile doesn't exist yet,
+                       for a name that comes from a request
+        """
+        try:
+            return _profiles[(cls,name)]
+        except KeyError:
+            if not create:
+                raise
+
+        with _profiles_lock:
+            profile = _profiles.get((cls,name))
+            if profile is None:
+                class_name = "{}[{}]".format(cls.__name__,name)
+                profile = type(cls)(class_name,(cls,),{
+                    '__module__': cls.__module__,
+                    '__qualname__': class_name,
+                    '_profile_name': name,
+                    '_profile_base': cls,
+                    # the verdicts and keys of one profile never serve another
+                    '_token_cache': TTLCache(cls._token_cache_size),
+                    '_rejected_token_cache': TTLCache(cls._rejected_token_cache_size),
+                    '_denylist_cache': DenylistCache(cls._denylist_cache_size),
+                    '_prepared_keys': {},
+                    '_hmac_engine': None
+                })
+                _profiles[(cls,name)] = profile
+        return profile
+
+    @classmethod
+    def token_cache_info(cls) -> CacheInfo:
+        """
+        Return hits, misses, maxsize and current size of the verified token cache
+        """
+        return cls._token_cache.info()
+
+    @classmethod
+    def rejected_token_cache_info(cls) -> CacheInfo:
+        """
+        Return hits, misses, maxsize and current size of the rejected token cache,
+        hits are tokens that were rejected again without decoding them
+        """
+        return cls._rejected_token_cache.info()
+
+    @classmethod
+    def denylist_cache_info(cls) -> CacheInfo:
+        """
+        Return hits, misses, maxsize and current size of the denylist verdict cache,
+        hits are tokens checked without calling the denylist callback
+        """
+        return cls._denylist_cache.info()
+
     @classmethod
     def token_in_denylist_loader(cls, callback: Callable[...,bool]) -> "AuthConfig":
         """
@@ -106,6 +520,24 @@ class AuthConfig:
         *HINT*: The callback must be a function that takes decrypted_token argument,
         args for object AuthJWT and this is not used, decrypted_token is decode
         JWT (python dictionary) and returns *`True`* if the token has been deny,
-        or *`False`* otherwise.
+        or *`False`* otherwise. a coroutine function, or an object with an async
+        __call__, is awaited by the *_async methods of AuthJWT.
         """
-        cls._token_in_denylist_callback = callback
+        with deferred_compile():
+            cls._token_in_denylist_callback = staticmethod(callback)
+            # verdicts of the previous callback
+            cls._denylist_cache.invalidate()
+            cls._token_in_denylist_callback_is_async = (
+                inspect.iscoroutinefunction(callback) or
+                inspect.iscoroutinefunction(getattr(callback,'__call__',None))
+            )
+        cls._publish_compiled_config()
+
+# every data attribute of AuthConfig is part of the snapshot, except the ones changed
+# by requests and the key files bookkeeping
+_config_attributes = tuple(
+    name for name, value in vars(AuthConfig).items()
+    if name.startswith('_') and not name.startswith('__')
+    and not isinstance(value, (classmethod, staticmethod, property)) and not inspect.isfunction(value)
+    and name not in ConfigMeta.untracked and name not in ('_token', '_key_snapshot', '_key_watcher')
+)
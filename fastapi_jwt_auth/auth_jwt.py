@@ -1,10 +1,25 @@
-import jwt, re, uuid, hmac
+import os, uuid, hmac, time, hashlib, asyncio, inspect
 from jwt.algorithms import requires_cryptography, has_crypto
+from jwt.exceptions import InvalidAlgorithmError, InvalidKeyError, InvalidSignatureError, ImmatureSignatureError
 from datetime import datetime, timezone, timedelta
-from typing import Optional, Dict, Union, Sequence
+from concurrent.futures import Executor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Optional, Dict, Union, Sequence, Iterable, List, Tuple
 from fastapi import Request, Response, WebSocket
-from fastapi_jwt_auth.auth_config import AuthConfig
+from fastapi_jwt_auth.auth_config import AuthConfig, _executors_lock
+from fastapi_jwt_auth.jws import (
+    HMACEngine,
+    ParsedToken,
+    parse_token,
+    verify_signature,
+    load_payload,
+    validate_claims,
+    encode_signing_input,
+    encode_token,
+    sign
+)
 from fastapi_jwt_auth.exceptions import (
+    AuthJWTException,
     InvalidHeaderError,
     CSRFError,
     JWTDecodeError,
@@ -15,6 +30,8 @@ from fastapi_jwt_auth.exceptions import (
     FreshTokenRequired
 )
 
+_symmetric_algorithms = frozenset(HMACEngine.digests)
+
 class AuthJWT(AuthConfig):
     def __init__(self,req: Request = None, res: Response = None):
         """
@@ -24,6 +41,18 @@ class AuthJWT(AuthConfig):
         :param req: all incoming request
         :param res: response from endpoint
         """
+        if req or res:
+            # an instance of a request keeps the configuration and keys published when
+            # it's made, even when the config or the key files are reloaded meanwhile
+            self.__dict__.update(self._get_compiled_config().attributes)
+        # other instances, like one made at module level, read the class attributes
+        # and follow the configuration and the keys reloaded from the key files
+
+        # claims of the last verified token, reused for the lifetime of this instance
+        self._verified_claims = None
+        # claims and result of the denylist callback resolved by the *_async methods
+        self._denylist_verdict = None
+
         if res and self.jwt_in_cookies:
             self._response = res
 
@@ -33,16 +62,23 @@ class AuthJWT(AuthConfig):
                 self._request = req
             # get jwt in headers when headers in token location
             if self.jwt_in_headers:
-                auth = req.headers.get(self._header_name.lower())
+                auth = req.headers.get(self._header_key)
                 if auth: self._get_jwt_from_headers(auth)
 
+    def __getattr__(self, name: str) -> Any:
+        # values derived from the configuration, for an instance that didn't copy the snapshot
+        try:
+            return self._get_compiled_config().attributes[name]
+        except KeyError:
+            raise AttributeError("'{}' object has no attribute '{}'".format(type(self).__name__,name)) from None
+
     def _get_jwt_from_headers(self,auth: str) -> "AuthJWT":
         """
         Get token from the headers
 
         :param auth: value from HeaderName
         """
-        header_name, header_type = self._header_name, self._header_type
+        header_name, header_type = self._header_name, self._header_type_pattern
 
         parts = auth.split()
 
@@ -55,8 +91,8 @@ class AuthJWT(AuthConfig):
             self._token = parts[0]
         else:
             # <HeaderName>: <HeaderType> <JWT>
-            if not re.match(r"{}\s".format(header_type),auth) or len(parts) != 2:
-                msg = "Bad {} header. Expected value '{} <JWT>'".format(header_name,header_type)
+            if not header_type.match(auth) or len(parts) != 2:
+                msg = "Bad {} header. Expected value '{} <JWT>'".format(header_name,self._header_type)
                 raise InvalidHeaderError(status_code=422,message=msg)
             self._token = parts[1]
 
@@ -73,20 +109,28 @@ class AuthJWT(AuthConfig):
             raise TypeError('a datetime is required')
         return int(value.timestamp())
 
-    def _get_secret_key(self, algorithm: str, process: str) -> str:
+    def _get_secret_key(self, algorithm: str, process: str, kid: Optional[str] = None) -> str:
         """
         Get key with a different algorithm
 
         :param algorithm: algorithm for decode and encode token
         :param process: for indicating get key for encode or decode token
+        :param kid: kid header of the token to decode, picks the key of authjwt_verify_keys or authjwt_jwks
 
-        :return: plain text or RSA depends on algorithm
+        :return: plain text, HMAC engine or key object of RSA or EC depends on algorithm
         """
-        symmetric_algorithms, asymmetric_algorithms = {"HS256","HS384","HS512"}, requires_cryptography
+        symmetric_algorithms, asymmetric_algorithms = _symmetric_algorithms, requires_cryptography
 
         if algorithm not in symmetric_algorithms and algorithm not in asymmetric_algorithms:
             raise ValueError("Algorithm {} could not be found".format(algorithm))
 
+        if process == "decode" and kid is not None and self._keyring is not None:
+            key = self._keyring.get_key(kid,algorithm)
+            if key is not None:
+                return key
+            if self._jwks is None or algorithm in symmetric_algorithms:
+                raise InvalidKeyError("Unknown key id {}".format(kid))
+
         if algorithm in symmetric_algorithms:
             if not self._secret_key:
                 raise RuntimeError(
@@ -106,15 +150,22 @@ class AuthJWT(AuthConfig):
                     "authjwt_private_key must be set when using asymmetric algorithm {}".format(algorithm)
                 )
 
-            return self._private_key
+            return self._prepare_key(algorithm,process,self._private_key,self._prepared_keys)
 
         if process == "decode":
+            if self._jwks is not None:
+                key = self._jwks.get_key(kid,algorithm)
+                if key is not None:
+                    return key
+                if not self._public_key:
+                    raise InvalidKeyError("The token has no kid header")
+
             if not self._public_key:
                 raise RuntimeError(
                     "authjwt_public_key must be set when using asymmetric algorithm {}".format(algorithm)
                 )
 
-            return self._public_key
+            return self._prepare_key(algorithm,process,self._public_key,self._prepared_keys)
 
     def _create_token(
         self,
@@ -181,17 +232,42 @@ class AuthJWT(AuthConfig):
 
         algorithm = algorithm or self._algorithm
 
+        # the kid tells which key verifies the token after the signing key is rotated
+        if self._key_id is not None and not (headers and 'kid' in headers):
+            headers = {**(headers or {}), 'kid': self._key_id}
+
         try:
             secret_key = self._get_secret_key(algorithm,"encode")
         except Exception:
             raise
 
-        return jwt.encode(
-            {**reserved_claims, **custom_claims, **user_claims},
-            secret_key,
-            algorithm=algorithm,
-            headers=headers
-        ).decode('utf-8')
+        claims = {**reserved_claims, **custom_claims, **user_claims}
+
+        signing_input = encode_signing_input(claims,algorithm,headers,self._json_codec)
+
+        if self._hmac_fast_path and algorithm in HMACEngine.digests:
+            signature = self._get_hmac_engine(secret_key).sign(algorithm,signing_input)
+        else:
+            signature = sign(signing_input,self._algorithms,algorithm,secret_key)
+
+        return encode_token(signing_input,signature)
+
+    def _get_hmac_engine(self, secret_key: str) -> HMACEngine:
+        """
+        Return the HMAC engine keyed with the secret, a new one is made when the secret changes
+
+        :param secret_key: secret for symmetric algorithms
+        """
+        engine = self._hmac_engine
+        if engine is None or engine.secret_key != secret_key:
+            engine = HMACEngine(secret_key)
+            self.__class__._hmac_engine = engine
+        return engine
+
+    _async_denylist_callback_message = (
+        "An async token_in_denylist_callback can only be used "
+        "with the *_async methods, for example 'await Authorize.jwt_required_async()'"
+    )
 
     def _has_token_in_denylist_callback(self) -> bool:
         """
@@ -213,9 +289,73 @@ class AuthJWT(AuthConfig):
                 "the '@AuthJWT.token_in_denylist_loader' if "
                 "authjwt_denylist_enabled is 'True'")
 
-        if self._token_in_denylist_callback.__func__(raw_token):
+        verdict = self._denylist_verdict
+        if verdict is not None and verdict[0] is raw_token:
+            revoked = verdict[1]
+            if isinstance(revoked, AuthJWTException):
+                raise revoked
+        else:
+            if self._token_in_denylist_callback_is_async:
+                raise RuntimeError(self._async_denylist_callback_message)
+            revoked = self._get_cached_verdict(raw_token)
+            if revoked is None:
+                generation = self._denylist_cache.generation
+                key = self._get_denylist_singleflight_key(raw_token,generation)
+                if key is None:
+                    revoked = self._token_in_denylist_callback(raw_token)
+                else:
+                    revoked = self._singleflight.do(key,self._token_in_denylist_callback,raw_token)
+                if inspect.isawaitable(revoked):
+                    if inspect.iscoroutine(revoked):
+                        revoked.close()
+                    raise RuntimeError(self._async_denylist_callback_message)
+                self._cache_verdict(raw_token,revoked,generation)
+
+        if revoked:
             raise RevokedTokenError(status_code=401,message="Token has been revoked")
 
+    def _get_denylist_singleflight_key(
+        self,
+        raw_token: Dict[str,Union[str,int,bool]],
+        generation: int
+    ) -> Optional[tuple]:
+        """
+        :param raw_token: decoded JWT
+        :param generation: generation of the denylist cache read before the callback is called,
+                           a check that starts after a revocation doesn't join one from before it
+
+        :return: key the denylist checks of the jti share, None when they are not coalesced
+        """
+        if not self._singleflight_enabled or 'jti' not in raw_token:
+            return None
+        return ('denylist', self._token_in_denylist_callback, raw_token['jti'], generation)
+
+    def _get_cached_verdict(self, raw_token: Dict[str,Union[str,int,bool]]) -> Optional[bool]:
+        """
+        :param raw_token: decoded JWT
+        :return: verdict of the denylist callback for the jti within authjwt_denylist_cache_ttl, None otherwise
+        """
+        if not self._denylist_cache_enabled or 'jti' not in raw_token:
+            return None
+        return self._denylist_cache.get(raw_token['jti'])
+
+    def _cache_verdict(self, raw_token: Dict[str,Union[str,int,bool]], revoked: bool, generation: int) -> None:
+        """
+        Keep the verdict of the denylist callback for authjwt_denylist_cache_ttl seconds,
+        unless a revocation invalidated the cache while the callback was running
+
+        :param raw_token: decoded JWT
+        :param revoked: result of the callback
+        :param generation: generation of the cache read before the callback was called
+        """
+        if self._denylist_cache_enabled and 'jti' in raw_token:
+            self._denylist_cache.set_if_current(
+                raw_token['jti'],
+                bool(revoked),
+                time.time() + self._denylist_cache_ttl,
+                generation
+            )
+
     def _get_expired_time(
         self,
         type_token: str,
@@ -637,37 +777,301 @@ class AuthJWT(AuthConfig):
 
     def _verified_token(self,encoded_token: str, issuer: Optional[str] = None) -> Dict[str,Union[str,int,bool]]:
         """
-        Verified token and catch all error from jwt package and return decode token
+        Verified token and catch all error from jwt package and return decode token.
+        the claims or the error are kept on this instance, so checking the same token
+        again (type, freshness, csrf, subject) doesn't decode it a second time
 
         :param encoded_token: token hash
         :param issuer: expected issuer in the JWT
 
         :return: raw data from the hash token in the form of a dictionary
         """
-        algorithms = self._decode_algorithms or [self._algorithm]
+        context = self._get_decoding_context()
+
+        memo = self._verified_claims
+        if memo is not None and memo[0] == encoded_token and memo[2] == context:
+            if isinstance(memo[3], AuthJWTException):
+                if memo[1] == issuer:
+                    raise memo[3]
+            elif (issuer is None or memo[1] == issuer) and not self._has_expired(memo[3]):
+                return memo[3]
 
         try:
-            unverified_headers = self.get_unverified_jwt_headers(encoded_token)
-        except Exception as err:
-            raise InvalidHeaderError(status_code=422,message=str(err))
+            key = self._get_singleflight_key(encoded_token,issuer,context)
+            if key is None:
+                raw_token = self._decode_or_get_cached(encoded_token,issuer,context)
+            else:
+                # every caller gets its own copy of the shared claims
+                raw_token = dict(self._singleflight.do(
+                    key,
+                    self._decode_or_get_cached,
+                    encoded_token,
+                    issuer,
+                    context
+                ))
+        except AuthJWTException as err:
+            # a token that is not valid yet may become valid later
+            if not isinstance(err.__context__, ImmatureSignatureError):
+                self._verified_claims = (encoded_token, issuer, context, err)
+            raise
+
+        self._verified_claims = (encoded_token, issuer, context, raw_token)
+        return raw_token
+
+    async def _verified_token_async(
+        self,
+        encoded_token: str,
+        issuer: Optional[str] = None
+    ) -> Dict[str,Union[str,int,bool]]:
+        """
+        _verified_token on the thread pool of the *_async methods, with
+        authjwt_singleflight_enabled concurrent verifications of the same token
+        on this event loop share one thread
+
+        :param encoded_token: token hash
+        :param issuer: expected issuer in the JWT
+
+        :return: raw data from the hash token in the form of a dictionary
+        """
+        loop = asyncio.get_event_loop()
+        executor = self._get_executor("async",self._async_max_workers)
+
+        context = self._get_decoding_context()
+        key = self._get_singleflight_key(encoded_token,issuer,context)
+        if key is None:
+            return await loop.run_in_executor(executor,self._verified_token,encoded_token,issuer)
 
         try:
-            secret_key = self._get_secret_key(unverified_headers['alg'],"decode")
-        except Exception:
+            raw_token = dict(await self._async_singleflight.do(
+                key,
+                lambda: loop.run_in_executor(executor,self._verified_token,encoded_token,issuer)
+            ))
+        except AuthJWTException as err:
+            if not isinstance(err.__context__, ImmatureSignatureError):
+                self._verified_claims = (encoded_token, issuer, context, err)
             raise
 
+        self._verified_claims = (encoded_token, issuer, context, raw_token)
+        return raw_token
+
+    def _get_singleflight_key(self, encoded_token: str, issuer: Optional[str], context: tuple) -> Optional[tuple]:
+        """
+        :param encoded_token: token hash
+        :param issuer: expected issuer in the JWT
+        :param context: decoding configuration the token is verified with
+
+        :return: key the verifications of the token share, None when they are not coalesced
+        """
+        if not self._singleflight_enabled:
+            return None
+        # oversized tokens are rejected by the decoding faster than they can be hashed
+        if self._max_token_length is not None and len(encoded_token) > self._max_token_length:
+            return None
+        return ('token', hashlib.sha256(encoded_token.encode('utf-8')).digest(), issuer, context)
+
+    def _decode_or_get_cached(
+        self,
+        encoded_token: str,
+        issuer: Optional[str],
+        context: tuple
+    ) -> Dict[str,Union[str,int,bool]]:
+        """
+        Decode the token, through the verified and rejected token caches when enabled
+
+        :param encoded_token: token hash
+        :param issuer: expected issuer in the JWT
+        :param context: decoding configuration the token is verified with
+
+        :return: raw data from the hash token in the form of a dictionary
+        """
+        if self._token_cache_enabled or self._rejected_token_cache_enabled:
+            return self._get_cached_token(encoded_token,issuer,context)
+        return self._decode_token(encoded_token,issuer)
+
+    def _get_cached_token(
+        self,
+        encoded_token: str,
+        issuer: Optional[str],
+        context: tuple
+    ) -> Dict[str,Union[str,int,bool]]:
+        """
+        Look up the token in the process wide verified and rejected token caches and
+        decode it on a miss. a verified entry never outlives the exp claim of the token
+        (minus leeway), a rejected token gets the same error again until its entry expires
+
+        :param encoded_token: token hash
+        :param issuer: expected issuer in the JWT
+        :param context: decoding configuration the token must have been verified with
+
+        :return: raw data from the hash token in the form of a dictionary
+        """
+        # oversized tokens are rejected by the decoding faster than they can be hashed
+        if self._max_token_length is not None and len(encoded_token) > self._max_token_length:
+            return self._decode_token(encoded_token,issuer)
+
+        key = hashlib.sha256(encoded_token.encode('utf-8')).digest()
+
+        if self._rejected_token_cache_enabled:
+            entry = self._rejected_token_cache.get(key)
+            if entry is not None and entry[0] == issuer and entry[1] == context:
+                error, status_code, message = entry[2]
+                raise error(status_code=status_code,message=message)
+
+        if self._token_cache_enabled:
+            entry = self._token_cache.get(key)
+            if entry is not None and (issuer is None or entry[0] == issuer) and entry[1] == context:
+                return dict(entry[2])
+
+        try:
+            raw_token = self._decode_token(encoded_token,issuer)
+        except (InvalidHeaderError, JWTDecodeError) as err:
+            # a token that is not valid yet (nbf) may be accepted later
+            if self._rejected_token_cache_enabled and not isinstance(err.__context__, ImmatureSignatureError):
+                self._rejected_token_cache.set(
+                    key,
+                    (issuer, context, (err.__class__, err.status_code, err.message)),
+                    time.time() + self._rejected_token_cache_ttl
+                )
+            raise
+
+        if self._token_cache_enabled:
+            expires_at = None
+            if 'exp' in raw_token:
+                expires_at = int(raw_token['exp']) - self._get_decode_leeway()
+
+            self._token_cache.set(key,(issuer, context, dict(raw_token)),expires_at)
+        return raw_token
+
+    def _decode_token(self,encoded_token: str, issuer: Optional[str] = None) -> Dict[str,Union[str,int,bool]]:
+        """
+        Decode and verify signature and claims of the token. the token is parsed once,
+        malformed, oversized or not allowed algorithm tokens are rejected before any
+        crypto work, and the header of that parse decides the key to verify the signature
+
+        :param encoded_token: token hash
+        :param issuer: expected issuer in the JWT
+
+        :return: raw data from the hash token in the form of a dictionary
+        """
+        algorithms = self._allowed_algorithms
+
         try:
-            return jwt.decode(
+            parsed = parse_token(
                 encoded_token,
-                secret_key,
+                algorithms=algorithms,
+                max_length=self._max_token_length,
+                max_header_length=self._max_header_length,
+                codec=self._json_codec
+            )
+        except InvalidAlgorithmError as err:
+            raise JWTDecodeError(status_code=422,message=str(err))
+        except Exception as err:
+            raise InvalidHeaderError(status_code=422,message=str(err))
+
+        algorithm = parsed.header['alg']
+
+        kid = parsed.header.get('kid')
+        # a token without kid is tried with the keys of the keyring
+        secret_key = None
+        if kid is not None or self._keyring is None or not self._keyring.has_key_for(algorithm):
+            try:
+                secret_key = self._get_secret_key(algorithm,"decode",kid)
+            except InvalidKeyError as err:
+                raise JWTDecodeError(status_code=422,message=str(err))
+
+        try:
+            if algorithm not in self._algorithms:
+                raise InvalidAlgorithmError('Algorithm not supported')
+
+            if secret_key is None:
+                self._verify_signature_with_keyring(parsed,algorithm)
+            else:
+                self._verify_signature(parsed,algorithm,secret_key)
+            raw_token = load_payload(parsed,self._json_codec)
+            validate_claims(
+                raw_token,
                 issuer=issuer,
                 audience=self._decode_audience,
-                leeway=self._decode_leeway,
-                algorithms=algorithms
+                leeway=self._get_decode_leeway()
             )
+            return raw_token
         except Exception as err:
             raise JWTDecodeError(status_code=422,message=str(err))
 
+    def _verify_signature(self, parsed: ParsedToken, algorithm: str, secret_key: Any) -> None:
+        """
+        :param parsed: parsed token
+        :param algorithm: alg header of the token
+        :param secret_key: secret, HMAC engine or public key to verify the signature with
+        """
+        if isinstance(secret_key, HMACEngine):
+            engine = secret_key
+        elif self._hmac_fast_path and algorithm in HMACEngine.digests:
+            engine = self._get_hmac_engine(secret_key)
+        else:
+            verify_signature(parsed,self._algorithms[algorithm],secret_key)
+            return
+
+        if not engine.verify(algorithm,parsed.signing_input,parsed.signature):
+            raise InvalidSignatureError('Signature verification failed')
+
+    def _verify_signature_with_keyring(self, parsed: ParsedToken, algorithm: str) -> None:
+        """
+        Verify a token without kid with the key that last verified such a token,
+        then with the other keys of the keyring for the algorithm
+
+        :param parsed: parsed token
+        :param algorithm: alg header of the token
+        """
+        for kid, key in self._keyring.get_fallback_keys(algorithm):
+            try:
+                self._verify_signature(parsed,algorithm,key)
+            except InvalidSignatureError:
+                continue
+            self._keyring.last_kid = kid
+            return
+        raise InvalidSignatureError('Signature verification failed')
+
+    def _get_decoding_context(self) -> tuple:
+        """
+        Configuration values that decide whether a token verifies, a verified
+        token can only be reused while these stay the same. lists are turned into
+        tuples, the context is part of the keys of the singleflight calls
+        """
+        decode_algorithms, audience = self._decode_algorithms, self._decode_audience
+        return (
+            self._secret_key,
+            self._public_key,
+            self._algorithm,
+            tuple(decode_algorithms) if decode_algorithms is not None else None,
+            audience if audience is None or isinstance(audience,str) else tuple(audience),
+            self._decode_leeway,
+            self._max_token_length,
+            self._max_header_length,
+            self._jwks.key_set if self._jwks is not None else None,
+            self._keyring
+        )
+
+    def _has_expired(self, raw_token: Dict[str,Union[str,int,bool]]) -> bool:
+        """
+        Check the exp claim of an already verified token the same way as jwt.decode does
+
+        :param raw_token: decoded JWT
+        :return: True if the token is no longer valid
+        """
+        if 'exp' not in raw_token:
+            return False
+
+        return int(raw_token['exp']) < int(time.time()) - self._get_decode_leeway()
+
+    def _get_decode_leeway(self) -> Union[int,float]:
+        """
+        :return: authjwt_decode_leeway in seconds
+        """
+        if isinstance(self._decode_leeway, timedelta):
+            return self._decode_leeway.total_seconds()
+        return self._decode_leeway
+
     def jwt_required(
         self,
         auth_from: str = "request",
@@ -690,16 +1094,11 @@ class AuthJWT(AuthConfig):
             else: self._verify_jwt_in_request(token,'access','websocket')
 
         if auth_from == "request":
-            if len(self._token_location) == 2:
-                if self._token and self.jwt_in_headers:
-                    self._verify_jwt_in_request(self._token,'access','headers')
-                if not self._token and self.jwt_in_cookies:
-                    self._verify_and_get_jwt_in_cookies('access',self._request)
-            else:
-                if self.jwt_in_headers:
-                    self._verify_jwt_in_request(self._token,'access','headers')
-                if self.jwt_in_cookies:
-                    self._verify_and_get_jwt_in_cookies('access',self._request)
+            location = self._token_location_extractor(self)
+            if location == 'headers':
+                self._verify_jwt_in_request(self._token,'access','headers')
+            if location == 'cookies':
+                self._verify_and_get_jwt_in_cookies('access',self._request)
 
     def jwt_optional(
         self,
@@ -725,16 +1124,11 @@ class AuthJWT(AuthConfig):
             else: self._verify_jwt_optional_in_request(token)
 
         if auth_from == "request":
-            if len(self._token_location) == 2:
-                if self._token and self.jwt_in_headers:
-                    self._verify_jwt_optional_in_request(self._token)
-                if not self._token and self.jwt_in_cookies:
-                    self._verify_and_get_jwt_optional_in_cookies(self._request)
-            else:
-                if self.jwt_in_headers:
-                    self._verify_jwt_optional_in_request(self._token)
-                if self.jwt_in_cookies:
-                    self._verify_and_get_jwt_optional_in_cookies(self._request)
+            location = self._token_location_extractor(self)
+            if location == 'headers':
+                self._verify_jwt_optional_in_request(self._token)
+            if location == 'cookies':
+                self._verify_and_get_jwt_optional_in_cookies(self._request)
 
     def jwt_refresh_token_required(
         self,
@@ -758,16 +1152,11 @@ class AuthJWT(AuthConfig):
             else: self._verify_jwt_in_request(token,'refresh','websocket')
 
         if auth_from == "request":
-            if len(self._token_location) == 2:
-                if self._token and self.jwt_in_headers:
-                    self._verify_jwt_in_request(self._token,'refresh','headers')
-                if not self._token and self.jwt_in_cookies:
-                    self._verify_and_get_jwt_in_cookies('refresh',self._request)
-            else:
-                if self.jwt_in_headers:
-                    self._verify_jwt_in_request(self._token,'refresh','headers')
-                if self.jwt_in_cookies:
-                    self._verify_and_get_jwt_in_cookies('refresh',self._request)
+            location = self._token_location_extractor(self)
+            if location == 'headers':
+                self._verify_jwt_in_request(self._token,'refresh','headers')
+            if location == 'cookies':
+                self._verify_and_get_jwt_in_cookies('refresh',self._request)
 
     def fresh_jwt_required(
         self,
@@ -791,16 +1180,191 @@ class AuthJWT(AuthConfig):
             else: self._verify_jwt_in_request(token,'access','websocket',True)
 
         if auth_from == "request":
-            if len(self._token_location) == 2:
-                if self._token and self.jwt_in_headers:
-                    self._verify_jwt_in_request(self._token,'access','headers',True)
-                if not self._token and self.jwt_in_cookies:
-                    self._verify_and_get_jwt_in_cookies('access',self._request,fresh=True)
+            location = self._token_location_extractor(self)
+            if location == 'headers':
+                self._verify_jwt_in_request(self._token,'access','headers',True)
+            if location == 'cookies':
+                self._verify_and_get_jwt_in_cookies('access',self._request,fresh=True)
+
+    async def jwt_required_async(
+        self,
+        auth_from: str = "request",
+        token: Optional[str] = None,
+        websocket: Optional[WebSocket] = None,
+        csrf_token: Optional[str] = None,
+    ) -> None:
+        """
+        Awaitable jwt_required, signature verification of asymmetric algorithms and
+        sync denylist callbacks run on a thread pool of authjwt_async_max_workers threads
+        and async denylist callbacks are awaited
+
+        :param auth_from: for identity get token from HTTP or WebSocket
+        :param token: the encoded JWT, it's required if the protected endpoint use WebSocket to
+                      authorization and get token from Query Url or Path
+        :param websocket: an instance of WebSocket, it's required if protected endpoint use a cookie to authorization
+        :param csrf_token: the CSRF double submit token. since WebSocket cannot add specifying additional headers
+                           its must be passing csrf_token manually and can achieve by Query Url or Path
+        """
+        await self._prefetch_jwt(auth_from,token,websocket,'access',self._decode_issuer)
+        self.jwt_required(auth_from,token,websocket,csrf_token)
+
+    async def jwt_optional_async(
+        self,
+        auth_from: str = "request",
+        token: Optional[str] = None,
+        websocket: Optional[WebSocket] = None,
+        csrf_token: Optional[str] = None,
+    ) -> None:
+        """
+        Awaitable jwt_optional, see jwt_required_async
+
+        :param auth_from: for identity get token from HTTP or WebSocket
+        :param token: the encoded JWT, it's required if the protected endpoint use WebSocket to
+                      authorization and get token from Query Url or Path
+        :param websocket: an instance of WebSocket, it's required if protected endpoint use a cookie to authorization
+        :param csrf_token: the CSRF double submit token. since WebSocket cannot add specifying additional headers
+                           its must be passing csrf_token manually and can achieve by Query Url or Path
+        """
+        await self._prefetch_jwt(auth_from,token,websocket,'access')
+        self.jwt_optional(auth_from,token,websocket,csrf_token)
+
+    async def jwt_refresh_token_required_async(
+        self,
+        auth_from: str = "request",
+        token: Optional[str] = None,
+        websocket: Optional[WebSocket] = None,
+        csrf_token: Optional[str] = None,
+    ) -> None:
+        """
+        Awaitable jwt_refresh_token_required, see jwt_required_async
+
+        :param auth_from: for identity get token from HTTP or WebSocket
+        :param token: the encoded JWT, it's required if the protected endpoint use WebSocket to
+                      authorization and get token from Query Url or Path
+        :param websocket: an instance of WebSocket, it's required if protected endpoint use a cookie to authorization
+        :param csrf_token: the CSRF double submit token. since WebSocket cannot add specifying additional headers
+                           its must be passing csrf_token manually and can achieve by Query Url or Path
+        """
+        await self._prefetch_jwt(auth_from,token,websocket,'refresh')
+        self.jwt_refresh_token_required(auth_from,token,websocket,csrf_token)
+
+    async def fresh_jwt_required_async(
+        self,
+        auth_from: str = "request",
+        token: Optional[str] = None,
+        websocket: Optional[WebSocket] = None,
+        csrf_token: Optional[str] = None,
+    ) -> None:
+        """
+        Awaitable fresh_jwt_required, see jwt_required_async
+
+        :param auth_from: for identity get token from HTTP or WebSocket
+        :param token: the encoded JWT, it's required if the protected endpoint use WebSocket to
+                      authorization and get token from Query Url or Path
+        :param websocket: an instance of WebSocket, it's required if protected endpoint use a cookie to authorization
+        :param csrf_token: the CSRF double submit token. since WebSocket cannot add specifying additional headers
+                           its must be passing csrf_token manually and can achieve by Query Url or Path
+        """
+        await self._prefetch_jwt(auth_from,token,websocket,'access',self._decode_issuer)
+        self.fresh_jwt_required(auth_from,token,websocket,csrf_token)
+
+    async def _prefetch_jwt(
+        self,
+        auth_from: str,
+        token: Optional[str],
+        websocket: Optional[WebSocket],
+        type_token: str,
+        issuer: Optional[str] = None
+    ) -> None:
+        """
+        Verify the token the sync checks will look at and resolve the denylist callback
+        for it, both are kept on this instance so the sync checks that follow don't block
+        the event loop. errors are kept too and raised by the sync checks
+
+        :param auth_from: for identity get token from HTTP or WebSocket
+        :param token: the encoded JWT from Query Url or Path
+        :param websocket: an instance of WebSocket
+        :param type_token: indicate token is access or refresh token
+        :param issuer: expected issuer in the JWT
+        """
+        cookie_key = self._access_cookie_key if type_token == 'access' else self._refresh_cookie_key
+        request = getattr(self,'_request',None)
+
+        candidates = []
+        if auth_from == "websocket":
+            candidates.append(websocket.cookies.get(cookie_key) if websocket else token)
+        if auth_from == "request":
+            if self.jwt_in_headers:
+                candidates.append(self._token)
+            if self.jwt_in_cookies and request is not None:
+                candidates.append(request.cookies.get(cookie_key))
+
+        token = next((candidate for candidate in candidates if candidate),None)
+        if not token:
+            return
+
+        try:
+            if self._verify_off_thread:
+                raw_token = await self._verified_token_async(token,issuer)
+            else:
+                raw_token = self._verified_token(token,issuer)
+        except AuthJWTException:
+            return
+
+        if (
+            raw_token['type'] in self._denylist_token_checks
+            and self._denylist_enabled and self._has_token_in_denylist_callback()
+        ):
+            revoked = self._get_cached_verdict(raw_token)
+            if revoked is None:
+                generation = self._denylist_cache.generation
+                key = self._get_denylist_singleflight_key(raw_token,generation)
+                if key is None:
+                    revoked = await self._call_denylist_callback_async(raw_token)
+                else:
+                    revoked = await self._async_singleflight.do(
+                        key,
+                        lambda: self._call_denylist_callback_async(raw_token)
+                    )
+                # a check that timed out is not a verdict
+                if not isinstance(revoked, AuthJWTException):
+                    self._cache_verdict(raw_token,revoked,generation)
+            self._denylist_verdict = (raw_token, revoked)
+
+    async def _call_denylist_callback_async(
+        self,
+        raw_token: Dict[str,Union[str,int,bool]]
+    ) -> Union[bool,AuthJWTException]:
+        """
+        Await an async denylist callback, or call a sync one on the thread pool of
+        the *_async methods. when authjwt_denylist_callback_timeout passes first the
+        token is treated as revoked
+
+        :param raw_token: decoded JWT
+        :return: result of the callback, or the error for a check that timed out
+        """
+        callback = self._token_in_denylist_callback
+        timeout = self._denylist_callback_timeout
+
+        try:
+            if self._token_in_denylist_callback_is_async:
+                revoked = await asyncio.wait_for(callback(raw_token),timeout)
             else:
-                if self.jwt_in_headers:
-                    self._verify_jwt_in_request(self._token,'access','headers',True)
-                if self.jwt_in_cookies:
-                    self._verify_and_get_jwt_in_cookies('access',self._request,fresh=True)
+                revoked = await asyncio.wait_for(
+                    asyncio.get_event_loop().run_in_executor(
+                        self._get_executor("async",self._async_max_workers),
+                        callback,
+                        raw_token
+                    ),
+                    timeout
+                )
+                # a sync callable that returns an awaitable
+                if inspect.isawaitable(revoked):
+                    revoked = await asyncio.wait_for(revoked,timeout)
+        except asyncio.TimeoutError:
+            return RevokedTokenError(status_code=401,message="Token revocation check timed out")
+
+        return revoked
 
     def get_raw_jwt(self,encoded_token: Optional[str] = None) -> Optional[Dict[str,Union[str,int,bool]]]:
         """
@@ -845,4 +1409,160 @@ class AuthJWT(AuthConfig):
         """
         encoded_token = encoded_token or self._token
 
-        return jwt.get_unverified_header(encoded_token)
+        return parse_token(
+            encoded_token,
+            max_length=self._max_token_length,
+            max_header_length=self._max_header_length,
+            codec=self._json_codec
+        ).header
+
+    def verify_many(
+        self,
+        tokens: Iterable[str],
+        type_token: str = "access",
+        fresh: Optional[bool] = False,
+        executor: Optional[Executor] = None
+    ) -> List[Union[Dict[str,Union[str,int,bool]],AuthJWTException]]:
+        """
+        Verify many tokens with the same checks as jwt_required, jwt_refresh_token_required
+        and fresh_jwt_required. signatures are verified on a thread pool of
+        authjwt_verify_max_workers threads, or on the executor given, when an asymmetric
+        algorithm is allowed. denylist, type and freshness are checked in this process,
+        an async token_in_denylist_callback can't be called and raises RuntimeError
+
+        :param tokens: the encoded JWTs
+        :param type_token: indicate tokens must be access or refresh token
+        :param fresh: check freshness of the access tokens if True
+        :param executor: a ThreadPoolExecutor or ProcessPoolExecutor to verify the signatures on
+
+        :return: for each token its claims or the exception it was rejected with
+        """
+        if type_token not in ['access','refresh']:
+            raise ValueError("type_token must be between 'access' or 'refresh'")
+
+        # checked before any token, an async callback would abort the batch halfway
+        if (
+            self._denylist_enabled and self._has_token_in_denylist_callback()
+            and self._token_in_denylist_callback_is_async
+        ):
+            raise RuntimeError(
+                "verify_many can't call an async token_in_denylist_callback, "
+                "check the tokens with the *_async methods or register a sync denylist backend"
+            )
+
+        tokens = list(tokens)
+        issuer = self._decode_issuer if type_token == 'access' else None
+        if executor is None and self._verify_off_thread:
+            executor = self._get_executor("verify",self._verify_max_workers)
+
+        # a thread gets the class itself, another process looks the profile up by name
+        config_class = type(self) if executor is None or isinstance(executor,ThreadPoolExecutor) else None
+        verify = partial(_verify_token_in_worker,self._get_worker_config(),issuer=issuer,config_class=config_class)
+
+        if executor is None:
+            verified = map(verify,tokens)
+        else:
+            workers = getattr(executor,'_max_workers',None) or 1
+            verified = executor.map(verify,tokens,chunksize=max(1,len(tokens) // (workers * 4)))
+
+        results = []
+        for raw_token, error in verified:
+            try:
+                if error is not None:
+                    err_class, status_code, message = error
+                    raise err_class(status_code=status_code,message=message)
+
+                if raw_token['type'] in self._denylist_token_checks:
+                    self._check_token_is_revoked(raw_token)
+
+                if raw_token['type'] != type_token:
+                    msg = "Only {} tokens are allowed".format(type_token)
+                    if type_token == 'access':
+                        raise AccessTokenRequired(status_code=422,message=msg)
+                    if type_token == 'refresh':
+                        raise RefreshTokenRequired(status_code=422,message=msg)
+
+                if fresh and not raw_token['fresh']:
+                    raise FreshTokenRequired(status_code=401,message="Fresh token required")
+            except AuthJWTException as err:
+                results.append(err)
+            else:
+                results.append(raw_token)
+
+        return results
+
+    def _get_worker_config(self) -> Dict[str,Any]:
+        """
+        Configuration values needed to verify a token in another thread or process
+        """
+        return {
+            "_secret_key": self._secret_key,
+            "_public_key": self._public_key,
+            "_algorithm": self._algorithm,
+            "_decode_algorithms": self._decode_algorithms,
+            "_allowed_algorithms": self._allowed_algorithms,
+            "_decode_audience": self._decode_audience,
+            "_decode_leeway": self._decode_leeway,
+            "_max_token_length": self._max_token_length,
+            "_max_header_length": self._max_header_length,
+            "_hmac_fast_path": self._hmac_fast_path,
+            "_json_codec": self._json_codec,
+            "_jwks": self._jwks,
+            "_keyring": self._keyring,
+            "_profile_name": self._profile_name,
+            "_profile_base": self._profile_base
+        }
+
+    def _get_executor(self, name: str, max_workers: Optional[int]) -> ThreadPoolExecutor:
+        """
+        Return the thread pool of this package with the name and number of threads,
+        configs and profiles with the same number share it. a pool is never shut down,
+        a request may be about to submit to it
+
+        :param name: verify for verify_many or async for the *_async methods
+        :param max_workers: number of threads, None for the number of processors
+        """
+        key = (name, max_workers or os.cpu_count() or 1)
+        executor = self._executors.get(key)
+        if executor is None:
+            with _executors_lock:
+                executor = self._executors.get(key)
+                if executor is None:
+                    executor = ThreadPoolExecutor(max_workers=key[1],thread_name_prefix="authjwt-" + name)
+                    self._executors[key] = executor
+        return executor
+
+def _verify_token_in_worker(
+    config: Dict[str,Any],
+    encoded_token: str,
+    issuer: Optional[str] = None,
+    config_class: Optional[type] = None
+) -> Tuple[Optional[Dict[str,Union[str,int,bool]]],Optional[tuple]]:
+    """
+    Verify one token for AuthJWT.verify_many, runs on a thread or in another process.
+    errors are returned as class, status code and message because
+    the exceptions of this package can't be pickled
+
+    :param config: configuration values from AuthJWT._get_worker_config
+    :param encoded_token: token hash
+    :param issuer: expected issuer in the JWT
+    :param config_class: class of the instance of verify_many, None in another process
+
+    :return: claims of the token and None, or None and the error
+    """
+    if config_class is None:
+        # a profile can't be pickled, the one of this process keeps its parsed keys.
+        # a process without it verifies with the config alone and never registers it
+        config_class = config["_profile_base"] or AuthJWT
+        if config["_profile_name"] is not None:
+            try:
+                config_class = config_class.profile(config["_profile_name"],create=False)
+            except KeyError:
+                pass
+    auth = config_class()
+    auth.__dict__.update(config)
+
+    try:
+        return auth._verified_token(encoded_token,issuer), None
+    except AuthJWTException as err:
+        return None, (err.__class__, err.status_code, err.message)
@@ -0,0 +1,140 @@
+import time, weakref, threading
+from collections import OrderedDict, namedtuple
+from typing import Any, Hashable, Optional
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+class TTLCache:
+    """
+    Thread safe LRU cache where every entry can have its own expiry time.
+    Expired entries are dropped when they are looked up or pushed out by new ones
+    """
+    def __init__(self, maxsize: int):
+        """
+        :param maxsize: maximum number of entries kept in the cache
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Return the value stored for key or default when missing or expired
+
+        :param key: key of the entry
+        :param default: value returned when the entry is missing
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at is None or expires_at > time.time():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key: Hashable, value: Any, expires_at: Optional[float] = None) -> None:
+        """
+        Store value for key, evicting the least recently used entry when full
+
+        :param key: key of the entry
+        :param value: value to store
+        :param expires_at: seconds since the Epoch after which the entry is gone, None to keep it until evicted
+        """
+        if expires_at is not None and expires_at <= time.time():
+            return
+
+        with self._lock:
+            self._store(key, value, expires_at)
+
+    def _store(self, key: Hashable, value: Any, expires_at: Optional[float]) -> None:
+        # the lock must be held
+        self._data[key] = (value, expires_at)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        """
+        Remove the entry for key if present
+
+        :param key: key of the entry
+        """
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """
+        Remove all entries and reset the counters
+        """
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+
+    def info(self) -> CacheInfo:
+        """
+        :return: hits, misses, maxsize and current size of the cache
+        """
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.maxsize, len(self._data))
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+class DenylistCache(TTLCache):
+    """
+    TTLCache of denylist verdicts by jti. every invalidation bumps a generation, a
+    verdict looked up before an invalidation is not stored after it, so a revocation
+    never races with a lookup that read the denylist before the revocation was written
+    """
+    def __init__(self, maxsize: int):
+        super().__init__(maxsize)
+        self.generation = 0
+        _denylist_caches.add(self)
+
+    def set_if_current(self, key: Hashable, value: Any, expires_at: Optional[float], generation: int) -> None:
+        """
+        Store value for key unless the cache was invalidated since generation was read
+
+        :param key: key of the entry
+        :param value: value to store
+        :param expires_at: seconds since the Epoch after which the entry is gone
+        :param generation: the generation read before the value was looked up
+        """
+        if expires_at is not None and expires_at <= time.time():
+            return
+
+        with self._lock:
+            if generation == self.generation:
+                self._store(key, value, expires_at)
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        """
+        Remove the entry for key, or every entry when key is None
+
+        :param key: key of the entry
+        """
+        with self._lock:
+            self.generation += 1
+            if key is None:
+                self._data.clear()
+            else:
+                self._data.pop(key, None)
+
+_denylist_caches = weakref.WeakSet()
+
+def invalidate_denylist_caches(jti: Optional[str] = None) -> None:
+    """
+    Drop the cached verdict of jti, or every cached verdict when jti is None, from
+    the denylist caches of every AuthJWT class. called by the denylist backends when
+    they revoke or unrevoke, call it after revoking tokens some other way
+
+    :param jti: unique identifier of the token
+    """
+    for cache in list(_denylist_caches):
+        cache.invalidate(jti)
@@ -0,0 +1,97 @@
+"""
+JSON codecs for the header and claims of a token. Every codec must give the same
+bytes on encode and the same objects on decode as the stdlib json module does with
+the options jwt.encode and jwt.decode use
+"""
+import re, json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+class JSONCodec:
+    """
+    Codec backed by the stdlib json module
+    """
+    name = "json"
+
+    def dumps(self, obj: Any) -> bytes:
+        """
+        :param obj: header or claims of a token
+        :return: compact json encoded in utf-8
+        """
+        return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+    def loads(self, data: bytes) -> Any:
+        """
+        :param data: json encoded in utf-8
+        :return: decoded header or claims
+        """
+        return json.loads(data.decode('utf-8'))
+
+# types orjson serialize exactly like the stdlib, floats differ in exponent
+# notation and enum, uuid, dataclass or datetime values are refused by the stdlib
+_plain_types = frozenset((dict, list, tuple, str, int, bool, type(None)))
+
+# orjson turns integers outside 64 bits into floats, any run of 19 digits goes to the stdlib.
+# digits are mapped to 0 and everything else to a space, so a substring search finds the run
+_digits_table = bytes(0x30 if 0x30 <= i <= 0x39 else 0x20 for i in range(256))
+_long_digits = b"0" * 19
+
+# the stdlib escapes DEL and everything outside ascii, orjson writes them as they are
+_escaped_by_stdlib = re.compile(rb"[\x7f-\xff]")
+
+def _is_plain(obj: Any) -> bool:
+    stack = [obj]
+    while stack:
+        obj = stack.pop()
+        cls = type(obj)
+        if cls not in _plain_types:
+            return False
+        if cls is dict:
+            stack.extend(obj.values())
+        elif cls is list or cls is tuple:
+            stack.extend(obj)
+    return True
+
+class OrjsonCodec(JSONCodec):
+    """
+    Codec backed by orjson, anything orjson would encode or decode differently
+    is handed to the stdlib json module
+    """
+    name = "orjson"
+
+    def __init__(self):
+        if orjson is None:
+            raise RuntimeError("orjson must be installed to use OrjsonCodec")
+
+    def dumps(self, obj: Any) -> bytes:
+        if _is_plain(obj):
+            try:
+                data = orjson.dumps(obj)
+            except TypeError:
+                # keys that are not strings, integers over 64 bits or too deep nesting
+                pass
+            else:
+                if not _escaped_by_stdlib.search(data):
+                    return data
+        return super().dumps(obj)
+
+    def loads(self, data: bytes) -> Any:
+        if _long_digits in data.translate(_digits_table):
+            return super().loads(data)
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # NaN and Infinity, lone surrogates and invalid input
+            return super().loads(data)
+
+json_codecs = {"json": JSONCodec, "orjson": OrjsonCodec}
+
+def get_default_json_codec() -> JSONCodec:
+    """
+    :return: orjson codec when orjson is installed, stdlib codec otherwise
+    """
+    return OrjsonCodec() if orjson is not None else JSONCodec()
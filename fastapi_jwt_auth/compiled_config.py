@@ -0,0 +1,73 @@
+"""
+The configuration of AuthConfig compiled into one immutable snapshot, with the
+values requests derive from it computed once. a snapshot is published with one
+assignment, so a request sees the configuration before a reload or after it and
+never a mix of both
+"""
+import threading
+from contextlib import contextmanager
+from types import MappingProxyType
+from typing import Any, Iterator, Mapping
+
+_local = threading.local()
+_generation_lock = threading.Lock()
+# held while a config is loaded or compiled, a snapshot is never compiled from half a load
+compile_lock = threading.RLock()
+
+class CompiledConfig:
+    """
+    Immutable configuration values of a class and the values derived from them.
+    an AuthJWT instance of a request copies the snapshot published when it's made
+    """
+    __slots__ = ('attributes', 'generation')
+
+    def __init__(self, attributes: Mapping[str,Any], generation: int):
+        """
+        :param attributes: configuration and derived values by attribute name
+        :param generation: ConfigMeta.generation the values were read at
+        """
+        object.__setattr__(self, 'attributes', MappingProxyType(dict(attributes)))
+        object.__setattr__(self, 'generation', generation)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("CompiledConfig is immutable")
+
+class ConfigMeta(type):
+    """
+    Metaclass of AuthConfig, assigning or deleting a class attribute makes the
+    compiled snapshots stale, they are compiled again by the next instance.
+    assignments made inside deferred_compile count once, when it's done
+    """
+    generation = 0
+    # attributes that change while requests run and are not part of the snapshot
+    untracked = frozenset({'_compiled_config', '_hmac_engine', '_executors'})
+
+    def __setattr__(cls, name: str, value: Any) -> None:
+        super().__setattr__(name, value)
+        if name not in ConfigMeta.untracked and not getattr(_local, 'depth', 0):
+            ConfigMeta.bump()
+
+    def __delattr__(cls, name: str) -> None:
+        super().__delattr__(name)
+        if name not in ConfigMeta.untracked and not getattr(_local, 'depth', 0):
+            ConfigMeta.bump()
+
+    @staticmethod
+    def bump() -> None:
+        with _generation_lock:
+            ConfigMeta.generation += 1
+
+@contextmanager
+def deferred_compile() -> Iterator[None]:
+    """
+    Assignments on this thread don't make the snapshots stale until the block
+    is left, requests keep using the published snapshot meanwhile
+    """
+    with compile_lock:
+        _local.depth = getattr(_local, 'depth', 0) + 1
+        try:
+            yield
+        finally:
+            _local.depth -= 1
+            if not _local.depth:
+                ConfigMeta.bump()
@@ -1,10 +1,13 @@
 from datetime import timedelta
-from typing import Optional, Union, Sequence, List
+from fastapi_jwt_auth.codec import JSONCodec, json_codecs
+from fastapi_jwt_auth.jwks import JWKS
+from typing import Optional, Union, Sequence, List, Dict
 from pydantic import (
     BaseModel,
     validator,
     StrictBool,
     StrictInt,
+    StrictFloat,
     StrictStr
 )
 
@@ -13,14 +16,27 @@ class LoadConfig(BaseModel):
     authjwt_secret_key: Optional[StrictStr] = None
     authjwt_public_key: Optional[StrictStr] = None
     authjwt_private_key: Optional[StrictStr] = None
+    authjwt_key_id: Optional[StrictStr] = None
+    authjwt_verify_keys: Optional[Dict[StrictStr,StrictStr]] = None
+    authjwt_secret_key_file: Optional[StrictStr] = None
+    authjwt_private_key_file: Optional[StrictStr] = None
+    authjwt_public_key_file: Optional[StrictStr] = None
+    authjwt_key_reload_interval: Optional[Union[StrictInt,StrictFloat]] = 5
     authjwt_algorithm: Optional[StrictStr] = "HS256"
     authjwt_decode_algorithms: Optional[List[StrictStr]] = None
     authjwt_decode_leeway: Optional[Union[StrictInt,timedelta]] = 0
     authjwt_encode_issuer: Optional[StrictStr] = None
     authjwt_decode_issuer: Optional[StrictStr] = None
     authjwt_decode_audience: Optional[Union[StrictStr,Sequence[StrictStr]]] = None
+    authjwt_hmac_fast_path: Optional[StrictBool] = False
+    authjwt_json_codec: Optional[Union[StrictStr,JSONCodec]] = None
+    authjwt_verify_max_workers: Optional[StrictInt] = None
+    authjwt_async_max_workers: Optional[StrictInt] = None
+    authjwt_max_token_length: Optional[StrictInt] = 8192
+    authjwt_max_header_length: Optional[StrictInt] = 1024
     authjwt_denylist_enabled: Optional[StrictBool] = False
     authjwt_denylist_token_checks: Optional[Sequence[StrictStr]] = {'access','refresh'}
+    authjwt_denylist_callback_timeout: Optional[Union[StrictInt,StrictFloat]] = None
     authjwt_header_name: Optional[StrictStr] = "Authorization"
     authjwt_header_type: Optional[StrictStr] = "Bearer"
     authjwt_access_token_expires: Optional[Union[StrictBool,StrictInt,timedelta]] = timedelta(minutes=15)
@@ -43,6 +59,23 @@ class LoadConfig(BaseModel):
     authjwt_access_csrf_header_name: Optional[StrictStr] = "X-CSRF-Token"
     authjwt_refresh_csrf_header_name: Optional[StrictStr] = "X-CSRF-Token"
     authjwt_csrf_methods: Optional[Sequence[StrictStr]] = {'POST','PUT','PATCH','DELETE'}
+    # option for verified token cache
+    authjwt_token_cache_enabled: Optional[StrictBool] = False
+    authjwt_token_cache_size: Optional[StrictInt] = 1024
+    # option for rejected token cache
+    authjwt_rejected_token_cache_enabled: Optional[StrictBool] = False
+    authjwt_rejected_token_cache_size: Optional[StrictInt] = 1024
+    authjwt_rejected_token_cache_ttl: Optional[StrictInt] = 10
+    # option for denylist verdict cache
+    authjwt_denylist_cache_enabled: Optional[StrictBool] = False
+    authjwt_denylist_cache_size: Optional[StrictInt] = 1024
+    authjwt_denylist_cache_ttl: Optional[Union[StrictInt,StrictFloat]] = 1
+    # option for coalescing concurrent verifications
+    authjwt_singleflight_enabled: Optional[StrictBool] = False
+    # option for key sets of identity providers
+    authjwt_jwks: Optional[Union[StrictStr,JWKS]] = None
+    authjwt_jwks_refresh_interval: Optional[StrictInt] = 300
+    authjwt_jwks_max_stale: Optional[StrictInt] = 86400
 
     @validator('authjwt_access_token_expires')
     def validate_access_token_expires(cls, v):
@@ -62,6 +95,12 @@ class LoadConfig(BaseModel):
             raise ValueError("The 'authjwt_denylist_token_checks' must be between 'access' or 'refresh'")
         return v
 
+    @validator('authjwt_denylist_callback_timeout','authjwt_denylist_cache_ttl','authjwt_key_reload_interval')
+    def validate_denylist_callback_timeout(cls, v, field):
+        if v is not None and v <= 0:
+            raise ValueError("The '{}' must be greater than 0".format(field.name))
+        return v
+
     @validator('authjwt_token_location', each_item=True)
     def validate_token_location(cls, v):
         if v not in ['headers','cookies']:
@@ -80,6 +119,41 @@ class LoadConfig(BaseModel):
             raise ValueError("The 'authjwt_csrf_methods' must be between http request methods")
         return v.upper()
 
+    @validator('authjwt_json_codec')
+    def validate_json_codec(cls, v):
+        if isinstance(v, str):
+            if v not in json_codecs:
+                raise ValueError("The 'authjwt_json_codec' must be between 'json' or 'orjson'")
+            try:
+                return json_codecs[v]()
+            except RuntimeError as err:
+                raise ValueError(str(err))
+        return v
+
+    @validator(
+        'authjwt_max_token_length',
+        'authjwt_max_header_length',
+        'authjwt_verify_max_workers',
+        'authjwt_async_max_workers',
+        'authjwt_jwks_refresh_interval'
+    )
+    def validate_max_length(cls, v, field):
+        if v is not None and v < 1:
+            raise ValueError("The '{}' must be greater than 0".format(field.name))
+        return v
+
+    @validator(
+        'authjwt_token_cache_size',
+        'authjwt_rejected_token_cache_size',
+        'authjwt_rejected_token_cache_ttl',
+        'authjwt_denylist_cache_size'
+    )
+    def validate_cache_option(cls, v, field):
+        if v < 1:
+            raise ValueError("The '{}' must be greater than 0".format(field.name))
+        return v
+
     class Config:
         min_anystr_length = 1
         anystr_strip_whitespace = True
+        arbitrary_types_allowed = True
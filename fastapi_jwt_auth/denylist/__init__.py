@@ -0,0 +1,10 @@
+"""Denylist backends that can be registered with AuthJWT.token_in_denylist_loader"""
+
+from .base import DenylistBackend
+from .memory import MemoryDenylist
+from .shared import SharedMemoryDenylist
+from .sqlite import SQLiteDenylist
+from .watermark import MemoryWatermarks, SubjectWatermarks
+from .redis import AsyncRedisDenylist, AsyncRedisWatermarks, RedisDenylist, RedisWatermarks
+from .bloom import AsyncBloomDenylist, BloomDenylist, BloomFilter
+from .batching import BatchingDenylist
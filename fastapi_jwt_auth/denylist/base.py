@@ -0,0 +1,92 @@
+from typing import Any, Dict, List, Optional, Union
+
+class DenylistBackend:
+    """
+    Base class of the denylist backends. an instance is the callback registered with
+    AuthJWT.token_in_denylist_loader, it's called with the decoded JWT and returns
+    True when the jti of the token has been revoked. backends implement is_revoked,
+    revoke_jti and unrevoke_jti, the helpers return what those return so they can be
+    awaited when a backend implements them as coroutines. revoke_jti and unrevoke_jti
+    call invalidate_denylist_caches(jti) once the denylist has been written
+    """
+    def __init__(self, leeway: int = 0):
+        """
+        :param leeway: seconds a revoked jti is kept after the exp claim of the token,
+                       should be the same as authjwt_decode_leeway
+        """
+        self.leeway = leeway
+
+    def __call__(self, raw_token: Dict[str,Union[str,int,bool]]) -> bool:
+        """
+        :param raw_token: decoded JWT
+        :return: True if the token has been revoked
+        """
+        return self.is_revoked(raw_token['jti'])
+
+    def is_revoked(self, jti: str) -> bool:
+        """
+        :param jti: unique identifier of the token
+        :return: True if the jti has been revoked
+        """
+        raise NotImplementedError
+
+    def get_many(self, jtis: List[str]) -> List[bool]:
+        """
+        Look up many jtis at once, backends with a bulk lookup override it
+
+        :param jtis: unique identifiers of the tokens
+        :return: for every jti, True if it has been revoked
+        """
+        return [self.is_revoked(jti) for jti in jtis]
+
+    def revoke_jti(self, jti: str, expires_at: Optional[int] = None) -> None:
+        """
+        Revoke the jti until expires_at
+
+        :param jti: unique identifier of the token
+        :param expires_at: seconds since the Epoch after which the jti is forgotten, None to keep it
+        """
+        raise NotImplementedError
+
+    def unrevoke_jti(self, jti: str) -> None:
+        """
+        Remove the jti from the denylist
+
+        :param jti: unique identifier of the token
+        """
+        raise NotImplementedError
+
+    def revoke(self, raw_token: Dict[str,Union[str,int,bool]], expires_at: Optional[int] = None) -> Any:
+        """
+        Revoke the token until expires_at
+
+        :param raw_token: decoded JWT, for example from get_raw_jwt()
+        :param expires_at: seconds since the Epoch after which the token is forgotten, None to keep it
+        """
+        return self.revoke_jti(raw_token['jti'],expires_at)
+
+    def revoke_until_exp(self, raw_token: Dict[str,Union[str,int,bool]]) -> Any:
+        """
+        Revoke the token for as long as it could still be accepted, tokens
+        without exp claim are revoked for good
+
+        :param raw_token: decoded JWT, for example from get_raw_jwt()
+        """
+        return self.revoke_jti(raw_token['jti'],self.get_expires_at(raw_token))
+
+    def unrevoke(self, raw_token: Dict[str,Union[str,int,bool]]) -> Any:
+        """
+        Remove the token from the denylist
+
+        :param raw_token: decoded JWT
+        """
+        return self.unrevoke_jti(raw_token['jti'])
+
+    def get_expires_at(self, raw_token: Dict[str,Union[str,int,bool]]) -> Optional[int]:
+        """
+        :param raw_token: decoded JWT
+        :return: exp claim plus leeway, None for tokens without exp claim
+        """
+        if 'exp' not in raw_token:
+            return None
+        return int(raw_token['exp']) + self.leeway
@@ -0,0 +1,120 @@
+import asyncio, inspect, weakref
+from collections import namedtuple
+from concurrent.futures import Executor
+from typing import Dict, List, Optional, Union
+from fastapi_jwt_auth.denylist.base import DenylistBackend
+
+BatchInfo = namedtuple("BatchInfo", ["lookups", "batches", "jtis"])
+
+class _Batch:
+    def __init__(self):
+        # jti to the future every lookup of it waits on
+        self.futures = {}
+        self.timer = None
+
+class BatchingDenylist(DenylistBackend):
+    """
+    Async adapter that collects the lookups of concurrent requests and sends them to
+    the backend as one get_many, like a single MGET or WHERE jti IN (...). a batch is
+    sent max_delay seconds after its first lookup, or as soon as it holds max_batch_size
+    jtis, so a lookup waits at most max_delay longer than the round-trip. revocations
+    are passed straight to the backend
+    """
+    def __init__(
+        self,
+        backend: DenylistBackend,
+        max_delay: float = 0.0005,
+        max_batch_size: int = 100,
+        executor: Optional[Executor] = None
+    ):
+        """
+        :param backend: the denylist backend, its get_many may be sync or a coroutine
+        :param max_delay: seconds a batch waits for more lookups
+        :param max_batch_size: number of jtis that sends a batch at once
+        :param executor: executor a sync get_many runs on, by default the one of the event loop
+        """
+        if max_delay < 0:
+            raise ValueError("max_delay must not be negative")
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be greater than 0")
+
+        super().__init__(backend.leeway)
+        self.backend = backend
+        self.max_delay = max_delay
+        self.max_batch_size = max_batch_size
+        self.executor = executor
+        self.lookups = 0
+        self.batches = 0
+        self.jtis = 0
+        # every event loop collects its own batch
+        self._batches = weakref.WeakKeyDictionary()
+        self._tasks = set()
+
+    async def __call__(self, raw_token: Dict[str,Union[str,int,bool]]) -> bool:
+        loop = asyncio.get_event_loop()
+        batch = self._batches.get(loop)
+        if batch is None:
+            batch = self._batches[loop] = _Batch()
+
+        jti = raw_token['jti']
+        future = batch.futures.get(jti)
+        if future is None:
+            future = batch.futures[jti] = loop.create_future()
+        self.lookups += 1
+
+        if len(batch.futures) >= self.max_batch_size:
+            self._send(loop)
+        elif batch.timer is None:
+            batch.timer = loop.call_later(self.max_delay,self._send,loop)
+
+        # a lookup that is cancelled, for example by authjwt_denylist_callback_timeout,
+        # doesn't cancel the other lookups of the same jti
+        return await asyncio.shield(future)
+
+    def _send(self, loop: asyncio.AbstractEventLoop) -> None:
+        batch = self._batches.pop(loop,None)
+        if batch is None:
+            return
+        if batch.timer is not None:
+            batch.timer.cancel()
+
+        self.batches += 1
+        self.jtis += len(batch.futures)
+        task = loop.create_task(self._lookup(batch.futures))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _lookup(self, futures: Dict[str,asyncio.Future]) -> None:
+        jtis = list(futures)
+        try:
+            if inspect.iscoroutinefunction(self.backend.get_many):
+                results = await self.backend.get_many(jtis)
+            else:
+                results = await asyncio.get_event_loop().run_in_executor(self.executor,self.backend.get_many,jtis)
+        except Exception as err:
+            for future in futures.values():
+                if not future.done():
+                    future.set_exception(err)
+            return
+
+        for jti, revoked in zip(jtis,results):
+            if not futures[jti].done():
+                futures[jti].set_result(revoked)
+
+    def is_revoked(self, jti: str) -> bool:
+        return self.backend.is_revoked(jti)
+
+    def get_many(self, jtis: List[str]) -> List[bool]:
+        return self.backend.get_many(jtis)
+
+    def revoke_jti(self, jti: str, expires_at: Optional[int] = None) -> None:
+        return self.backend.revoke_jti(jti,expires_at)
+
+    def unrevoke_jti(self, jti: str) -> None:
+        return self.backend.unrevoke_jti(jti)
+
+    def info(self) -> BatchInfo:
+        """
+        :return: lookups made, batches sent to the backend and jtis in those batches
+        """
+        return BatchInfo(self.lookups, self.batches, self.jtis)
@@ -0,0 +1,275 @@
+import math, time, asyncio, inspect, hashlib, threading
+from collections import namedtuple
+from typing import Dict, Iterable, List, Optional, Union
+from fastapi_jwt_auth.denylist.base import DenylistBackend
+
+BloomInfo = namedtuple("BloomInfo", ["hits", "passes", "false_positives", "count", "capacity"])
+
+class BloomFilter:
+    """
+    Set of strings that can answer "maybe" for strings never added, with a
+    false positive rate of error_rate while no more than capacity strings are added
+    """
+    def __init__(self, capacity: int, error_rate: float):
+        """
+        :param capacity: number of strings the filter is sized for
+        :param error_rate: probability a string never added is reported as added
+        """
+        if capacity < 1:
+            raise ValueError("capacity must be greater than 0")
+        if not 0 < error_rate < 1:
+            raise ValueError("error_rate must be between 0 and 1")
+
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(8, int(math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)))
+        self.hashes = max(1, int(round(self.size / capacity * math.log(2))))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, value: str):
+        digest = hashlib.blake2b(value.encode('utf-8'), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return [(first + i * second) % self.size for i in range(self.hashes)]
+
+    def add(self, value: str) -> None:
+        """
+        :param value: string to add
+        """
+        bits = self._bits
+        for position in self._positions(value):
+            bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, value: str) -> bool:
+        bits = self._bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(value))
+
+class BloomDenylist(DenylistBackend):
+    """
+    Bloom filter in front of another denylist backend. tokens that were never
+    revoked are answered by the filter, only when the filter says "maybe" the
+    backend is asked. revocations must go through this object, or the filter has
+    to be rebuilt with the revoked jtis, otherwise the backend is never asked about them.
+    a backend shared by many processes, like Redis, needs rebuild_interval, so the
+    revocations of the other processes reach the filter
+    """
+    def __init__(
+        self,
+        backend: DenylistBackend,
+        capacity: int = 100000,
+        error_rate: float = 0.001,
+        jtis: Optional[Iterable[str]] = None,
+        rebuild_interval: Optional[float] = None
+    ):
+        """
+        :param backend: the denylist backend the filter is in front of
+        :param capacity: number of revoked jtis the filter is sized for
+        :param error_rate: rate of not revoked tokens that are still passed to the backend
+        :param jtis: revoked jtis already in the backend, by default the backend is iterated when it can be
+        :param rebuild_interval: seconds between rebuilds from the jtis of the backend, None to only
+                                 rebuild when rebuild() is called or the filter is full
+        """
+        super().__init__(backend.leeway)
+        self.backend = backend
+        self.error_rate = error_rate
+        self.rebuild_interval = rebuild_interval
+        self.hits = 0
+        self.passes = 0
+        self.false_positives = 0
+        self.last_error = None
+        self._lock = threading.Lock()
+        # jtis revoked while a rebuild runs, one list for every rebuild
+        self._rebuilding = []
+        self._last_rebuild = time.monotonic()
+        self._closed = threading.Event()
+        self._filter = BloomFilter(capacity,error_rate)
+        self.rebuild(jtis,capacity)
+        self._start_rebuilds()
+
+    def _start_rebuilds(self) -> None:
+        if self.rebuild_interval is not None:
+            threading.Thread(target=self._rebuild_periodically,name="authjwt-bloom-rebuilder",daemon=True).start()
+
+    def _rebuild_periodically(self) -> None:
+        while not self._closed.wait(self.rebuild_interval):
+            try:
+                self.rebuild()
+                self.last_error = None
+            except Exception as err:
+                # the filter that is in use stays until the next rebuild succeeds
+                self.last_error = err
+
+    def rebuild(self, jtis: Optional[Iterable[str]] = None, capacity: Optional[int] = None) -> None:
+        """
+        Make a new filter with the revoked jtis, which drops jtis that expired
+        or were unrevoked since the filter was made. jtis revoked through this
+        object while the rebuild runs are added to the new filter too
+
+        :param jtis: revoked jtis, by default the backend is iterated when it can be
+        :param capacity: number of revoked jtis the filter is sized for, by default the current capacity
+        """
+        added = self._begin_rebuild()
+        try:
+            if jtis is None:
+                jtis = iter(self.backend) if hasattr(self.backend,'__iter__') else []
+            self._swap_filter(added,jtis,capacity)
+        finally:
+            self._end_rebuild(added)
+
+    def _begin_rebuild(self) -> List[str]:
+        added = []
+        with self._lock:
+            self._rebuilding.append(added)
+        return added
+
+    def _end_rebuild(self, added: List[str]) -> None:
+        with self._lock:
+            self._rebuilding = [pending for pending in self._rebuilding if pending is not added]
+
+    def _swap_filter(self, added: List[str], jtis: Iterable[str], capacity: Optional[int]) -> None:
+        """
+        :param added: jtis revoked since the rebuild began
+        :param jtis: revoked jtis of the backend
+        :param capacity: number of revoked jtis the filter is sized for, by default the current capacity
+        """
+        jtis = list(jtis)
+        capacity = max(capacity or self._filter.capacity, len(jtis) * 2, 1)
+        new_filter = BloomFilter(capacity,self.error_rate)
+        for jti in jtis:
+            new_filter.add(jti)
+
+        # the jtis revoked meanwhile are added under the lock, none is lost by the swap
+        with self._lock:
+            for jti in added:
+                new_filter.add(jti)
+            self._filter = new_filter
+            self._last_rebuild = time.monotonic()
+
+    def might_be_revoked(self, jti: str) -> bool:
+        """
+        Ask the filter only
+
+        :param jti: unique identifier of the token
+        :return: False if the jti was never revoked, True if it may have been
+        """
+        if jti in self._filter:
+            self.passes += 1
+            return True
+        self.hits += 1
+        return False
+
+    def is_revoked(self, jti: str) -> bool:
+        if not self.might_be_revoked(jti):
+            return False
+
+        revoked = self.backend.is_revoked(jti)
+        if not revoked:
+            self.false_positives += 1
+        return revoked
+
+    def _add(self, jti: str) -> bool:
+        """
+        :return: True when the filter holds more jtis than it's sized for
+        """
+        with self._lock:
+            self._filter.add(jti)
+            for added in self._rebuilding:
+                added.append(jti)
+            return self._filter.count > self._filter.capacity
+
+    def revoke_jti(self, jti: str, expires_at: Optional[int] = None) -> None:
+        # the backend first, a rebuild that begins before _add gets the jti from
+        # _rebuilding and one that begins after it reads the jti from the backend
+        self.backend.revoke_jti(jti,expires_at)
+        full = self._add(jti)
+
+        if full and hasattr(self.backend,'__iter__'):
+            self.rebuild()
+
+    def unrevoke_jti(self, jti: str) -> None:
+        # the jti stays in the filter until it's rebuilt, the backend answers for it
+        self.backend.unrevoke_jti(jti)
+
+    def info(self) -> BloomInfo:
+        """
+        :return: lookups answered by the filter alone, lookups passed to the backend,
+                 passed lookups that were not revoked, jtis in the filter and its capacity
+        """
+        return BloomInfo(self.hits, self.passes, self.false_positives, self._filter.count, self._filter.capacity)
+
+    def close(self) -> None:
+        """
+        Stop the periodic rebuilds, the filter that is in use stays
+        """
+        self._closed.set()
+
+class AsyncBloomDenylist(BloomDenylist):
+    """
+    BloomDenylist in front of a backend with an async __call__, the filter is asked
+    on the event loop and only "maybe" awaits the backend. revoke_jti and unrevoke_jti
+    are coroutines that await the backend when it's async. rebuild_async rebuilds the
+    filter with the jtis() of the backend, with rebuild_interval it's started by a lookup
+    on the event loop once the interval has passed
+    """
+    _rebuild_task = None
+
+    def _start_rebuilds(self) -> None:
+        # the backend is awaited on the event loop of the lookups, not on a thread
+        pass
+
+    async def rebuild_async(self, capacity: Optional[int] = None) -> None:
+        """
+        Rebuild the filter with the jtis() of the backend, or its jtis when it can be iterated
+
+        :param capacity: number of revoked jtis the filter is sized for, by default the current capacity
+        """
+        added = self._begin_rebuild()
+        try:
+            if hasattr(self.backend,'jtis'):
+                jtis = self.backend.jtis()
+                if inspect.isawaitable(jtis):
+                    jtis = await jtis
+            else:
+                jtis = iter(self.backend) if hasattr(self.backend,'__iter__') else []
+            self._swap_filter(added,jtis,capacity)
+        finally:
+            self._end_rebuild(added)
+
+    async def _rebuild_in_background(self) -> None:
+        try:
+            await self.rebuild_async()
+            self.last_error = None
+        except Exception as err:
+            self.last_error = err
+        finally:
+            self._last_rebuild = time.monotonic()
+            self._rebuild_task = None
+
+    async def __call__(self, raw_token: Dict[str,Union[str,int,bool]]) -> bool:
+        if (
+            self.rebuild_interval is not None and self._rebuild_task is None
+            and not self._closed.is_set() and time.monotonic() - self._last_rebuild >= self.rebuild_interval
+        ):
+            self._rebuild_task = asyncio.ensure_future(self._rebuild_in_background())
+
+        jti = raw_token['jti']
+        if not self.might_be_revoked(jti):
+            return False
+
+        revoked = await self.backend(raw_token)
+        if not revoked:
+            self.false_positives += 1
+        return revoked
+
+    async def revoke_jti(self, jti: str, expires_at: Optional[int] = None) -> None:
+        result = self.backend.revoke_jti(jti,expires_at)
+        if inspect.isawaitable(result):
+            await result
+        self._add(jti)
+
+    async def unrevoke_jti(self, jti: str) -> None:
+        result = self.backend.unrevoke_jti(jti)
+        if inspect.isawaitable(result):
+            await result
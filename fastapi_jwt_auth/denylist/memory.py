@@ -0,0 +1,83 @@
+import time, heapq, threading
+from typing import Iterator, Optional
+from fastapi_jwt_auth.cache import invalidate_denylist_caches
+from fastapi_jwt_auth.denylist.base import DenylistBackend
+
+class MemoryDenylist(DenylistBackend):
+    """
+    Denylist kept in the memory of this process. revoked jtis are grouped in buckets
+    by the time they expire, a bucket is dropped as a whole once all its tokens have
+    expired, so memory is bounded by the revoked tokens that are still valid
+    """
+    def __init__(self, bucket_seconds: int = 60, leeway: int = 0):
+        """
+        :param bucket_seconds: width of an expiry bucket in seconds
+        :param leeway: seconds a revoked jti is kept after the exp claim of the token,
+                       should be the same as authjwt_decode_leeway
+        """
+        if bucket_seconds < 1:
+            raise ValueError("bucket_seconds must be greater than 0")
+
+        super().__init__(leeway)
+        self.bucket_seconds = bucket_seconds
+        # jti to the end of its bucket, None for jtis kept for good
+        self._jtis = {}
+        # end of the bucket to the jtis in it
+        self._buckets = {}
+        # ends of the buckets, the first one expires first
+        self._bucket_ends = []
+        self._lock = threading.Lock()
+
+    def is_revoked(self, jti: str) -> bool:
+        with self._lock:
+            self._drop_expired(time.time())
+            return jti in self._jtis
+
+    def revoke_jti(self, jti: str, expires_at: Optional[int] = None) -> None:
+        now = time.time()
+        if expires_at is not None and expires_at <= now:
+            return
+
+        with self._lock:
+            self._drop_expired(now)
+            self._discard(jti)
+
+            if expires_at is None:
+                self._jtis[jti] = None
+            else:
+                # round up, every token in a bucket has expired at its end
+                end = -(-int(expires_at) // self.bucket_seconds) * self.bucket_seconds
+                bucket = self._buckets.get(end)
+                if bucket is None:
+                    bucket = self._buckets[end] = set()
+                    heapq.heappush(self._bucket_ends,end)
+                bucket.add(jti)
+                self._jtis[jti] = end
+
+        invalidate_denylist_caches(jti)
+
+    def unrevoke_jti(self, jti: str) -> None:
+        with self._lock:
+            self._discard(jti)
+        invalidate_denylist_caches(jti)
+
+    def _discard(self, jti: str) -> None:
+        end = self._jtis.pop(jti,None)
+        if end is not None:
+            self._buckets[end].discard(jti)
+
+    def _drop_expired(self, now: float) -> None:
+        ends = self._bucket_ends
+        while ends and ends[0] <= now:
+            for jti in self._buckets.pop(heapq.heappop(ends)):
+                del self._jtis[jti]
+
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            self._drop_expired(time.time())
+            return iter(list(self._jtis))
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._drop_expired(time.time())
+            return len(self._jtis)
@@ -0,0 +1,314 @@
+import math, time, inspect
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from fastapi_jwt_auth.cache import invalidate_denylist_caches
+from fastapi_jwt_auth.denylist.base import DenylistBackend
+from fastapi_jwt_auth.denylist.watermark import SubjectWatermarks
+
+try:
+    import redis
+    import redis.asyncio
+except ImportError:  # pragma: no cover
+    redis = None
+
+def _create_client(owner: object, client, url: str, max_connections: Optional[int], is_async: bool):
+    """
+    :return: client, or a client with a pool of max_connections connections to url
+    """
+    if redis is None:
+        raise RuntimeError(
+            "{} requires the redis package, install fastapi-jwt-auth[redis]".format(owner.__class__.__name__)
+        )
+    if client is not None:
+        return client
+
+    module = redis.asyncio if is_async else redis
+    pool = module.ConnectionPool.from_url(url,max_connections=max_connections)
+    return module.Redis(connection_pool=pool)
+
+class _RedisDenylistBase(DenylistBackend):
+    """
+    Keys and TTLs shared by the sync and async Redis denylists. a revoked jti is
+    stored under prefix + jti and expires with the exp claim of its token
+    """
+    _is_async = False
+
+    def __init__(
+        self,
+        client=None,
+        url: str = "redis://localhost:6379/0",
+        prefix: str = "authjwt:denylist:",
+        max_connections: Optional[int] = None,
+        leeway: int = 0
+    ):
+        """
+        :param client: redis client to use, by default one is made from url
+        :param url: url of the Redis server, used when client is None
+        :param prefix: prefix of the keys of revoked jtis
+        :param max_connections: size of the connection pool, used when client is None
+        :param leeway: seconds a revoked jti is kept after the exp claim of the token,
+                       should be the same as authjwt_decode_leeway
+        """
+        super().__init__(leeway)
+        self.prefix = prefix
+        self.client = _create_client(self,client,url,max_connections,self._is_async)
+
+    def _key(self, jti: str) -> str:
+        return self.prefix + jti
+
+    def _jti(self, key: Union[str,bytes]) -> str:
+        if isinstance(key,bytes):
+            key = key.decode('utf-8')
+        return key[len(self.prefix):]
+
+    def _match(self) -> str:
+        # escape the glob characters of the prefix for SCAN MATCH
+        return "".join("\\" + char if char in "*?[]\\" else char for char in self.prefix) + "*"
+
+    def _get_set_args(self, jti: str, expires_at: Optional[int]) -> Optional[Tuple[str,int]]:
+        """
+        :return: arguments of SET for the jti, None when the jti has already expired
+        """
+        if expires_at is None:
+            return self._key(jti), None
+
+        ttl = math.ceil(expires_at - time.time())
+        if ttl <= 0:
+            return None
+        return self._key(jti), ttl
+
+    def _get_revocations(self, raw_tokens: Iterable[Dict[str,Union[str,int,bool]]]) -> List[Tuple[str,Optional[int]]]:
+        return [(raw_token['jti'],self.get_expires_at(raw_token)) for raw_token in raw_tokens]
+
+class RedisDenylist(_RedisDenylistBase):
+    """
+    Denylist kept in Redis, or any server that speaks its protocol. the client
+    takes connections from a pool so it can be shared by all threads, revocations
+    are SET with an EX from the exp claim and revoke_many sends them in one pipeline
+    """
+    def is_revoked(self, jti: str) -> bool:
+        return bool(self.client.exists(self._key(jti)))
+
+    def get_many(self, jtis: List[str]) -> List[bool]:
+        if not jtis:
+            return []
+        return [value is not None for value in self.client.mget([self._key(jti) for jti in jtis])]
+
+    def revoke_jti(self, jti: str, expires_at: Optional[int] = None) -> None:
+        args = self._get_set_args(jti,expires_at)
+        if args is not None:
+            key, ttl = args
+            self.client.set(key,1,ex=ttl)
+            invalidate_denylist_caches(jti)
+
+    def revoke_many(self, revocations: Iterable[Tuple[str,Optional[int]]]) -> None:
+        """
+        Revoke many jtis with one round-trip
+
+        :param revocations: pairs of jti and expires_at, like the arguments of revoke_jti
+        """
+        revoked = []
+        with self.client.pipeline(transaction=False) as pipe:
+            for jti, expires_at in revocations:
+                args = self._get_set_args(jti,expires_at)
+                if args is not None:
+                    key, ttl = args
+                    pipe.set(key,1,ex=ttl)
+                    revoked.append(jti)
+            pipe.execute()
+        for jti in revoked:
+            invalidate_denylist_caches(jti)
+
+    def revoke_many_until_exp(self, raw_tokens: Iterable[Dict[str,Union[str,int,bool]]]) -> None:
+        """
+        Revoke many tokens with one round-trip, for as long as they could still be accepted
+
+        :param raw_tokens: decoded JWTs
+        """
+        self.revoke_many(self._get_revocations(raw_tokens))
+
+    def unrevoke_jti(self, jti: str) -> None:
+        self.client.delete(self._key(jti))
+        invalidate_denylist_caches(jti)
+
+    def __iter__(self) -> Iterator[str]:
+        for key in self.client.scan_iter(match=self._match(),count=1000):
+            yield self._jti(key)
+
+    def close(self) -> None:
+        """
+        Close the connections of the client
+        """
+        self.client.close()
+
+class AsyncRedisDenylist(_RedisDenylistBase):
+    """
+    RedisDenylist with a redis.asyncio client, the callback is a coroutine awaited
+    by the *_async functions and the revoke functions have to be awaited
+    """
+    _is_async = True
+
+    async def __call__(self, raw_token: Dict[str,Union[str,int,bool]]) -> bool:
+        return await self.is_revoked(raw_token['jti'])
+
+    async def is_revoked(self, jti: str) -> bool:
+        return bool(await self.client.exists(self._key(jti)))
+
+    async def get_many(self, jtis: List[str]) -> List[bool]:
+        if not jtis:
+            return []
+        return [value is not None for value in await self.client.mget([self._key(jti) for jti in jtis])]
+
+    async def revoke_jti(self, jti: str, expires_at: Optional[int] = None) -> None:
+        args = self._get_set_args(jti,expires_at)
+        if args is not None:
+            key, ttl = args
+            await self.client.set(key,1,ex=ttl)
+            invalidate_denylist_caches(jti)
+
+    async def revoke_many(self, revocations: Iterable[Tuple[str,Optional[int]]]) -> None:
+        """
+        Revoke many jtis with one round-trip
+
+        :param revocations: pairs of jti and expires_at, like the arguments of revoke_jti
+        """
+        revoked = []
+        async with self.client.pipeline(transaction=False) as pipe:
+            for jti, expires_at in revocations:
+                args = self._get_set_args(jti,expires_at)
+                if args is not None:
+                    key, ttl = args
+                    pipe.set(key,1,ex=ttl)
+                    revoked.append(jti)
+            await pipe.execute()
+        for jti in revoked:
+            invalidate_denylist_caches(jti)
+
+    async def revoke_many_until_exp(self, raw_tokens: Iterable[Dict[str,Union[str,int,bool]]]) -> None:
+        """
+        Revoke many tokens with one round-trip, for as long as they could still be accepted
+
+        :param raw_tokens: decoded JWTs
+        """
+        await self.revoke_many(self._get_revocations(raw_tokens))
+
+    async def unrevoke_jti(self, jti: str) -> None:
+        await self.client.delete(self._key(jti))
+        invalidate_denylist_caches(jti)
+
+    async def jtis(self) -> List[str]:
+        """
+        :return: the revoked jtis, for example to rebuild a BloomDenylist
+        """
+        return [self._jti(key) async for key in self.client.scan_iter(match=self._match(),count=1000)]
+
+    async def close(self) -> None:
+        """
+        Close the connections of the client
+        """
+        await self.client.aclose()
+
+class RedisWatermarks(SubjectWatermarks):
+    """
+    Subject watermarks kept in Redis, a lookup is one GET. the watermark of a
+    subject is stored under prefix + subject and expires after ttl seconds
+    """
+    _is_async = False
+
+    def __init__(
+        self,
+        denylist: Optional[Callable[...,bool]] = None,
+        ttl: Optional[int] = None,
+        client=None,
+        url: str = "redis://localhost:6379/0",
+        prefix: str = "authjwt:watermark:",
+        max_connections: Optional[int] = None
+    ):
+        """
+        :param denylist: denylist callback asked about the tokens a watermark doesn't revoke
+        :param ttl: seconds a watermark is kept, should be at least the longest expiry of
+                    the tokens plus authjwt_decode_leeway, None to keep it for good
+        :param client: redis client to use, by default one is made from url
+        :param url: url of the Redis server, used when client is None
+        :param prefix: prefix of the keys of the watermarks
+        :param max_connections: size of the connection pool, used when client is None
+        """
+        super().__init__(denylist,ttl)
+        self.prefix = prefix
+        self.client = _create_client(self,client,url,max_connections,self._is_async)
+
+    def _key(self, subject: Union[str,int]) -> str:
+        return self.prefix + str(subject)
+
+    def _get_set_args(self, subject: Union[str,int], watermark: int) -> Optional[Tuple[str,int,Optional[int]]]:
+        """
+        :return: arguments of SET for the watermark, None when it would already be forgotten
+        """
+        forget_at = self._get_forget_at(watermark)
+        if forget_at is None:
+            return self._key(subject), watermark, None
+
+        ttl = math.ceil(forget_at - time.time())
+        if ttl <= 0:
+            return None
+        return self._key(subject), watermark, ttl
+
+    def get_watermark(self, subject: Union[str,int]) -> Optional[int]:
+        watermark = self.client.get(self._key(subject))
+        return None if watermark is None else int(watermark)
+
+    def set_watermark(self, subject: Union[str,int], watermark: int) -> None:
+        args = self._get_set_args(subject,watermark)
+        if args is not None:
+            key, watermark, ttl = args
+            self.client.set(key,watermark,ex=ttl)
+            invalidate_denylist_caches()
+
+    def delete_watermark(self, subject: Union[str,int]) -> None:
+        self.client.delete(self._key(subject))
+        invalidate_denylist_caches()
+
+    def close(self) -> None:
+        """
+        Close the connections of the client
+        """
+        self.client.close()
+
+class AsyncRedisWatermarks(RedisWatermarks):
+    """
+    RedisWatermarks with a redis.asyncio client, the callback is a coroutine awaited
+    by the *_async functions and the revoke functions have to be awaited. the denylist
+    callback it wraps may be sync or async
+    """
+    _is_async = True
+
+    async def __call__(self, raw_token: Dict[str,Union[str,int,bool]]) -> bool:
+        if 'sub' in raw_token and self._is_revoked_by(raw_token,await self.get_watermark(raw_token['sub'])):
+            return True
+        if self.denylist is None:
+            return False
+
+        revoked = self.denylist(raw_token)
+        if inspect.isawaitable(revoked):
+            revoked = await revoked
+        return revoked
+
+    async def get_watermark(self, subject: Union[str,int]) -> Optional[int]:
+        watermark = await self.client.get(self._key(subject))
+        return None if watermark is None else int(watermark)
+
+    async def set_watermark(self, subject: Union[str,int], watermark: int) -> None:
+        args = self._get_set_args(subject,watermark)
+        if args is not None:
+            key, watermark, ttl = args
+            await self.client.set(key,watermark,ex=ttl)
+            invalidate_denylist_caches()
+
+    async def delete_watermark(self, subject: Union[str,int]) -> None:
+        await self.client.delete(self._key(subject))
+        invalidate_denylist_caches()
+
+    async def close(self) -> None:
+        """
+        Close the connections of the client
+        """
+        await self.client.aclose()
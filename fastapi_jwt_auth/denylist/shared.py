@@ -0,0 +1,187 @@
+import os, mmap, time, struct, hashlib, threading
+from typing import Optional
+from fastapi_jwt_auth.cache import invalidate_denylist_caches
+from fastapi_jwt_auth.denylist.base import DenylistBackend
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
+
+class SharedMemoryDenylist(DenylistBackend):
+    """
+    Denylist in a memory-mapped file shared by every process on the host that maps
+    the same path, put it on a tmpfs like /dev/shm. the file holds two hash tables
+    with a fixed number of slots, a slot holds 8 bytes of the hash of a jti and its
+    expiry. lookups read the active table without locks, syscalls or serialization.
+    revocations take an exclusive lock on the file, when the active table has no
+    room left the live jtis are copied to the other table, which then becomes the
+    active one, so expired and unrevoked jtis never slow lookups down for long
+    """
+    _magic = b"AJWTDL01"
+    # magic, slots per table, index of the active table, slots in use in the active table
+    _header = struct.Struct("<8sQQQ")
+    # hash of the jti, expiry in seconds since the Epoch or 0 to keep it
+    _slot = struct.Struct("<QQ")
+    _empty = 0
+    _deleted = 1
+
+    def __init__(self, path: str, capacity: int = 65536, leeway: int = 0):
+        """
+        :param path: path of the file, it's made with room for capacity jtis when missing
+        :param capacity: number of revoked jtis that can be kept at the same time
+        :param leeway: seconds a revoked jti is kept after the exp claim of the token,
+                       should be the same as authjwt_decode_leeway
+        """
+        if fcntl is None:
+            raise RuntimeError("SharedMemoryDenylist requires a platform with fcntl")
+        if capacity < 1:
+            raise ValueError("capacity must be greater than 0")
+
+        super().__init__(leeway)
+        self.path = path
+        self.capacity = capacity
+        # at least a quarter of the slots stays empty so probing ends quickly
+        self._slots = 1 << (capacity + (capacity + 2) // 3 - 1).bit_length()
+        self._mask = self._slots - 1
+        self._table_size = self._slots * self._slot.size
+
+        self._file = os.fdopen(os.open(path, os.O_RDWR | os.O_CREAT, 0o600), "r+b")
+        self._lock = threading.Lock()
+        with self._locked():
+            if os.fstat(self._file.fileno()).st_size == 0:
+                self._file.truncate(self._header.size + 2 * self._table_size)
+                self._file.seek(0)
+                self._file.write(self._header.pack(self._magic, self._slots, 0, 0))
+                self._file.flush()
+
+            self._mmap = mmap.mmap(self._file.fileno(), 0)
+            magic, slots = self._header.unpack_from(self._mmap, 0)[:2]
+            if magic != self._magic:
+                raise ValueError("{} is not a shared denylist file".format(path))
+            if slots != self._slots:
+                raise ValueError("{} was made for another capacity than {}".format(path, capacity))
+
+    def _locked(self) -> "_FileLock":
+        return _FileLock(self._lock, self._file)
+
+    def _hash(self, jti: str) -> int:
+        value = int.from_bytes(hashlib.blake2b(jti.encode('utf-8'), digest_size=8).digest(), 'little')
+        # 0 and 1 mark empty and unrevoked slots
+        return value if value > self._deleted else value + 2
+
+    def _get_header(self) -> tuple:
+        """
+        :return: index of the active table and the slots in use in it
+        """
+        return self._header.unpack_from(self._mmap, 0)[2:]
+
+    def _set_header(self, active: int, used: int) -> None:
+        struct.pack_into("<QQ", self._mmap, 16, active, used)
+
+    def _find(self, table: int, value: int) -> Optional[int]:
+        """
+        :return: offset of the slot of value in the table, or of the empty slot that ends its probe
+        """
+        unpack_from, mm, mask, size = self._slot.unpack_from, self._mmap, self._mask, self._slot.size
+        start = self._header.size + table * self._table_size
+        index = value & mask
+        while True:
+            offset = start + index * size
+            slot_hash = unpack_from(mm, offset)[0]
+            if slot_hash == value or slot_hash == self._empty:
+                return offset
+            index = (index + 1) & mask
+
+    def is_revoked(self, jti: str) -> bool:
+        table = self._header.unpack_from(self._mmap, 0)[2]
+        slot_hash, expires_at = self._slot.unpack_from(self._mmap, self._find(table, self._hash(jti)))
+        return slot_hash != self._empty and (expires_at == 0 or expires_at > time.time())
+
+    def revoke_jti(self, jti: str, expires_at: Optional[int] = None) -> None:
+        if expires_at is not None and expires_at <= time.time():
+            return
+
+        value = self._hash(jti)
+        expiry = 0 if expires_at is None else int(expires_at)
+        with self._locked():
+            table, used = self._get_header()
+            offset = self._find(table, value)
+            if self._slot.unpack_from(self._mmap, offset)[0] == self._empty:
+                if used >= self.capacity:
+                    table, used = self._rebuild(table)
+                    if used >= self.capacity:
+                        raise RuntimeError(
+                            "The shared denylist is full, it holds {} revoked jtis".format(self.capacity)
+                        )
+                    offset = self._find(table, value)
+                used += 1
+            # the expiry is written before the hash, a reader that finds the hash sees its expiry
+            struct.pack_into("<Q", self._mmap, offset + 8, expiry)
+            struct.pack_into("<Q", self._mmap, offset, value)
+            self._set_header(table, used)
+
+        invalidate_denylist_caches(jti)
+
+    def _rebuild(self, table: int) -> tuple:
+        """
+        Copy the live jtis of the table to the other table and make it the active one,
+        readers still in the old table finish their lookup there
+
+        :return: index of the new active table and the slots in use in it
+        """
+        now = time.time()
+        start = self._header.size + table * self._table_size
+        live = [
+            (slot_hash, expires_at)
+            for slot_hash, expires_at in self._slot.iter_unpack(self._mmap[start:start + self._table_size])
+            if slot_hash > self._deleted and (expires_at == 0 or expires_at > now)
+        ]
+
+        other = 1 - table
+        other_start = self._header.size + other * self._table_size
+        self._mmap[other_start:other_start + self._table_size] = bytes(self._table_size)
+        for slot_hash, expires_at in live:
+            self._slot.pack_into(self._mmap, self._find(other, slot_hash), slot_hash, expires_at)
+
+        self._set_header(other, len(live))
+        return other, len(live)
+
+    def unrevoke_jti(self, jti: str) -> None:
+        with self._locked():
+            offset = self._find(self._get_header()[0], self._hash(jti))
+            # the slot keeps the probe going, it's dropped by the next rebuild
+            if self._slot.unpack_from(self._mmap, offset)[0] != self._empty:
+                struct.pack_into("<Q", self._mmap, offset, self._deleted)
+        invalidate_denylist_caches(jti)
+
+    def close(self) -> None:
+        """
+        Unmap the file, the revoked jtis stay in it
+        """
+        self._mmap.close()
+        self._file.close()
+
+    def __len__(self) -> int:
+        now = time.time()
+        start = self._header.size + self._get_header()[0] * self._table_size
+        return sum(
+            1 for slot_hash, expires_at in self._slot.iter_unpack(self._mmap[start:start + self._table_size])
+            if slot_hash > self._deleted and (expires_at == 0 or expires_at > now)
+        )
+
+class _FileLock:
+    """
+    Lock of the threads of this process and of the other processes that map the file
+    """
+    def __init__(self, lock: threading.Lock, file):
+        self.lock = lock
+        self.file = file
+
+    def __enter__(self) -> None:
+        self.lock.acquire()
+        fcntl.flock(self.file.fileno(), fcntl.LOCK_EX)
+
+    def __exit__(self, *exc) -> None:
+        fcntl.flock(self.file.fileno(), fcntl.LOCK_UN)
+        self.lock.release()
@@ -0,0 +1,200 @@
+import os, time, sqlite3, threading
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from fastapi_jwt_auth.cache import invalidate_denylist_caches
+from fastapi_jwt_auth.denylist.base import DenylistBackend
+
+class SQLiteDenylist(DenylistBackend):
+    """
+    Denylist kept in a SQLite database file, it survives restarts and is shared by
+    every process on the host that opens the same file. the database is in WAL mode
+    so lookups are not blocked by revocations, every thread has its own connection
+    and expired rows are deleted in small batches by a background thread
+    """
+    # jtis looked up by one statement of get_many, below the parameter limit of old SQLite versions
+    _chunk_size = 500
+
+    _schema = (
+        "CREATE TABLE IF NOT EXISTS {table} (jti TEXT PRIMARY KEY, expires_at INTEGER) WITHOUT ROWID",
+        "CREATE INDEX IF NOT EXISTS {table}_expires_at ON {table} (expires_at)",
+    )
+
+    def __init__(
+        self,
+        path: str,
+        table: str = "authjwt_denylist",
+        compact_interval: Optional[float] = 60,
+        compact_batch_size: int = 1000,
+        timeout: float = 5,
+        leeway: int = 0
+    ):
+        """
+        :param path: path of the database file, it's created when missing
+        :param table: name of the table of revoked jtis
+        :param compact_interval: seconds between deletions of expired rows, None to only delete them with compact()
+        :param compact_batch_size: rows deleted in one write transaction, so revocations don't wait long
+        :param timeout: seconds a write waits for the lock of the database
+        :param leeway: seconds a revoked jti is kept after the exp claim of the token,
+                       should be the same as authjwt_decode_leeway
+        """
+        if not table.isidentifier():
+            raise ValueError("table must be a valid identifier")
+        if compact_batch_size < 1:
+            raise ValueError("compact_batch_size must be greater than 0")
+
+        super().__init__(leeway)
+        self.path = path
+        self.table = table
+        self.compact_interval = compact_interval
+        self.compact_batch_size = compact_batch_size
+        self.timeout = timeout
+
+        # the statements are the same strings on every call, so sqlite3 prepares them once per connection
+        self._select = "SELECT 1 FROM {} WHERE jti = ? AND (expires_at IS NULL OR expires_at > ?)".format(table)
+        self._insert = "INSERT OR REPLACE INTO {} (jti, expires_at) VALUES (?, ?)".format(table)
+        self._delete = "DELETE FROM {} WHERE jti = ?".format(table)
+        self._delete_expired = (
+            "DELETE FROM {0} WHERE jti IN (SELECT jti FROM {0} WHERE expires_at <= ? LIMIT ?)".format(table)
+        )
+        self._select_all = "SELECT jti FROM {} WHERE expires_at IS NULL OR expires_at > ?".format(table)
+        self._select_many = (
+            "SELECT jti FROM " + table + " WHERE jti IN ({}) AND (expires_at IS NULL OR expires_at > ?)"
+        )
+        self._count = "SELECT COUNT(*) FROM {} WHERE expires_at IS NULL OR expires_at > ?".format(table)
+
+        self._local = threading.local()
+        self._pid = None
+        self._compactor = None
+        self._closed = threading.Event()
+        self._lock = threading.Lock()
+
+        connection = self._connection()
+        with connection:
+            for statement in self._schema:
+                connection.execute(statement.format(table=table))
+
+    def _connection(self) -> sqlite3.Connection:
+        """
+        :return: connection of this thread, threads and forked processes don't share connections
+        """
+        if self._pid != os.getpid():
+            # a forked worker starts with fresh connections and its own compactor
+            self._pid = os.getpid()
+            self._local = threading.local()
+            self._compactor = None
+
+        connection = getattr(self._local,'connection',None)
+        if connection is None:
+            connection = sqlite3.connect(self.path,timeout=self.timeout,isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+
+        if self._compactor is None and self.compact_interval is not None and not self._closed.is_set():
+            with self._lock:
+                if self._compactor is None:
+                    self._compactor = threading.Thread(
+                        target=self._compact_periodically,
+                        name="authjwt-sqlite-compactor",
+                        daemon=True
+                    )
+                    self._compactor.start()
+        return connection
+
+    def is_revoked(self, jti: str) -> bool:
+        return self._connection().execute(self._select,(jti,int(time.time()))).fetchone() is not None
+
+    def get_many(self, jtis: List[str]) -> List[bool]:
+        connection = self._connection()
+        now = int(time.time())
+        revoked = set()
+        # statements for full chunks are the same string, so they are prepared once
+        for start in range(0, len(jtis), self._chunk_size):
+            chunk = jtis[start:start + self._chunk_size]
+            statement = self._select_many.format(", ".join("?" * len(chunk)))
+            revoked.update(row[0] for row in connection.execute(statement,(*chunk,now)))
+        return [jti in revoked for jti in jtis]
+
+    def revoke_jti(self, jti: str, expires_at: Optional[int] = None) -> None:
+        self.revoke_many([(jti,expires_at)])
+
+    def revoke_many(self, revocations: Iterable[Tuple[str,Optional[int]]]) -> None:
+        """
+        Revoke many jtis in one transaction
+
+        :param revocations: pairs of jti and expires_at, like the arguments of revoke_jti
+        """
+        now = time.time()
+        rows = [
+            (jti, None if expires_at is None else int(expires_at))
+            for jti, expires_at in revocations
+            if expires_at is None or expires_at > now
+        ]
+        if not rows:
+            return
+
+        connection = self._connection()
+        with connection:
+            connection.execute("BEGIN IMMEDIATE")
+            connection.executemany(self._insert,rows)
+
+        for jti, _ in rows:
+            invalidate_denylist_caches(jti)
+
+    def revoke_many_until_exp(self, raw_tokens: Iterable[Dict[str,Union[str,int,bool]]]) -> None:
+        """
+        Revoke many tokens in one transaction, for as long as they could still be accepted
+
+        :param raw_tokens: decoded JWTs
+        """
+        self.revoke_many([(raw_token['jti'],self.get_expires_at(raw_token)) for raw_token in raw_tokens])
+
+    def unrevoke_jti(self, jti: str) -> None:
+        connection = self._connection()
+        with connection:
+            connection.execute(self._delete,(jti,))
+        invalidate_denylist_caches(jti)
+
+    def compact(self) -> int:
+        """
+        Delete the rows of expired jtis, compact_batch_size rows per write transaction
+        so readers and revocations are never held up for long
+
+        :return: number of rows deleted
+        """
+        connection = self._connection()
+        now = int(time.time())
+        deleted = 0
+        while True:
+            with connection:
+                count = connection.execute(self._delete_expired,(now,self.compact_batch_size)).rowcount
+            deleted += count
+            if count < self.compact_batch_size:
+                return deleted
+
+    def _compact_periodically(self) -> None:
+        while not self._closed.wait(self.compact_interval):
+            try:
+                self.compact()
+            except sqlite3.Error:
+                # the database is busy, try again on the next interval
+                pass
+        connection = getattr(self._local,'connection',None)
+        if connection is not None:
+            connection.close()
+
+    def close(self) -> None:
+        """
+        Stop the background compaction and close the connection of this thread
+        """
+        self._closed.set()
+        connection = getattr(self._local,'connection',None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    def __iter__(self) -> Iterator[str]:
+        rows = self._connection().execute(self._select_all,(int(time.time()),)).fetchall()
+        return iter([row[0] for row in rows])
+
+    def __len__(self) -> int:
+        return self._connection().execute(self._count,(int(time.time()),)).fetchone()[0]
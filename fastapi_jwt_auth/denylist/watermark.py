@@ -0,0 +1,124 @@
+import time, threading
+from typing import Any, Callable, Dict, Optional, Union
+from fastapi_jwt_auth.cache import invalidate_denylist_caches
+
+class SubjectWatermarks:
+    """
+    Base class of the subject watermark stores. revoking a subject stores the time
+    it was revoked, its watermark, and every token of the subject issued before it
+    is revoked with one write, however many tokens it holds. an instance is the
+    callback registered with AuthJWT.token_in_denylist_loader, a token issued after
+    the watermark is passed on to the denylist callback it wraps, if any. stores
+    implement get_watermark, set_watermark and delete_watermark
+    """
+    def __init__(self, denylist: Optional[Callable[...,bool]] = None, ttl: Optional[int] = None):
+        """
+        :param denylist: denylist callback asked about the tokens a watermark doesn't revoke
+        :param ttl: seconds a watermark is kept, should be at least the longest expiry of
+                    the tokens plus authjwt_decode_leeway, None to keep it for good
+        """
+        self.denylist = denylist
+        self.ttl = ttl
+
+    def __call__(self, raw_token: Dict[str,Union[str,int,bool]]) -> bool:
+        """
+        :param raw_token: decoded JWT
+        :return: True if the token has been revoked
+        """
+        if 'sub' in raw_token and self._is_revoked_by(raw_token,self.get_watermark(raw_token['sub'])):
+            return True
+        return self.denylist(raw_token) if self.denylist is not None else False
+
+    def _is_revoked_by(self, raw_token: Dict[str,Union[str,int,bool]], watermark: Optional[int]) -> bool:
+        # a token without iat can't be shown to be issued after the watermark. iat is in
+        # whole seconds, a token of the second of the watermark may be the login that
+        # followed the revocation and is accepted
+        if watermark is None:
+            return False
+        return 'iat' not in raw_token or raw_token['iat'] < watermark
+
+    def _get_forget_at(self, watermark: int) -> Optional[int]:
+        return None if self.ttl is None else watermark + self.ttl
+
+    def get_watermark(self, subject: Union[str,int]) -> Optional[int]:
+        """
+        :param subject: sub claim of the tokens
+        :return: seconds since the Epoch before which the tokens of the subject are revoked, None if not revoked
+        """
+        raise NotImplementedError
+
+    def set_watermark(self, subject: Union[str,int], watermark: int) -> None:
+        """
+        Revoke the tokens of the subject issued before watermark
+
+        :param subject: sub claim of the tokens
+        :param watermark: seconds since the Epoch
+        """
+        raise NotImplementedError
+
+    def delete_watermark(self, subject: Union[str,int]) -> None:
+        """
+        Accept the tokens of the subject again
+
+        :param subject: sub claim of the tokens
+        """
+        raise NotImplementedError
+
+    def revoke_subject(self, subject: Union[str,int], revoked_before: Optional[int] = None) -> Any:
+        """
+        Revoke every token of the subject issued before revoked_before, for example on
+        logout everywhere, password reset or account lock-out. by default that's the
+        second of the revocation, a token issued in that second is accepted so a login
+        right after the revocation works. pass int(time.time()) + 1 to revoke that
+        second too, which also rejects a login made in it
+
+        :param subject: sub claim of the tokens
+        :param revoked_before: seconds since the Epoch, by default the current second
+        """
+        watermark = int(time.time()) if revoked_before is None else int(revoked_before)
+        return self.set_watermark(subject,watermark)
+
+    def unrevoke_subject(self, subject: Union[str,int]) -> Any:
+        """
+        Accept the tokens of the subject again
+
+        :param subject: sub claim of the tokens
+        """
+        return self.delete_watermark(subject)
+
+class MemoryWatermarks(SubjectWatermarks):
+    """
+    Subject watermarks kept in the memory of this process, a lookup is one dict access
+    """
+    def __init__(self, denylist: Optional[Callable[...,bool]] = None, ttl: Optional[int] = None):
+        super().__init__(denylist,ttl)
+        # subject to its watermark and the time it's forgotten, None to keep it
+        self._watermarks = {}
+        self._lock = threading.Lock()
+
+    def get_watermark(self, subject: Union[str,int]) -> Optional[int]:
+        entry = self._watermarks.get(str(subject))
+        if entry is None:
+            return None
+
+        watermark, forget_at = entry
+        if forget_at is not None and forget_at <= time.time():
+            with self._lock:
+                if self._watermarks.get(str(subject)) is entry:
+                    del self._watermarks[str(subject)]
+            return None
+        return watermark
+
+    def set_watermark(self, subject: Union[str,int], watermark: int) -> None:
+        with self._lock:
+            self._watermarks[str(subject)] = (watermark,self._get_forget_at(watermark))
+        # the cached verdicts are by jti, the jtis of the subject are not known
+        invalidate_denylist_caches()
+
+    def delete_watermark(self, subject: Union[str,int]) -> None:
+        with self._lock:
+            self._watermarks.pop(str(subject),None)
+        invalidate_denylist_caches()
+
+    def __len__(self) -> int:
+        return len(self._watermarks)
@@ -0,0 +1,290 @@
+"""
+JSON Web Key Sets (RFC 7517) of identity providers that rotate their keys. The keys
+are parsed once into key objects indexed by kid, and the set is refreshed by a
+background thread, so a token is never held up by a fetch
+"""
+import os, re, json, time, threading, urllib.error, urllib.request
+from typing import Any, Dict, Mapping, Optional, Tuple, Union
+from jwt.algorithms import RSAAlgorithm, has_crypto
+from jwt.exceptions import InvalidKeyError
+from jwt.utils import base64url_decode
+
+if has_crypto:
+    from cryptography.hazmat.backends import default_backend
+    from cryptography.hazmat.primitives.asymmetric import ec
+
+_max_age = re.compile(r"(?:^|,)\s*max-age\s*=\s*\"?(\d+)\"?", re.IGNORECASE)
+
+# key type of the jwk that every asymmetric algorithm family verifies with
+_key_types = {"RS": "RSA", "PS": "RSA", "ES": "EC"}
+
+_curves = {
+    "P-256": lambda: ec.SECP256R1(),
+    "P-384": lambda: ec.SECP384R1(),
+    "P-521": lambda: ec.SECP521R1()
+}
+
+def load_jwk(jwk: Mapping[str,Any]) -> Any:
+    """
+    :param jwk: public RSA or EC key in JWK format
+    :return: public key object of cryptography
+    """
+    if not has_crypto:
+        raise RuntimeError(
+            "Missing dependencies for using asymmetric algorithms. run 'pip install fastapi-jwt-auth[asymmetric]'"
+        )
+
+    if jwk.get('kty') == 'RSA':
+        if 'd' in jwk:
+            raise InvalidKeyError("A key set must only hold public keys")
+        return RSAAlgorithm.from_jwk(json.dumps(dict(jwk)))
+
+    if jwk.get('kty') == 'EC':
+        if 'd' in jwk:
+            raise InvalidKeyError("A key set must only hold public keys")
+        if jwk.get('crv') not in _curves:
+            raise InvalidKeyError("Unsupported curve {}".format(jwk.get('crv')))
+        try:
+            x = int.from_bytes(base64url_decode(jwk['x']), 'big')
+            y = int.from_bytes(base64url_decode(jwk['y']), 'big')
+            numbers = ec.EllipticCurvePublicNumbers(x, y, _curves[jwk['crv']]())
+            return numbers.public_key(default_backend())
+        except (KeyError, ValueError) as err:
+            raise InvalidKeyError("Invalid EC key: {}".format(err))
+
+    raise InvalidKeyError("Unsupported key type {}".format(jwk.get('kty')))
+
+class JWKSet:
+    """
+    Immutable set of public keys by kid. keys of other types or uses than
+    signature verification with RSA or EC are skipped
+    """
+    __slots__ = ('keys', 'default')
+
+    def __init__(self, keys: Dict[Optional[str],Tuple[str,Optional[str],Any]]):
+        """
+        :param keys: kty, alg and key object by kid
+        """
+        self.keys = keys
+        # a token without kid can only be matched when there is no choice
+        self.default = next(iter(keys.values())) if len(keys) == 1 else None
+
+    @classmethod
+    def from_document(cls, document: Union[str,bytes,Mapping[str,Any]]) -> "JWKSet":
+        """
+        :param document: JWKS document, a json object with a list of keys
+        :return: the parsed key set
+        """
+        if isinstance(document, (str, bytes)):
+            document = json.loads(document)
+        if not isinstance(document, Mapping) or not isinstance(document.get('keys'), list):
+            raise ValueError("A JWKS document must be an object with a list of keys")
+
+        keys = {}
+        for jwk in document['keys']:
+            if not isinstance(jwk, Mapping) or jwk.get('kty') not in ('RSA', 'EC'):
+                continue
+            if jwk.get('use', 'sig') != 'sig':
+                continue
+            kid = jwk.get('kid')
+            keys[kid if isinstance(kid, str) else None] = (jwk['kty'], jwk.get('alg'), load_jwk(jwk))
+        return cls(keys)
+
+    def get_key(self, kid: Optional[str], algorithm: str) -> Optional[Any]:
+        """
+        :param kid: kid header of the token
+        :param algorithm: alg header of the token
+        :return: key object to verify the token with, None when the token has no kid
+                 and the set doesn't hold exactly one key
+        """
+        if kid is None:
+            entry = self.default
+            if entry is None:
+                return None
+        else:
+            if not isinstance(kid, str):
+                raise InvalidKeyError("The kid header must be a string")
+            entry = self.keys.get(kid)
+            if entry is None:
+                raise InvalidKeyError("Unknown key id {}".format(kid))
+
+        kty, alg, key = entry
+        if _key_types.get(algorithm[:2]) != kty or (alg is not None and alg != algorithm):
+            raise InvalidKeyError("The key {} can't be used with algorithm {}".format(kid, algorithm))
+        return key
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+class JWKS:
+    """
+    Key set loaded from a JWKS document at a http(s) url or in a file. the first
+    refresh happens when it's loaded, then a background thread fetches the document
+    again after the max-age of its Cache-Control header or refresh_interval seconds,
+    with If-None-Match when it had an ETag. when a refresh fails the previous keys
+    are used for another max_stale seconds, lookups never fetch
+    """
+    def __init__(
+        self,
+        source: str,
+        refresh_interval: int = 300,
+        min_refresh_interval: int = 30,
+        max_stale: Optional[int] = 86400,
+        timeout: float = 5
+    ):
+        """
+        :param source: http(s) url or path of the JWKS document
+        :param refresh_interval: seconds between refreshes when the document has no max-age
+        :param min_refresh_interval: seconds a refresh waits after the one before, also when
+                                     a token with an unknown kid asks for an early one
+        :param max_stale: seconds the keys are still used after they should have been refreshed,
+                          None to use them until a refresh succeeds
+        :param timeout: seconds a fetch of the document may take
+        """
+        self.source = source
+        self.refresh_interval = refresh_interval
+        self.min_refresh_interval = min(min_refresh_interval, refresh_interval)
+        self.max_stale = max_stale
+        self.timeout = timeout
+        self.key_set = None
+        self.last_error = None
+        self._document = None
+
+        self._is_url = source.startswith(("http://", "https://"))
+        self._etag = None
+        self._last_refresh = 0.0
+        self._next_refresh = 0.0
+        self._stale_at = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = threading.Event()
+
+    def _fetch(self) -> Tuple[Optional[bytes],Any,Optional[int]]:
+        """
+        :return: the document or None when it's not modified, its etag and its max-age
+        """
+        if not self._is_url:
+            stat = os.stat(self.source)
+            etag = (stat.st_mtime_ns, stat.st_size)
+            if etag == self._etag:
+                return None, etag, None
+            with open(self.source, 'rb') as f:
+                return f.read(), etag, None
+
+        request = urllib.request.Request(self.source, headers={'Accept': 'application/json'})
+        if self._etag is not None:
+            request.add_header('If-None-Match', self._etag)
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return response.read(), response.headers.get('ETag'), self._get_max_age(response.headers)
+        except urllib.error.HTTPError as err:
+            if err.code == 304:
+                return None, err.headers.get('ETag', self._etag), self._get_max_age(err.headers)
+            raise
+
+    @staticmethod
+    def _get_max_age(headers: Mapping[str,str]) -> Optional[int]:
+        match = _max_age.search(headers.get('Cache-Control') or "")
+        return int(match.group(1)) if match else None
+
+    def refresh(self) -> bool:
+        """
+        Fetch the document now, the keys are swapped in at once when it changed
+
+        :return: True if the document was fetched, False if the refresh failed
+        """
+        with self._lock:
+            now = time.time()
+            self._last_refresh = now
+            try:
+                document, etag, max_age = self._fetch()
+                if document is not None:
+                    self.key_set = JWKSet.from_document(document)
+                    self._document = document
+            except Exception as err:
+                self.last_error = err
+                self._next_refresh = now + self.min_refresh_interval
+                return False
+
+            self._etag = etag
+            self.last_error = None
+            ttl = self.refresh_interval if max_age is None else max(max_age, self.min_refresh_interval)
+            self._next_refresh = now + ttl
+            self._stale_at = None if self.max_stale is None else now + ttl + self.max_stale
+            return True
+
+    def load(self) -> "JWKS":
+        """
+        Refresh the keys unless they are loaded and start the background refreshes
+
+        :return: the key set itself
+        """
+        if self.key_set is None and not self.refresh():
+            raise ValueError("JWKS could not be loaded from {}: {}".format(self.source, self.last_error))
+
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._closed.clear()
+                self._thread = threading.Thread(target=self._refresh_periodically, name="authjwt-jwks-refresher", daemon=True)
+                self._thread.start()
+        return self
+
+    def _refresh_periodically(self) -> None:
+        while not self._closed.is_set():
+            delay = self._next_refresh - time.time()
+            if delay > 0:
+                self._wakeup.wait(delay)
+                self._wakeup.clear()
+                continue
+            self.refresh()
+
+    def get_key(self, kid: Optional[str], algorithm: str) -> Optional[Any]:
+        """
+        Look up the key of a token in the keys that are loaded, a kid that is unknown
+        asks the background thread for an early refresh
+
+        :param kid: kid header of the token
+        :param algorithm: alg header of the token
+        :return: key object to verify the token with, None when the token has no kid
+                 and the set doesn't hold exactly one key
+        """
+        key_set = self.key_set
+        if key_set is None:
+            raise InvalidKeyError("The key set of {} is not loaded".format(self.source))
+        if self._stale_at is not None and time.time() > self._stale_at:
+            raise InvalidKeyError("The key set of {} could not be refreshed".format(self.source))
+
+        try:
+            return key_set.get_key(kid, algorithm)
+        except InvalidKeyError:
+            if kid is not None and kid not in key_set.keys:
+                self._request_refresh()
+            raise
+
+    def _request_refresh(self) -> None:
+        next_refresh = self._last_refresh + self.min_refresh_interval
+        if next_refresh < self._next_refresh:
+            self._next_refresh = next_refresh
+            self._wakeup.set()
+
+    def close(self) -> None:
+        """
+        Stop the background refreshes, the keys that are loaded are still used
+        """
+        self._closed.set()
+        self._wakeup.set()
+
+    def __getstate__(self) -> Dict[str,Any]:
+        # a copy for the processes of verify_many, it holds the keys that are
+        # loaded now and is never refreshed
+        state = {key: value for key, value in self.__dict__.items() if not key.startswith('_')}
+        state.update(key_set=None, last_error=None, _document=self._document, _stale_at=self._stale_at)
+        return state
+
+    def __setstate__(self, state: Dict[str,Any]) -> None:
+        self.__init__(state['source'], state['refresh_interval'], state['min_refresh_interval'], state['max_stale'], state['timeout'])
+        self._document = state['_document']
+        self._stale_at = state['_stale_at']
+        if self._document is not None:
+            self.key_set = JWKSet.from_document(self._document)
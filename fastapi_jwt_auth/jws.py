@@ -0,0 +1,313 @@
+"""
+Compact JWS encoding, parsing and JWT claims validation. The token is split
+and its segments are decoded once, tokens and errors are the same as jwt.encode
+and jwt.decode produce
+"""
+import re, binascii, time, hmac, hashlib
+from calendar import timegm
+from datetime import datetime
+from collections import namedtuple
+from collections.abc import Iterable, Mapping
+from typing import Dict, Optional, Sequence, Union
+from jwt.algorithms import HMACAlgorithm, requires_cryptography, has_crypto
+from jwt.utils import base64url_decode, base64url_encode
+from jwt.exceptions import (
+    DecodeError,
+    InvalidTokenError,
+    InvalidAlgorithmError,
+    InvalidSignatureError,
+    ExpiredSignatureError,
+    ImmatureSignatureError,
+    InvalidAudienceError,
+    InvalidIssuedAtError,
+    InvalidIssuerError,
+    MissingRequiredClaimError
+)
+from fastapi_jwt_auth.codec import JSONCodec
+
+_json_codec = JSONCodec()
+
+# three base64url segments, signature is empty for unsecured tokens
+_compact_token = re.compile(r"[A-Za-z0-9_-]+\.[A-Za-z0-9_-]+\.[A-Za-z0-9_-]*")
+
+ParsedToken = namedtuple("ParsedToken", ["header", "payload", "signing_input", "signature"])
+
+def parse_token(
+    encoded_token: Union[str,bytes],
+    algorithms: Optional[Sequence[str]] = None,
+    max_length: Optional[int] = None,
+    max_header_length: Optional[int] = None,
+    codec: JSONCodec = _json_codec
+) -> ParsedToken:
+    """
+    Split the token and decode header, payload and signature segments. before any
+    base64 work the length, the segments and the alphabet of the token are checked,
+    and the alg header is checked before payload and signature are decoded
+
+    :param encoded_token: token hash
+    :param algorithms: algorithms allowed to decode the token, None to skip the check
+    :param max_length: maximum length of the token, None for no limit
+    :param max_header_length: maximum length of the header segment, None for no limit
+    :param codec: json codec for the header
+
+    :return: parsed token, payload is still the decoded bytes of the payload segment
+    """
+    if isinstance(encoded_token, bytes):
+        try:
+            encoded_token = encoded_token.decode('ascii')
+        except UnicodeDecodeError:
+            raise DecodeError('Invalid token, only base64url characters are allowed')
+
+    if not isinstance(encoded_token, str):
+        raise DecodeError("Invalid token type. Token must be a {0}".format(bytes))
+
+    if max_length is not None and len(encoded_token) > max_length:
+        raise DecodeError('Token is too long')
+
+    if _compact_token.fullmatch(encoded_token) is None:
+        segments = encoded_token.count('.')
+        if segments < 2:
+            raise DecodeError('Not enough segments')
+        if segments > 2:
+            raise DecodeError('Too many segments')
+        raise DecodeError('Invalid token, only base64url characters are allowed')
+
+    header_segment, payload_segment, crypto_segment = encoded_token.split('.')
+
+    if max_header_length is not None and len(header_segment) > max_header_length:
+        raise DecodeError('Token header is too long')
+
+    try:
+        header_data = base64url_decode(header_segment)
+    except (TypeError, binascii.Error):
+        raise DecodeError('Invalid header padding')
+
+    try:
+        header = codec.loads(header_data)
+    except ValueError as e:
+        raise DecodeError('Invalid header string: %s' % e)
+
+    if not isinstance(header, Mapping):
+        raise DecodeError('Invalid header string: must be a json object')
+
+    if 'kid' in header and not isinstance(header['kid'], str):
+        raise InvalidTokenError('Key ID header parameter must be a string')
+
+    if algorithms is not None and header.get('alg') not in algorithms:
+        raise InvalidAlgorithmError('The specified alg value is not allowed')
+
+    try:
+        payload = base64url_decode(payload_segment)
+    except (TypeError, binascii.Error):
+        raise DecodeError('Invalid payload padding')
+
+    try:
+        signature = base64url_decode(crypto_segment)
+    except (TypeError, binascii.Error):
+        raise DecodeError('Invalid crypto padding')
+
+    signing_input = '{}.{}'.format(header_segment,payload_segment).encode('ascii')
+
+    return ParsedToken(header, payload, signing_input, signature)
+
+def verify_signature(parsed: ParsedToken, alg_obj, key) -> None:
+    """
+    Verify the signature of a parsed token
+
+    :param parsed: parsed token
+    :param alg_obj: algorithm from jwt.algorithms of the alg header
+    :param key: secret or public key for the algorithm
+    """
+    key = alg_obj.prepare_key(key)
+
+    if not alg_obj.verify(parsed.signing_input, key, parsed.signature):
+        raise InvalidSignatureError('Signature verification failed')
+
+def load_payload(parsed: ParsedToken, codec: JSONCodec = _json_codec) -> Dict:
+    """
+    :param parsed: parsed token with verified signature
+    :param codec: json codec for the claims
+    :return: claims of the token
+    """
+    try:
+        payload = codec.loads(parsed.payload)
+    except ValueError as e:
+        raise DecodeError('Invalid payload string: %s' % e)
+
+    if not isinstance(payload, Mapping):
+        raise DecodeError('Invalid payload string: must be a json object')
+
+    return payload
+
+def validate_claims(
+    payload: Dict,
+    issuer: Optional[str] = None,
+    audience: Optional[Union[str,Sequence[str]]] = None,
+    leeway: Union[int,float] = 0
+) -> None:
+    """
+    Validate iat, nbf, exp, iss and aud claims like jwt.decode does with default options
+
+    :param payload: claims of the token
+    :param issuer: expected issuer in the JWT
+    :param audience: expected audience in the JWT
+    :param leeway: leeway in seconds for exp and nbf
+    """
+    if not isinstance(audience, (str, type(None), Iterable)):
+        raise TypeError('audience must be a string, iterable, or None')
+
+    now = int(time.time())
+
+    if 'iat' in payload:
+        try:
+            int(payload['iat'])
+        except ValueError:
+            raise InvalidIssuedAtError('Issued At claim (iat) must be an integer.')
+
+    if 'nbf' in payload:
+        try:
+            nbf = int(payload['nbf'])
+        except ValueError:
+            raise DecodeError('Not Before claim (nbf) must be an integer.')
+
+        if nbf > (now + leeway):
+            raise ImmatureSignatureError('The token is not yet valid (nbf)')
+
+    if 'exp' in payload:
+        try:
+            exp = int(payload['exp'])
+        except ValueError:
+            raise DecodeError('Expiration Time claim (exp) must be an integer.')
+
+        if exp < (now - leeway):
+            raise ExpiredSignatureError('Signature has expired')
+
+    if issuer is not None:
+        if 'iss' not in payload:
+            raise MissingRequiredClaimError('iss')
+
+        if payload['iss'] != issuer:
+            raise InvalidIssuerError('Invalid issuer')
+
+    if audience is None and 'aud' not in payload:
+        return
+
+    if audience is not None and 'aud' not in payload:
+        raise MissingRequiredClaimError('aud')
+
+    if audience is None and 'aud' in payload:
+        raise InvalidAudienceError('Invalid audience')
+
+    audience_claims = payload['aud']
+
+    if isinstance(audience_claims, str):
+        audience_claims = [audience_claims]
+    if not isinstance(audience_claims, list):
+        raise InvalidAudienceError('Invalid claim format in token')
+    if any(not isinstance(c, str) for c in audience_claims):
+        raise InvalidAudienceError('Invalid claim format in token')
+
+    if isinstance(audience, str):
+        audience = [audience]
+
+    if not any(aud in audience_claims for aud in audience):
+        raise InvalidAudienceError('Invalid audience')
+
+def encode_signing_input(
+    payload: Dict,
+    algorithm: str,
+    headers: Optional[Dict] = None,
+    codec: JSONCodec = _json_codec
+) -> bytes:
+    """
+    Serialize header and payload the same way as jwt.encode does, datetime
+    values of exp, iat and nbf claims are converted to seconds since the Epoch
+
+    :param payload: claims of the token
+    :param algorithm: algorithm to sign the token
+    :param headers: additional headers in JWT header section
+    :param codec: json codec for the header and the claims
+
+    :return: base64url header and payload joined by a dot
+    """
+    for time_claim in ['exp', 'iat', 'nbf']:
+        if isinstance(payload.get(time_claim), datetime):
+            payload[time_claim] = timegm(payload[time_claim].utctimetuple())
+
+    json_payload = codec.dumps(payload)
+
+    header = {'typ': 'JWT', 'alg': algorithm}
+
+    if headers:
+        if 'kid' in headers and not isinstance(headers['kid'], str):
+            raise InvalidTokenError('Key ID header parameter must be a string')
+        header.update(headers)
+
+    json_header = codec.dumps(header)
+
+    return base64url_encode(json_header) + b'.' + base64url_encode(json_payload)
+
+def sign(signing_input: bytes, algorithms: Dict, algorithm: str, key) -> bytes:
+    """
+    :param signing_input: base64url header and payload joined by a dot
+    :param algorithms: algorithms from jwt.algorithms by name
+    :param algorithm: algorithm to sign the token
+    :param key: secret or private key for the algorithm
+
+    :return: signature of the signing input
+    """
+    try:
+        alg_obj = algorithms[algorithm]
+    except KeyError:
+        if not has_crypto and algorithm in requires_cryptography:
+            raise NotImplementedError(
+                "Algorithm '%s' could not be found. Do you have cryptography "
+                "installed?" % algorithm
+            )
+        raise NotImplementedError('Algorithm not supported')
+
+    return alg_obj.sign(signing_input, alg_obj.prepare_key(key))
+
+def encode_token(signing_input: bytes, signature: bytes) -> str:
+    """
+    :param signing_input: base64url header and payload joined by a dot
+    :param signature: signature of the signing input
+    :return: encoded token
+    """
+    return (signing_input + b'.' + base64url_encode(signature)).decode('utf-8')
+
+class HMACEngine:
+    """
+    Sign and verify HS256, HS384 and HS512 with one secret. the secret is keyed into
+    an hmac state once per algorithm and every operation works on a copy of it
+    """
+    digests = {"HS256": hashlib.sha256, "HS384": hashlib.sha384, "HS512": hashlib.sha512}
+
+    def __init__(self, secret_key: Union[str,bytes]):
+        """
+        :param secret_key: secret for symmetric algorithms
+        """
+        self.secret_key = secret_key
+        # same validation of the secret as jwt.encode and jwt.decode
+        key = HMACAlgorithm(hashlib.sha256).prepare_key(secret_key)
+        self._states = {alg: hmac.new(key, digestmod=digest) for alg, digest in self.digests.items()}
+
+    def sign(self, algorithm: str, signing_input: bytes) -> bytes:
+        """
+        :param algorithm: HS256, HS384 or HS512
+        :param signing_input: base64url header and payload joined by a dot
+        :return: signature of the signing input
+        """
+        state = self._states[algorithm].copy()
+        state.update(signing_input)
+        return state.digest()
+
+    def verify(self, algorithm: str, signing_input: bytes, signature: bytes) -> bool:
+        """
+        Compare the signature in constant time
+
+        :param algorithm: HS256, HS384 or HS512
+        :param signing_input: base64url header and payload joined by a dot
+        :param signature: signature from the token
+        """
+        return hmac.compare_digest(self.sign(algorithm,signing_input), signature)
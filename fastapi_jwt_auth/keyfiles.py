@@ -0,0 +1,119 @@
+"""
+Keys read from files that are rewritten while the application runs, like a
+mounted secrets volume. A thread polls the files, parses changed keys and
+publishes them as one immutable snapshot, requests never wait for it
+"""
+import os, threading
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+
+class KeySnapshot:
+    """
+    Immutable keys of one version of the key files, with everything parsed from
+    them. an AuthJWT instance copies the snapshot that is published when it's made
+    and keeps it until the request is done
+    """
+    __slots__ = ('attributes', 'version')
+
+    def __init__(self, attributes: Mapping[str,Any], version: Any = None):
+        """
+        :param attributes: values of the key attributes of AuthConfig by name
+        :param version: stat of the files the keys were read from
+        """
+        object.__setattr__(self, 'attributes', MappingProxyType(dict(attributes)))
+        object.__setattr__(self, 'version', version)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("KeySnapshot is immutable")
+
+def read_key_files(paths: Mapping[str,str]) -> Tuple[Dict[str,str],tuple]:
+    """
+    :param paths: path of the key file by name
+    :return: content of every file by name and the stat of the files
+    """
+    keys, version = {}, []
+    for name, path in paths.items():
+        with open(path, 'r') as f:
+            stat = os.fstat(f.fileno())
+            keys[name] = f.read().strip()
+        version.append((name, stat.st_ino, stat.st_mtime_ns, stat.st_size))
+    return keys, tuple(version)
+
+def stat_key_files(paths: Mapping[str,str]) -> tuple:
+    """
+    :param paths: path of the key file by name
+    :return: stat of the files, it changes when a file is rewritten or replaced
+    """
+    version = []
+    for name, path in paths.items():
+        stat = os.stat(path)
+        version.append((name, stat.st_ino, stat.st_mtime_ns, stat.st_size))
+    return tuple(version)
+
+class KeyFileWatcher:
+    """
+    Poll the key files every interval seconds with os.stat, when one of them changed
+    the files are read and parsed on the thread of the watcher and the new snapshot
+    is published with one assignment. keys that fail to parse, like a file caught
+    halfway through a rewrite, are not published and tried again on the next poll
+    """
+    def __init__(
+        self,
+        paths: Mapping[str,str],
+        build: Callable[[Dict[str,str],tuple],KeySnapshot],
+        publish: Callable[[KeySnapshot],None],
+        interval: float = 5,
+        version: Optional[tuple] = None
+    ):
+        """
+        :param paths: path of the key file by name
+        :param build: makes a snapshot from the content of the files and their stat
+        :param publish: swaps the snapshot in
+        :param interval: seconds between polls
+        :param version: stat of the files of the snapshot that is published now
+        """
+        self.paths = dict(paths)
+        self.build = build
+        self.publish = publish
+        self.interval = interval
+        self.version = version
+        self.reloads = 0
+        self.last_error = None
+        self._closed = threading.Event()
+        self._thread = None
+
+    def check(self) -> bool:
+        """
+        Reload the keys if a file changed since the last reload
+
+        :return: True if a new snapshot was published
+        """
+        try:
+            if stat_key_files(self.paths) == self.version:
+                return False
+            keys, version = read_key_files(self.paths)
+            snapshot = self.build(keys, version)
+        except Exception as err:
+            self.last_error = err
+            return False
+
+        self.publish(snapshot)
+        self.version = version
+        self.reloads += 1
+        self.last_error = None
+        return True
+
+    def start(self) -> "KeyFileWatcher":
+        self._thread = threading.Thread(target=self._watch, name="authjwt-key-watcher", daemon=True)
+        self._thread.start()
+        return self
+
+    def _watch(self) -> None:
+        while not self._closed.wait(self.interval):
+            self.check()
+
+    def close(self) -> None:
+        """
+        Stop polling, the keys that are published stay
+        """
+        self._closed.set()
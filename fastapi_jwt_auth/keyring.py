@@ -0,0 +1,116 @@
+"""
+Keys by kid for rotating the signing key without invalidating the tokens signed
+with the keys before it. Every key is parsed once when the keyring is made
+"""
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+from jwt.algorithms import has_crypto
+from jwt.exceptions import InvalidKeyError
+from fastapi_jwt_auth.jws import HMACEngine
+
+if has_crypto:
+    from cryptography.hazmat.backends import default_backend
+    from cryptography.hazmat.primitives.serialization import load_pem_private_key, load_pem_public_key
+    from cryptography.hazmat.primitives.asymmetric import ec, rsa
+
+# family of keys that verify an algorithm, by the prefix of the algorithm
+_families = {"HS": "HS", "RS": "RSA", "PS": "RSA", "ES": "EC"}
+
+def load_key(material: str) -> Tuple[str,Any]:
+    """
+    :param material: secret for HS* algorithms, or PEM formatted RSA or EC key
+    :return: family of the key and the HMAC engine or public key object
+    """
+    if not material.lstrip().startswith("-----BEGIN"):
+        return "HS", HMACEngine(material)
+
+    if not has_crypto:
+        raise RuntimeError(
+            "Missing dependencies for using asymmetric algorithms. run 'pip install fastapi-jwt-auth[asymmetric]'"
+        )
+
+    data = material.encode('utf-8')
+    key = load_pem_private_key(data,None,default_backend()).public_key() if b"PRIVATE" in data \
+        else load_pem_public_key(data,default_backend())
+    if isinstance(key, rsa.RSAPublicKey):
+        return "RSA", key
+    if isinstance(key, ec.EllipticCurvePublicKey):
+        return "EC", key
+    raise InvalidKeyError("Only RSA and EC keys are supported")
+
+class Keyring:
+    """
+    Verification keys by kid, the kid of the key that signs new tokens is stamped
+    into their header. a token without kid is verified with the key that last
+    verified such a token, and with the other keys when that one doesn't match
+    """
+    def __init__(self, keys: Mapping[Optional[str],Union[str,Sequence[str]]], active: Optional[str] = None):
+        """
+        :param keys: secret or PEM formatted key, or a list of both, by kid. the key
+                     without kid is the signing key when it has no kid of its own
+        :param active: kid of the signing key
+        """
+        self.active = active
+        self._source = dict(keys)
+        # family to HMAC engine or public key, by kid
+        self.keys = {}
+        for kid, materials in keys.items():
+            if isinstance(materials, str):
+                materials = [materials]
+            entry = {}
+            for material in materials:
+                try:
+                    family, key = load_key(material)
+                except Exception as err:
+                    raise ValueError("The key {} could not be loaded: {}".format(kid, err))
+                entry[family] = key
+            self.keys[kid] = entry
+
+        # kid of the key that last verified a token without kid
+        self.last_kid = active if active in self.keys else next(iter(self.keys), None)
+
+    def has_key_for(self, algorithm: str) -> bool:
+        """
+        :param algorithm: alg header of the token
+        :return: True if a key of the keyring can verify the algorithm
+        """
+        family = _families.get(algorithm[:2])
+        return any(family in entry for entry in self.keys.values())
+
+    def get_key(self, kid: str, algorithm: str) -> Optional[Any]:
+        """
+        :param kid: kid header of the token
+        :param algorithm: alg header of the token
+        :return: HMAC engine or public key object, None when the kid is not in the keyring
+        """
+        if not isinstance(kid, str):
+            raise InvalidKeyError("The kid header must be a string")
+        entry = self.keys.get(kid)
+        if entry is None:
+            return None
+
+        key = entry.get(_families.get(algorithm[:2]))
+        if key is None:
+            raise InvalidKeyError("The key {} can't be used with algorithm {}".format(kid, algorithm))
+        return key
+
+    def get_fallback_keys(self, algorithm: str) -> List[Tuple[Optional[str],Any]]:
+        """
+        :param algorithm: alg header of a token without kid
+        :return: kid and key of every key for the algorithm, the key that last verified such a token first
+        """
+        family = _families.get(algorithm[:2])
+        last_kid = self.last_kid
+        keys = [(kid, entry[family]) for kid, entry in self.keys.items() if family in entry]
+        keys.sort(key=lambda item: item[0] != last_kid)
+        return keys
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __getstate__(self) -> Dict[str,Any]:
+        # the keys are parsed again in the processes of verify_many
+        return {'keys': self._source, 'active': self.active, 'last_kid': self.last_kid}
+
+    def __setstate__(self, state: Dict[str,Any]) -> None:
+        self.__init__(state['keys'], state['active'])
+        self.last_kid = state['last_kid']
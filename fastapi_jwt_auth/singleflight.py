@@ -0,0 +1,90 @@
+import asyncio, weakref, threading
+from typing import Any, Awaitable, Callable, Hashable
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class SingleFlight:
+    """
+    Coalesce identical calls made by concurrent threads, the first caller of a key
+    runs the function and the callers that arrive while it runs wait for it and
+    get the same result or error. nothing is kept once the call has finished
+    """
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, func: Callable[...,Any], *args: Any) -> Any:
+        """
+        :param key: key of the call, calls with equal keys must give the same result
+        :param func: function to call
+        :param args: arguments of the function
+
+        :return: result of the function, the same object for every caller
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func(*args)
+        except BaseException as err:
+            call.error = err
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+class AsyncSingleFlight:
+    """
+    SingleFlight for coroutines of one event loop. the work runs in a task of its
+    own, so a caller that is cancelled doesn't cancel it for the callers still waiting
+    """
+    def __init__(self):
+        # every event loop has its own calls, a task can't be awaited from another loop
+        self._calls = weakref.WeakKeyDictionary()
+
+    async def do(self, key: Hashable, func: Callable[[],Awaitable[Any]]) -> Any:
+        """
+        :param key: key of the call, calls with equal keys must give the same result
+        :param func: function without arguments that returns the awaitable to run
+
+        :return: result of the awaitable, the same object for every caller
+        """
+        loop = asyncio.get_event_loop()
+        calls = self._calls.get(loop)
+        if calls is None:
+            calls = self._calls[loop] = {}
+
+        task = calls.get(key)
+        if task is None:
+            task = calls[key] = asyncio.ensure_future(func())
+            task.add_done_callback(lambda task: self._finish(calls,key,task))
+        return await asyncio.shield(task)
+
+    @staticmethod
+    def _finish(calls: dict, key: Hashable, task: asyncio.Future) -> None:
+        if calls.get(key) is task:
+            del calls[key]
+        # the error is retrieved even when every caller was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    def __len__(self) -> int:
+        return sum(len(calls) for calls in list(self._calls.values()))
@@ -1,6 +1,43 @@
-import pytest
+import pytest, time, threading
 from fastapi_jwt_auth import AuthJWT
+from fastapi_jwt_auth.auth_config import _profiles
 
 @pytest.fixture(scope="module")
 def Authorize():
     return AuthJWT()
+
+@pytest.fixture(scope="function")
+def restore_config():
+    # the whole class config, with everything load_config or a test assigns on it
+    saved = {name: value for name, value in vars(AuthJWT).items() if name.startswith('_') and not name.startswith('__')}
+    yield
+    for config in [AuthJWT] + list(_profiles.values()):
+        for name in ['_jwks','_key_watcher']:
+            if vars(config).get(name) is not None and vars(config)[name] is not saved.get(name):
+                vars(config)[name].close()
+    for name in [name for name in vars(AuthJWT) if name.startswith('_') and not name.startswith('__')]:
+        if name not in saved:
+            delattr(AuthJWT,name)
+    for name, value in saved.items():
+        setattr(AuthJWT,name,value)
+    _profiles.clear()
+
+@pytest.fixture(scope="function")
+def decode_delay():
+    # seconds every decode takes, a module overrides it to make calls overlap
+    return 0
+
+@pytest.fixture(scope="function")
+def decode_calls(monkeypatch,decode_delay):
+    # name of the thread of every call of AuthJWT._decode_token
+    calls = []
+    decode_token = AuthJWT._decode_token
+
+    def counting_decode_token(self,*args,**kwargs):
+        calls.append(threading.current_thread().name)
+        if decode_delay:
+            time.sleep(decode_delay)
+        return decode_token(self,*args,**kwargs)
+
+    monkeypatch.setattr(AuthJWT,'_decode_token',counting_decode_token)
+    return calls
@@ -0,0 +1,9 @@
+import asyncio
+
+def run(coroutine):
+    # asyncio.run of Python 3.7 and later, every call gets a new event loop
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
@@ -0,0 +1,57 @@
+"""
+In-process stand-in for the JWKS endpoint of an identity provider, it serves the
+document with an ETag and Cache-Control max-age and answers If-None-Match with 304
+"""
+import json, hashlib, threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+class JWKSHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests.append(self.headers.get('If-None-Match'))
+            status, body = server.status, json.dumps(server.document).encode('utf-8')
+
+        etag = '"{}"'.format(hashlib.sha256(body).hexdigest()[:16])
+        if status == 200 and self.headers.get('If-None-Match') == etag:
+            status, body = 304, b''
+
+        self.send_response(status)
+        if status in (200, 304):
+            self.send_header('ETag',etag)
+            if server.max_age is not None:
+                self.send_header('Cache-Control','public, max-age={}'.format(server.max_age))
+        self.send_header('Content-Type','application/json')
+        self.send_header('Content-Length',str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+class JWKSServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, document: dict, host: str = '127.0.0.1', port: int = 0):
+        super().__init__((host,port),JWKSHandler)
+        self.document = document
+        self.status = 200
+        self.max_age = None
+        # If-None-Match header of every request
+        self.requests = []
+        self.lock = threading.Lock()
+        self.thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address
+        return f"http://{host}:{port}/.well-known/jwks.json"
+
+    def start(self) -> "JWKSServer":
+        self.thread = threading.Thread(target=self.serve_forever,daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
@@ -0,0 +1,134 @@
+"""
+In-process stand-in for a Redis server, it speaks enough of the RESP protocol
+for the denylist backends: HELLO, PING, GET, MGET, SET with EX, EXISTS, DEL, TTL, SCAN
+and FLUSHDB. keys expire like they do on Redis
+"""
+import re, time, threading, socketserver
+
+class RespHandler(socketserver.StreamRequestHandler):
+    def read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        if not line.startswith(b'*'):
+            return line.split()
+
+        args = []
+        for _ in range(int(line[1:])):
+            length = int(self.rfile.readline()[1:])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    def handle(self):
+        self.protocol = 2
+        while True:
+            args = self.read_command()
+            if args is None:
+                return
+            if args[0].upper() == b'HELLO' and len(args) > 1:
+                self.protocol = int(args[1])
+            self.wfile.write(self.server.execute(args,self.protocol))
+
+class RespServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0):
+        super().__init__((host,port),RespHandler)
+        self.data = {}
+        self.commands = []
+        self.lock = threading.Lock()
+        self.thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address
+        return f"redis://{host}:{port}/0"
+
+    def start(self) -> "RespServer":
+        self.thread = threading.Thread(target=self.serve_forever,daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+    def _get(self, key, now):
+        entry = self.data.get(key)
+        if entry is not None and entry[1] is not None and entry[1] <= now:
+            del self.data[key]
+            return None
+        return entry
+
+    def execute(self, args, protocol: int = 2) -> bytes:
+        name = args[0].upper().decode()
+        now = time.time()
+        with self.lock:
+            self.commands.append(name)
+
+            if name == 'HELLO':
+                # RESP3 clients get a map and _ for null, the other replies are the same in RESP2 and RESP3
+                return b'%s\r\n$5\r\nproto\r\n:%d\r\n' % (b'%1' if protocol == 3 else b'*2',protocol)
+            if name == 'PING':
+                return b'+PONG\r\n'
+            if name in ('SELECT','FLUSHDB'):
+                if name == 'FLUSHDB':
+                    self.data.clear()
+                return b'+OK\r\n'
+            if name == 'SET':
+                expires_at = None
+                options = [arg.upper() for arg in args[3:]]
+                if b'EX' in options:
+                    expires_at = now + int(args[3 + options.index(b'EX') + 1])
+                self.data[args[1]] = (args[2],expires_at)
+                return b'+OK\r\n'
+            if name == 'GET':
+                return bulk(self._get(args[1],now),protocol)
+            if name == 'MGET':
+                return b'*%d\r\n' % (len(args) - 1) + b''.join(bulk(self._get(key,now),protocol) for key in args[1:])
+            if name in ('EXISTS','DEL'):
+                found = [key for key in args[1:] if self._get(key,now) is not None]
+                if name == 'DEL':
+                    for key in found:
+                        del self.data[key]
+                return b':%d\r\n' % len(found)
+            if name == 'TTL':
+                entry = self._get(args[1],now)
+                if entry is None:
+                    return b':-2\r\n'
+                return b':%d\r\n' % (-1 if entry[1] is None else round(entry[1] - now))
+            if name == 'SCAN':
+                # every key in one pass, the cursor is always 0
+                options = [arg.upper() for arg in args]
+                pattern = glob_to_regex(args[options.index(b'MATCH') + 1].decode() if b'MATCH' in options else '*')
+                keys = [key for key in list(self.data) if self._get(key,now) and pattern.fullmatch(key.decode())]
+                return b'*2\r\n$1\r\n0\r\n*%d\r\n' % len(keys) + b''.join(bulk((key,None)) for key in keys)
+
+        return b'-ERR unknown command\r\n'
+
+def bulk(entry, protocol: int = 2) -> bytes:
+    if entry is None:
+        return b'_\r\n' if protocol == 3 else b'$-1\r\n'
+    return b'$%d\r\n%s\r\n' % (len(entry[0]),entry[0])
+
+def glob_to_regex(pattern: str):
+    # the glob of SCAN MATCH, a backslash escapes the next character
+    regex, i = '', 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == '\\' and i + 1 < len(pattern):
+            i += 1
+            regex += re.escape(pattern[i])
+        elif char == '*':
+            regex += '.*'
+        elif char == '?':
+            regex += '.'
+        elif char == '[' and ']' in pattern[i + 1:]:
+            end = pattern.index(']',i + 1)
+            regex += '[' + pattern[i + 1:end].replace('\\','\\\\') + ']'
+            i = end
+        else:
+            regex += re.escape(char)
+        i += 1
+    return re.compile(regex,re.DOTALL)
@@ -0,0 +1,300 @@
+import pytest, os, time, threading, asyncio
+from fastapi_jwt_auth import AuthJWT
+from fastapi_jwt_auth.exceptions import AuthJWTException
+from fastapi import FastAPI, Depends, Request, WebSocket, Query
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+from pydantic import BaseSettings, ValidationError
+
+# setting for denylist token
+denylist = set()
+
+def read_key(name):
+    with open(os.path.join(os.path.dirname(__file__),name)) as f:
+        return f.read()
+
+@pytest.fixture(scope='module',autouse=True)
+def default_config():
+    # leave the defaults for the test modules that follow
+    yield
+
+    @AuthJWT.load_config
+    def get_default_settings():
+        return []
+
+    AuthJWT._token_in_denylist_callback = None
+    AuthJWT._token_in_denylist_callback_is_async = False
+
+@pytest.fixture(scope='function')
+def client():
+    app = FastAPI()
+
+    @app.exception_handler(AuthJWTException)
+    def authjwt_exception_handler(request: Request, exc: AuthJWTException):
+        return JSONResponse(
+            status_code=exc.status_code,
+            content={"detail": exc.message}
+        )
+
+    @app.get('/jwt-required')
+    async def jwt_required(Authorize: AuthJWT = Depends()):
+        await Authorize.jwt_required_async()
+        return {'hello':'world'}
+
+    @app.get('/jwt-optional')
+    async def jwt_optional(Authorize: AuthJWT = Depends()):
+        await Authorize.jwt_optional_async()
+        if Authorize.get_jwt_subject():
+            return {'hello':'world'}
+        return {'hello':'anonym'}
+
+    @app.get('/jwt-refresh-required')
+    async def jwt_refresh_required(Authorize: AuthJWT = Depends()):
+        await Authorize.jwt_refresh_token_required_async()
+        return {'hello':'world'}
+
+    @app.get('/fresh-jwt-required')
+    async def fresh_jwt_required(Authorize: AuthJWT = Depends()):
+        await Authorize.fresh_jwt_required_async()
+        return {'hello':'world'}
+
+    @app.websocket('/jwt-required')
+    async def websocket_jwt_required(
+        websocket: WebSocket,
+        token: str = Query(...),
+        Authorize: AuthJWT = Depends()
+    ):
+        await websocket.accept()
+        try:
+            await Authorize.jwt_required_async("websocket",token=token)
+            await websocket.send_text("Successfully Login!")
+        except AuthJWTException as err:
+            await websocket.send_text(err.message)
+        await websocket.close()
+
+    client = TestClient(app)
+    return client
+
+@pytest.fixture(scope='function')
+def rsa_config():
+    class Settings(BaseSettings):
+        authjwt_algorithm: str = "RS256"
+        authjwt_public_key: str = read_key('public_key.txt')
+        authjwt_private_key: str = read_key('private_key.txt')
+        authjwt_async_max_workers: int = 2
+
+    @AuthJWT.load_config
+    def get_settings():
+        return Settings()
+
+    yield
+
+    AuthJWT._async_max_workers = None
+
+@pytest.fixture(scope='function')
+def decode_threads(monkeypatch):
+    threads = []
+    decode_token = AuthJWT._decode_token
+
+    def recording_decode_token(self,*args,**kwargs):
+        threads.append(threading.current_thread().name)
+        return decode_token(self,*args,**kwargs)
+
+    monkeypatch.setattr(AuthJWT,'_decode_token',recording_decode_token)
+    return threads
+
+@pytest.mark.parametrize("url",["/jwt-required","/jwt-optional","/fresh-jwt-required"])
+def test_async_verify_off_event_loop(client,rsa_config,decode_threads,url,Authorize):
+    token = Authorize.create_access_token(subject='test',fresh=True)
+    decode_threads.clear()
+
+    response = client.get(url,headers={"Authorization":f"Bearer {token}"})
+    assert response.status_code == 200
+    assert response.json() == {'hello':'world'}
+
+    # decoded once, on the thread pool of authjwt_async_max_workers threads
+    assert len(decode_threads) == 1
+    assert decode_threads[0].startswith("authjwt-async")
+    assert AuthJWT._executors[('async',2)]._max_workers == 2
+
+def test_async_same_errors_as_sync(client,rsa_config,decode_threads,Authorize):
+    access_token = Authorize.create_access_token(subject='test')
+    refresh_token = Authorize.create_refresh_token(subject='test')
+    decode_threads.clear()
+
+    for url, token, status_code, message in [
+        ('/jwt-required',None,401,"Missing Authorization Header"),
+        ('/jwt-required',"test",422,"Not enough segments"),
+        ('/jwt-required',access_token[:-4],422,"Signature verification failed"),
+        ('/jwt-required',refresh_token,422,"Only access tokens are allowed"),
+        ('/jwt-optional',refresh_token,422,"Only access tokens are allowed"),
+        ('/jwt-refresh-required',access_token,422,"Only refresh tokens are allowed"),
+        ('/fresh-jwt-required',access_token,401,"Fresh token required"),
+    ]:
+        headers = {"Authorization":f"Bearer {token}"} if token else {}
+        response = client.get(url,headers=headers)
+        assert response.status_code == status_code
+        assert response.json() == {'detail': message}
+
+    # a rejected token is not decoded again on the event loop
+    assert all(name.startswith("authjwt-async") for name in decode_threads)
+
+    response = client.get('/jwt-refresh-required',headers={"Authorization":f"Bearer {refresh_token}"})
+    assert response.status_code == 200
+    response = client.get('/jwt-optional')
+    assert response.json() == {'hello':'anonym'}
+
+def test_async_issuer(client,rsa_config,Authorize):
+    token = Authorize.create_access_token(subject='test')
+
+    AuthJWT._decode_issuer = "urn:foo"
+    response = client.get('/jwt-required',headers={"Authorization":f"Bearer {token}"})
+    assert response.status_code == 422
+    assert response.json() == {'detail': 'Token is missing the "iss" claim'}
+    AuthJWT._decode_issuer = None
+
+def test_async_websocket(client,rsa_config,Authorize):
+    token = Authorize.create_access_token(subject='test')
+    with client.websocket_connect(f"/jwt-required?token={token}") as websocket:
+        assert websocket.receive_text() == "Successfully Login!"
+
+    with client.websocket_connect("/jwt-required?token=test") as websocket:
+        assert websocket.receive_text() == "Not enough segments"
+
+def test_async_symmetric_inline(client,decode_threads,Authorize):
+    @AuthJWT.load_config
+    def get_settings():
+        return [("authjwt_secret_key","secret")]
+
+    token = Authorize.create_access_token(subject='test')
+    decode_threads.clear()
+
+    response = client.get('/jwt-required',headers={"Authorization":f"Bearer {token}"})
+    assert response.status_code == 200
+    assert len(decode_threads) == 1
+    assert not decode_threads[0].startswith("authjwt-async")
+
+@pytest.fixture(scope='function')
+def denylist_enabled():
+    AuthJWT._denylist_enabled = True
+    yield
+    AuthJWT._denylist_enabled = False
+
+def test_async_denylist_callback(client,rsa_config,denylist_enabled,Authorize):
+    calls = []
+
+    @AuthJWT.token_in_denylist_loader
+    async def check_if_token_in_denylist(decrypted_token):
+        await asyncio.sleep(0)
+        calls.append(decrypted_token['jti'])
+        return decrypted_token['jti'] in denylist
+
+    token = Authorize.create_access_token(subject='test')
+    response = client.get('/jwt-required',headers={"Authorization":f"Bearer {token}"})
+    assert response.status_code == 200
+
+    denylist.add(Authorize.get_jti(token))
+    response = client.get('/jwt-required',headers={"Authorization":f"Bearer {token}"})
+    assert response.status_code == 401
+    assert response.json() == {'detail': 'Token has been revoked'}
+    assert len(calls) == 2
+
+    # an async callback can't be called from the sync methods
+    with pytest.raises(RuntimeError,match=r"jwt_required_async"):
+        AuthJWT().jwt_required("websocket",token=token)
+
+def test_async_sync_denylist_callback_off_event_loop(client,rsa_config,denylist_enabled,Authorize):
+    threads = []
+
+    @AuthJWT.token_in_denylist_loader
+    def check_if_token_in_denylist(decrypted_token):
+        threads.append(threading.current_thread().name)
+        return decrypted_token['jti'] in denylist
+
+    token = Authorize.create_access_token(subject='test')
+    denylist.add(Authorize.get_jti(token))
+    threads.clear()
+
+    response = client.get('/jwt-required',headers={"Authorization":f"Bearer {token}"})
+    assert response.status_code == 401
+    assert response.json() == {'detail': 'Token has been revoked'}
+    assert len(threads) == 1
+    assert threads[0].startswith("authjwt-async")
+
+def test_async_denylist_callable_object(client,rsa_config,denylist_enabled,Authorize):
+    class Denylist:
+        def __init__(self):
+            self.jtis = set()
+
+        async def __call__(self, decrypted_token):
+            return decrypted_token['jti'] in self.jtis
+
+    callback = Denylist()
+    AuthJWT.token_in_denylist_loader(callback)
+    assert AuthJWT._token_in_denylist_callback_is_async is True
+
+    token = Authorize.create_access_token(subject='test')
+    response = client.get('/jwt-required',headers={"Authorization":f"Bearer {token}"})
+    assert response.status_code == 200
+
+    callback.jtis.add(Authorize.get_jti(token))
+    response = client.get('/jwt-required',headers={"Authorization":f"Bearer {token}"})
+    assert response.status_code == 401
+    assert response.json() == {'detail': 'Token has been revoked'}
+
+    with pytest.raises(RuntimeError,match=r"jwt_required_async"):
+        AuthJWT().jwt_required("websocket",token=token)
+
+def test_sync_denylist_callable_object(client,denylist_enabled,Authorize):
+    @AuthJWT.load_config
+    def get_settings():
+        return [("authjwt_secret_key","secret"),("authjwt_denylist_enabled",True)]
+
+    class Denylist:
+        def __call__(self, decrypted_token):
+            return decrypted_token['jti'] in denylist
+
+    AuthJWT.token_in_denylist_loader(Denylist())
+    assert AuthJWT._token_in_denylist_callback_is_async is False
+
+    token = Authorize.create_access_token(subject='test')
+    AuthJWT().jwt_required("websocket",token=token)
+
+    denylist.add(Authorize.get_jti(token))
+    for url in ['/jwt-required','/jwt-optional']:
+        response = client.get(url,headers={"Authorization":f"Bearer {token}"})
+        assert response.status_code == 401
+        assert response.json() == {'detail': 'Token has been revoked'}
+
+@pytest.mark.parametrize("is_async",[True,False])
+def test_async_denylist_callback_timeout(client,rsa_config,denylist_enabled,is_async,Authorize):
+    AuthJWT._denylist_callback_timeout = 0.05
+
+    if is_async:
+        @AuthJWT.token_in_denylist_loader
+        async def check_if_token_in_denylist(decrypted_token):
+            await asyncio.sleep(decrypted_token['delay'])
+            return False
+    else:
+        @AuthJWT.token_in_denylist_loader
+        def check_if_token_in_denylist(decrypted_token):
+            time.sleep(decrypted_token['delay'])
+            return False
+
+    # a check that takes too long fails closed
+    token = Authorize.create_access_token(subject='test',user_claims={'delay':0.5})
+    response = client.get('/jwt-required',headers={"Authorization":f"Bearer {token}"})
+    assert response.status_code == 401
+    assert response.json() == {'detail': 'Token revocation check timed out'}
+
+    token = Authorize.create_access_token(subject='test',user_claims={'delay':0})
+    response = client.get('/jwt-required',headers={"Authorization":f"Bearer {token}"})
+    assert response.status_code == 200
+
+    AuthJWT._denylist_callback_timeout = None
+
+def test_denylist_callback_timeout_config():
+    with pytest.raises(ValidationError,match=r"authjwt_denylist_callback_timeout"):
+        @AuthJWT.load_config
+        def get_invalid_timeout():
+            return [("authjwt_denylist_callback_timeout",0)]
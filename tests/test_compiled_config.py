@@ -0,0 +1,133 @@
+import pytest, threading
+from fastapi_jwt_auth import AuthJWT
+from fastapi_jwt_auth.compiled_config import ConfigMeta, deferred_compile
+from fastapi_jwt_auth.exceptions import AuthJWTException
+from fastapi import FastAPI, Depends, Request
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+
+def load(**settings):
+    @AuthJWT.load_config
+    def get_settings():
+        return list(settings.items())
+
+def test_load_config_publish_snapshot(restore_config):
+    load(
+        authjwt_secret_key="secret",
+        authjwt_header_name="X-Auth-Token",
+        authjwt_token_location=['headers','cookies'],
+        authjwt_decode_algorithms=['HS256','RS256']
+    )
+    compiled = AuthJWT._compiled_config
+    assert compiled.generation == ConfigMeta.generation
+    assert AuthJWT._get_compiled_config() is compiled
+
+    attributes = compiled.attributes
+    assert attributes['_secret_key'] == "secret"
+    assert attributes['_header_key'] == "x-auth-token"
+    assert attributes['_header_type_pattern'].match("Bearer token")
+    assert attributes['_allowed_algorithms'] == ('HS256','RS256')
+    assert attributes['_verify_off_thread'] is True
+
+    Authorize = AuthJWT()
+    Authorize._token = "token"
+    assert attributes['_token_location_extractor'](Authorize) == 'headers'
+    Authorize._token = None
+    assert attributes['_token_location_extractor'](Authorize) == 'cookies'
+
+    with pytest.raises(AttributeError):
+        compiled.generation = 0
+    with pytest.raises(TypeError):
+        attributes['_secret_key'] = "other"
+
+def test_class_attribute_makes_snapshot_stale(restore_config):
+    load(authjwt_secret_key="secret")
+    compiled = AuthJWT._compiled_config
+
+    AuthJWT._header_name = "X-Auth-Token"
+    assert AuthJWT._get_compiled_config() is not compiled
+    assert AuthJWT._get_compiled_config().attributes['_header_key'] == "x-auth-token"
+    # an instance without request reads the derived values of the current config
+    assert AuthJWT()._header_key == "x-auth-token"
+
+    compiled = AuthJWT._get_compiled_config()
+    with deferred_compile():
+        AuthJWT._header_type = "JWT"
+        AuthJWT._algorithm = "HS512"
+        assert AuthJWT._get_compiled_config() is compiled
+    assert AuthJWT._get_compiled_config().attributes['_allowed_algorithms'] == ('HS512',)
+
+def test_request_keeps_snapshot_during_reload(restore_config):
+    load(authjwt_secret_key="first-secret")
+    app = FastAPI()
+
+    @app.exception_handler(AuthJWTException)
+    def authjwt_exception_handler(request: Request, exc: AuthJWTException):
+        return JSONResponse(status_code=exc.status_code,content={"detail": exc.message})
+
+    @app.get('/reload')
+    def reload(Authorize: AuthJWT = Depends()):
+        load(authjwt_secret_key="second-secret",authjwt_header_name="X-Auth-Token")
+        Authorize.jwt_required()
+        return {'subject': Authorize.get_jwt_subject()}
+
+    @app.get('/protected')
+    def protected(Authorize: AuthJWT = Depends()):
+        Authorize.jwt_required()
+        return {'subject': Authorize.get_jwt_subject()}
+
+    client = TestClient(app)
+    token = AuthJWT().create_access_token(subject='test')
+
+    # the config is reloaded while the request runs, it still verifies with the old one
+    response = client.get('/reload',headers={"Authorization": "Bearer " + token})
+    assert response.status_code == 200
+    assert response.json() == {'subject': 'test'}
+
+    response = client.get('/protected',headers={"X-Auth-Token": "Bearer " + token})
+    assert response.status_code == 422
+    assert response.json() == {'detail': 'Signature verification failed'}
+
+    token = AuthJWT().create_access_token(subject='new')
+    response = client.get('/protected',headers={"X-Auth-Token": "Bearer " + token})
+    assert response.status_code == 200
+
+def test_concurrent_reload_never_mixed(restore_config):
+    configs = [
+        {'_secret_key': "first-secret", '_header_name': "Authorization"},
+        {'_secret_key': "second-secret", '_header_name': "X-Auth-Token"}
+    ]
+    load(authjwt_secret_key="first-secret")
+    stop, mixed = threading.Event(), []
+
+    def reload():
+        for i in range(200):
+            config = configs[i % 2]
+            load(authjwt_secret_key=config['_secret_key'],authjwt_header_name=config['_header_name'])
+        stop.set()
+
+    thread = threading.Thread(target=reload)
+    thread.start()
+    while not stop.is_set():
+        attributes = AuthJWT._get_compiled_config().attributes
+        seen = {'_secret_key': attributes['_secret_key'], '_header_name': attributes['_header_name']}
+        if seen not in configs or attributes['_header_key'] != seen['_header_name'].lower():
+            mixed.append(seen)
+    thread.join()
+    assert mixed == []
+
+def test_failed_reload_keeps_config(restore_config):
+    load(authjwt_secret_key="secret")
+    compiled = AuthJWT._get_compiled_config()
+    token = AuthJWT().create_access_token(subject='test')
+
+    with pytest.raises(ValueError,match="authjwt_public_key could not be loaded"):
+        load(authjwt_algorithm="RS256",authjwt_public_key="garbage",authjwt_header_name="X-Auth-Token")
+
+    # nothing of the config that failed is assigned or published
+    assert AuthJWT._get_compiled_config() is compiled
+    assert AuthJWT._algorithm == "HS256"
+    assert AuthJWT._public_key is None
+    assert AuthJWT._header_name == "Authorization"
+    assert AuthJWT().get_raw_jwt(AuthJWT().create_access_token(subject='new'))['sub'] == 'new'
+    assert AuthJWT().get_raw_jwt(token)['sub'] == 'test'
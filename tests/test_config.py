@@ -1,5 +1,6 @@
 import pytest, os, jwt
 from fastapi_jwt_auth import AuthJWT
+from fastapi_jwt_auth.codec import get_default_json_codec
 from fastapi import FastAPI, Depends
 from fastapi.testclient import TestClient
 from pydantic import BaseSettings, ValidationError
@@ -29,9 +30,13 @@ def test_default_config():
     assert AuthJWT._encode_issuer is None
     assert AuthJWT._decode_issuer is None
     assert AuthJWT._decode_audience is None
+    assert AuthJWT._max_token_length == 8192
+    assert AuthJWT._max_header_length == 1024
     assert AuthJWT._denylist_enabled is False
     assert AuthJWT._denylist_token_checks == {'access','refresh'}
     assert AuthJWT._token_in_denylist_callback is None
+    assert AuthJWT._token_in_denylist_callback_is_async is False
+    assert AuthJWT._denylist_callback_timeout is None
     assert AuthJWT._header_name == "Authorization"
     assert AuthJWT._header_type == "Bearer"
 
@@ -58,6 +63,32 @@ def test_default_config():
     assert AuthJWT._access_csrf_header_name == "X-CSRF-Token"
     assert AuthJWT._refresh_csrf_header_name == "X-CSRF-Token"
     assert AuthJWT._csrf_methods == {'POST','PUT','PATCH','DELETE'}
+    # option for HMAC signature verification
+    assert AuthJWT._hmac_fast_path is False
+    # option for JSON encoding and decoding of the tokens
+    assert AuthJWT._json_codec.name == get_default_json_codec().name
+    # option for the thread pools of verify_many and the *_async methods
+    assert AuthJWT._verify_max_workers is None
+    assert AuthJWT._async_max_workers is None
+    # option for verified token cache
+    assert AuthJWT._token_cache_enabled is False
+    assert AuthJWT._token_cache_size == 1024
+    # option for rejected token cache
+    assert AuthJWT._rejected_token_cache_enabled is False
+    assert AuthJWT._rejected_token_cache_size == 1024
+    assert AuthJWT._rejected_token_cache_ttl == 10
+    # option for denylist verdict cache
+    assert AuthJWT._denylist_cache_enabled is False
+    assert AuthJWT._denylist_cache_size == 1024
+    assert AuthJWT._denylist_cache_ttl == 1
+    # option for coalescing concurrent verifications
+    assert AuthJWT._singleflight_enabled is False
+    # option for key sets of identity providers
+    assert AuthJWT._jwks is None
+    assert AuthJWT._key_id is None
+    assert AuthJWT._keyring is None
+    assert AuthJWT._key_snapshot is None
+    assert AuthJWT._key_watcher is None
 
 def test_token_expired_false(Authorize):
     class TokenFalse(BaseSettings):
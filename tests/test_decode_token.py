@@ -1,10 +1,10 @@
 import pytest, jwt, time, os
 from fastapi_jwt_auth import AuthJWT
-from fastapi_jwt_auth.exceptions import AuthJWTException
+from fastapi_jwt_auth.exceptions import AuthJWTException, JWTDecodeError
 from fastapi import FastAPI, Depends, Request
 from fastapi.responses import JSONResponse
 from fastapi.testclient import TestClient
-from pydantic import BaseSettings
+from pydantic import BaseSettings, ValidationError
 
 @pytest.fixture(scope='function')
 def client():
@@ -127,6 +127,137 @@ def test_get_jwt_subject(client,default_access_token,encoded_token):
     assert response.status_code == 200
     assert response.json() == default_access_token['sub']
 
+@pytest.mark.parametrize("url",["/raw_token","/get_subject","/refresh_token"])
+def test_decode_token_once_per_request(client,decode_calls,encoded_token,url):
+    token = encoded_token
+    if url == '/refresh_token':
+        token = jwt.encode({'jti':'123','sub':'test','type':'refresh'},'secret-key',algorithm='HS256').decode('utf-8')
+
+    response = client.get(url,headers={"Authorization":f"Bearer {token}"})
+    assert response.status_code == 200
+    assert len(decode_calls) == 1
+
+def test_token_parsed_once(client,monkeypatch,encoded_token):
+    import fastapi_jwt_auth.auth_jwt
+    parsed = []
+    parse_token = fastapi_jwt_auth.auth_jwt.parse_token
+
+    def counting_parse_token(token,**kwargs):
+        parsed.append(token)
+        return parse_token(token,**kwargs)
+
+    monkeypatch.setattr(fastapi_jwt_auth.auth_jwt,'parse_token',counting_parse_token)
+
+    response = client.get('/raw_token',headers={"Authorization":f"Bearer {encoded_token}"})
+    assert response.status_code == 200
+    assert parsed == [encoded_token]
+
+@pytest.mark.parametrize("token",[
+    "test",
+    "a.b",
+    "a.b.c",
+    "eyJhbGciOiJIUzI1NiJ9.e30.c2ln",
+    "eyJhbGciOiJIUzI1NiIsImtpZCI6MX0.e30.c2ln",
+    jwt.encode({'sub':'test'},'secret-key',algorithm='HS256',headers={'kid':'1'}).decode('utf-8'),
+    jwt.encode({'sub':'test','exp':1},'secret-key',algorithm='HS256').decode('utf-8'),
+    jwt.encode({'sub':'test','nbf':4102444800},'secret-key',algorithm='HS256').decode('utf-8'),
+    jwt.encode({'sub':'test','iat':'now'},'secret-key',algorithm='HS256').decode('utf-8'),
+    jwt.encode({'sub':'test','aud':'foo'},'secret-key',algorithm='HS256').decode('utf-8'),
+    jwt.encode({'sub':'test','aud':1},'secret-key',algorithm='HS256').decode('utf-8'),
+    jwt.encode({'sub':'test'},'other-key',algorithm='HS256').decode('utf-8'),
+    jwt.encode({'sub':'test'},'secret-key',algorithm='HS512').decode('utf-8'),
+    jwt.encode({'sub':'test'},'secret-key',algorithm='HS256').decode('utf-8')[:-2],
+])
+def test_decode_token_same_as_pyjwt(token,Authorize):
+    try:
+        jwt.get_unverified_header(token)
+        expected = jwt.decode(token,'secret-key',algorithms=['HS256'],leeway=2)
+    except Exception as err:
+        expected = str(err)
+
+    try:
+        result = Authorize.get_raw_jwt(token)
+    except AuthJWTException as err:
+        result = err.message
+
+    assert result == expected
+
+@pytest.mark.parametrize("token,message",[
+    ("a" * 9000, "Token is too long"),
+    ("a" * 1100 + ".e30.c2ln", "Token header is too long"),
+    ("a.b.c.d", "Too many segments"),
+    ("a.b", "Not enough segments"),
+    ("eyJhbGciOiJIUzI1NiJ9.e30=.c2ln", "Invalid token, only base64url characters are allowed"),
+    ("eyJhbGciOiJIUzI1NiJ9.e3+0.c2ln", "Invalid token, only base64url characters are allowed"),
+    ("eyJhbGciOiJIUzI1NiJ9..c2ln", "Invalid token, only base64url characters are allowed"),
+])
+def test_malformed_token_rejected_before_crypto(client,monkeypatch,token,message):
+    import fastapi_jwt_auth.auth_jwt
+
+    def verify_signature(*args):
+        raise AssertionError("signature must not be verified")
+
+    monkeypatch.setattr(fastapi_jwt_auth.auth_jwt,'verify_signature',verify_signature)
+
+    response = client.get('/protected',headers={"Authorization":f"Bearer {token}"})
+    assert response.status_code == 422
+    assert response.json() == {'detail': message}
+
+def test_not_allowed_algorithm_rejected_before_payload(client,monkeypatch):
+    import fastapi_jwt_auth.jws
+    decoded = []
+    base64url_decode = fastapi_jwt_auth.jws.base64url_decode
+
+    def counting_base64url_decode(segment):
+        decoded.append(segment)
+        return base64url_decode(segment)
+
+    monkeypatch.setattr(fastapi_jwt_auth.jws,'base64url_decode',counting_base64url_decode)
+
+    token = jwt.encode({'sub':'test','big':'x' * 2000},'secret-key',algorithm='HS512').decode('utf-8')
+    response = client.get('/protected',headers={"Authorization":f"Bearer {token}"})
+    assert response.status_code == 422
+    assert response.json() == {'detail': 'The specified alg value is not allowed'}
+    assert decoded == [token.split('.')[0]]
+
+def test_max_token_length_config(client):
+    token = jwt.encode({'sub':'test','type':'access','big':'x' * 9000},'secret-key',algorithm='HS256').decode('utf-8')
+
+    @AuthJWT.load_config
+    def get_settings():
+        return [("authjwt_secret_key","secret-key"),("authjwt_max_token_length",None)]
+
+    response = client.get('/protected',headers={"Authorization":f"Bearer {token}"})
+    assert response.status_code == 200
+
+    @AuthJWT.load_config
+    def get_settings_limit():
+        return [("authjwt_secret_key","secret-key"),("authjwt_max_token_length",100)]
+
+    response = client.get('/protected',headers={"Authorization":f"Bearer {token}"})
+    assert response.status_code == 422
+    assert response.json() == {'detail': 'Token is too long'}
+
+    with pytest.raises(ValidationError,match=r"authjwt_max_header_length"):
+        @AuthJWT.load_config
+        def get_invalid_settings():
+            return [("authjwt_max_header_length",0)]
+
+    @AuthJWT.load_config
+    def get_default_settings():
+        return [("authjwt_secret_key","secret-key"),("authjwt_decode_leeway",2)]
+
+def test_verified_token_follow_config(encoded_token,Authorize):
+    assert Authorize.get_raw_jwt(encoded_token)['sub'] == 'test'
+
+    AuthJWT._decode_audience = 'foo'
+    with pytest.raises(JWTDecodeError) as err:
+        Authorize.get_raw_jwt(encoded_token)
+    assert err.value.message == 'Token is missing the "aud" claim'
+    AuthJWT._decode_audience = None
+
+    assert Authorize.get_jti(encoded_token) == '123'
+
 def test_invalid_jwt_issuer(client,Authorize):
     # No issuer claim expected or provided - OK
     token = Authorize.create_access_token(subject='test')
@@ -236,6 +367,75 @@ def test_valid_asymmetric_algorithms(client,Authorize):
     assert response.status_code == 200
     assert response.json() == {'hello':'world'}
 
+def test_asymmetric_keys_parsed_once(client,monkeypatch,Authorize):
+    from jwt.algorithms import RSAAlgorithm
+
+    DIR = os.path.abspath(os.path.dirname(__file__))
+    with open(os.path.join(DIR,'private_key.txt')) as f:
+        PRIVATE_KEY = f.read().strip()
+    with open(os.path.join(DIR,'public_key.txt')) as f:
+        PUBLIC_KEY = f.read().strip()
+
+    @AuthJWT.load_config
+    def get_settings_asymmetric():
+        return [("authjwt_algorithm","RS256"),("authjwt_private_key",PRIVATE_KEY),("authjwt_public_key",PUBLIC_KEY)]
+
+    prepared = []
+    prepare_key = RSAAlgorithm.prepare_key
+
+    def counting_prepare_key(self,key):
+        if isinstance(key,str): prepared.append(key)
+        return prepare_key(self,key)
+
+    monkeypatch.setattr(RSAAlgorithm,'prepare_key',counting_prepare_key)
+
+    for _ in range(3):
+        token = Authorize.create_access_token(subject=1)
+        response = client.get('/protected',headers={'Authorization':f"Bearer {token}"})
+        assert response.status_code == 200
+    assert prepared == []
+
+    # the key object is shared by the algorithm family
+    Authorize.create_access_token(subject=1,algorithm="PS256")
+    Authorize.create_access_token(subject=1,algorithm="RS512")
+    assert prepared == []
+
+    # changed key is parsed again
+    AuthJWT._private_key = PRIVATE_KEY + "\n"
+    Authorize.create_access_token(subject=1)
+    Authorize.create_access_token(subject=1)
+    assert prepared == [PRIVATE_KEY + "\n"]
+
+def test_ec_keys_parsed_once(client,Authorize):
+    from cryptography.hazmat.backends import default_backend
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.hazmat.primitives.asymmetric.ec import EllipticCurvePrivateKey
+
+    private_key = ec.generate_private_key(ec.SECP256R1(),default_backend())
+    PRIVATE_KEY = private_key.private_bytes(
+        serialization.Encoding.PEM,serialization.PrivateFormat.PKCS8,serialization.NoEncryption()
+    ).decode('utf-8')
+    PUBLIC_KEY = private_key.public_key().public_bytes(
+        serialization.Encoding.PEM,serialization.PublicFormat.SubjectPublicKeyInfo
+    ).decode('utf-8')
+
+    @AuthJWT.load_config
+    def get_settings_ec():
+        return [("authjwt_algorithm","ES256"),("authjwt_private_key",PRIVATE_KEY),("authjwt_public_key",PUBLIC_KEY)]
+
+    assert isinstance(AuthJWT._prepared_keys[('EC','encode')][1],EllipticCurvePrivateKey)
+
+    token = Authorize.create_access_token(subject=1)
+    response = client.get('/protected',headers={'Authorization':f"Bearer {token}"})
+    assert response.status_code == 200
+
+def test_invalid_asymmetric_key_at_startup():
+    with pytest.raises(ValueError,match=r"authjwt_public_key could not be loaded for algorithm RS256"):
+        @AuthJWT.load_config
+        def get_invalid_key():
+            return [("authjwt_algorithm","RS256"),("authjwt_public_key","invalid key")]
+
 def test_invalid_asymmetric_algorithms(client,Authorize):
     class SettingsAsymmetricOne(BaseSettings):
         authjwt_algorithm: str = "RS256"
@@ -0,0 +1,133 @@
+import pytest, time
+from fastapi_jwt_auth import AuthJWT
+from fastapi_jwt_auth.denylist import DenylistBackend, MemoryDenylist
+from fastapi_jwt_auth.exceptions import AuthJWTException
+from fastapi import FastAPI, Depends, Request
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+
+@pytest.fixture(scope='function')
+def denylist():
+    @AuthJWT.load_config
+    def get_settings():
+        return [("authjwt_secret_key","secret"),("authjwt_denylist_enabled",True)]
+
+    backend = MemoryDenylist()
+    AuthJWT.token_in_denylist_loader(backend)
+
+    yield backend
+
+    AuthJWT._denylist_enabled = False
+    AuthJWT._token_in_denylist_callback = None
+
+@pytest.fixture(scope='function')
+def client(denylist):
+    app = FastAPI()
+
+    @app.exception_handler(AuthJWTException)
+    def authjwt_exception_handler(request: Request, exc: AuthJWTException):
+        return JSONResponse(
+            status_code=exc.status_code,
+            content={"detail": exc.message}
+        )
+
+    @app.get('/jwt-required')
+    def jwt_required(Authorize: AuthJWT = Depends()):
+        Authorize.jwt_required()
+        return {'hello':'world'}
+
+    @app.delete('/revoke')
+    def revoke(Authorize: AuthJWT = Depends()):
+        Authorize.jwt_required()
+        denylist.revoke_until_exp(Authorize.get_raw_jwt())
+        return {'detail':'revoked'}
+
+    @app.get('/jwt-required-async')
+    async def jwt_required_async(Authorize: AuthJWT = Depends()):
+        await Authorize.jwt_required_async()
+        return {'hello':'world'}
+
+    client = TestClient(app)
+    return client
+
+def test_memory_denylist_registered(client,denylist,Authorize):
+    token = Authorize.create_access_token(subject='test')
+    headers = {"Authorization":f"Bearer {token}"}
+
+    assert client.get('/jwt-required',headers=headers).status_code == 200
+    assert client.delete('/revoke',headers=headers).json() == {'detail':'revoked'}
+
+    for url in ['/jwt-required','/jwt-required-async']:
+        response = client.get(url,headers=headers)
+        assert response.status_code == 401
+        assert response.json() == {'detail':'Token has been revoked'}
+
+    denylist.unrevoke(Authorize.get_raw_jwt(token))
+    assert client.get('/jwt-required',headers=headers).status_code == 200
+
+def test_memory_denylist_buckets(monkeypatch):
+    now = 1000000
+    monkeypatch.setattr(time,'time',lambda: now)
+
+    denylist = MemoryDenylist(bucket_seconds=60)
+    denylist.revoke_until_exp({'jti':'a','exp':now + 10})
+    denylist.revoke_until_exp({'jti':'b','exp':now + 15})
+    denylist.revoke_until_exp({'jti':'c','exp':now + 130})
+    denylist.revoke_until_exp({'jti':'forever'})
+
+    # a and b share the bucket ending at 1000020
+    assert sorted(denylist._buckets) == [1000020,1000140]
+    assert denylist._buckets[1000020] == {'a','b'}
+    assert denylist.is_revoked('a') and denylist.is_revoked('b') and denylist.is_revoked('forever')
+    assert len(denylist) == 4
+
+    # the bucket is dropped at its end, when every token in it has expired
+    now = 1000019
+    assert denylist.is_revoked('b')
+    now = 1000020
+    assert not denylist.is_revoked('a') and not denylist.is_revoked('b')
+    assert sorted(denylist._buckets) == [1000140]
+    assert len(denylist) == 2
+
+    now = 1000140
+    assert not denylist.is_revoked('c')
+    assert denylist.is_revoked('forever')
+    assert denylist._buckets == {} and denylist._bucket_ends == []
+
+    # already expired tokens are not stored
+    denylist.revoke_until_exp({'jti':'old','exp':now - 1})
+    assert not denylist.is_revoked('old')
+
+def test_memory_denylist_revoke_again(monkeypatch):
+    now = 1000000
+    monkeypatch.setattr(time,'time',lambda: now)
+
+    denylist = MemoryDenylist(bucket_seconds=10,leeway=5)
+    denylist.revoke_until_exp({'jti':'a','exp':now + 3})
+    assert denylist._jtis['a'] == 1000010
+
+    # revoking again moves the jti to the new bucket
+    denylist.revoke({'jti':'a'},now + 100)
+    assert denylist._jtis['a'] == 1000100
+    assert denylist._buckets[1000010] == set()
+
+    denylist.revoke({'jti':'a'})
+    assert denylist._jtis['a'] is None
+    now = 1000200
+    assert denylist.is_revoked('a')
+
+    denylist.unrevoke_jti('a')
+    denylist.unrevoke_jti('missing')
+    assert len(denylist) == 0
+
+def test_denylist_backend_interface():
+    backend = DenylistBackend(leeway=10)
+    assert backend.get_expires_at({'jti':'a','exp':100}) == 110
+    assert backend.get_expires_at({'jti':'a'}) is None
+
+    for call in [lambda: backend({'jti':'a'}), lambda: backend.revoke({'jti':'a'}), lambda: backend.unrevoke({'jti':'a'})]:
+        with pytest.raises(NotImplementedError):
+            call()
+
+    with pytest.raises(ValueError,match=r"bucket_seconds"):
+        MemoryDenylist(bucket_seconds=0)
@@ -0,0 +1,99 @@
+import pytest, asyncio
+from fastapi_jwt_auth import AuthJWT
+from fastapi_jwt_auth.denylist import AsyncRedisDenylist, BatchingDenylist, MemoryDenylist, SQLiteDenylist
+from fastapi_jwt_auth.exceptions import RevokedTokenError
+from .resp_server import RespServer
+from .event_loop import run
+
+@pytest.fixture(scope='function')
+def denylist_config():
+    secret_key = AuthJWT._secret_key
+    AuthJWT._secret_key = "secret"
+    AuthJWT._denylist_enabled = True
+
+    yield
+
+    AuthJWT._secret_key = secret_key
+    AuthJWT._denylist_enabled = False
+    AuthJWT._token_in_denylist_callback = None
+    AuthJWT._token_in_denylist_callback_is_async = False
+
+@pytest.fixture(scope='module')
+def server():
+    pytest.importorskip("redis")
+    server = RespServer().start()
+    yield server
+    server.stop()
+
+def test_concurrent_lookups_share_one_mget(server):
+    async def check():
+        backend = AsyncRedisDenylist(url=server.url)
+        denylist = BatchingDenylist(backend,max_delay=0.05)
+        await backend.revoke_jti('b')
+        # the connection is opened before counting the commands
+        await backend.is_revoked('a')
+
+        commands = len(server.commands)
+        results = await asyncio.gather(*[denylist({'jti':jti}) for jti in ['a','b','c','b']])
+        await backend.close()
+        return results, server.commands[commands:], denylist.info()
+
+    results, commands, info = run(check())
+    assert results == [False,True,False,True]
+    assert commands == ['MGET']
+    # the same jti is looked up once
+    assert info == (4,1,3)
+
+def test_batch_sent_at_max_batch_size(tmpdir):
+    backend = SQLiteDenylist(str(tmpdir.join('denylist.db')),compact_interval=None)
+    backend.revoke_jti('jti-1')
+    calls = []
+    get_many = backend.get_many
+
+    def counted_get_many(jtis):
+        calls.append(list(jtis))
+        return get_many(jtis)
+    backend.get_many = counted_get_many
+
+    async def check():
+        # the delay is long enough that only the size sends the batches
+        denylist = BatchingDenylist(backend,max_delay=60,max_batch_size=2)
+        return await asyncio.wait_for(
+            asyncio.gather(*[denylist({'jti':'jti-{}'.format(i)}) for i in range(4)]),
+            timeout=5
+        )
+
+    assert run(check()) == [False,True,False,False]
+    assert calls == [['jti-0','jti-1'],['jti-2','jti-3']]
+    backend.close()
+
+def test_errors_reach_every_lookup():
+    class BrokenDenylist(MemoryDenylist):
+        async def get_many(self, jtis):
+            raise ConnectionError("backend is down")
+
+    async def check():
+        denylist = BatchingDenylist(BrokenDenylist())
+        return await asyncio.gather(*[denylist({'jti':jti}) for jti in 'ab'],return_exceptions=True)
+
+    results = run(check())
+    assert [type(result) for result in results] == [ConnectionError,ConnectionError]
+
+    with pytest.raises(ValueError,match="max_batch_size"):
+        BatchingDenylist(MemoryDenylist(),max_batch_size=0)
+
+def test_batching_denylist_callback(denylist_config,Authorize):
+    backend = MemoryDenylist()
+    denylist = BatchingDenylist(backend)
+    AuthJWT.token_in_denylist_loader(denylist)
+    token = Authorize.create_access_token(subject='test')
+    assert AuthJWT._token_in_denylist_callback_is_async is True
+
+    async def check():
+        await AuthJWT().jwt_required_async("websocket",token=token)
+        denylist.revoke_until_exp(Authorize.get_raw_jwt(token))
+        with pytest.raises(RevokedTokenError):
+            await AuthJWT().jwt_required_async("websocket",token=token)
+
+    run(check())
+    assert denylist.info().batches == 2
@@ -0,0 +1,192 @@
+import pytest, time, asyncio, uuid
+from fastapi_jwt_auth import AuthJWT
+from fastapi_jwt_auth.exceptions import RevokedTokenError
+from fastapi_jwt_auth.denylist import AsyncBloomDenylist, BloomDenylist, BloomFilter, MemoryDenylist
+from .event_loop import run
+
+@pytest.fixture(scope='function')
+def denylist_config():
+    secret_key = AuthJWT._secret_key
+    AuthJWT._secret_key = "secret"
+    AuthJWT._denylist_enabled = True
+
+    yield
+
+    AuthJWT._secret_key = secret_key
+    AuthJWT._denylist_enabled = False
+    AuthJWT._token_in_denylist_callback = None
+    AuthJWT._token_in_denylist_callback_is_async = False
+
+def test_bloom_filter_false_positive_rate():
+    bloom = BloomFilter(1000,0.01)
+    added = [str(uuid.uuid4()) for _ in range(1000)]
+    for jti in added:
+        bloom.add(jti)
+
+    assert all(jti in bloom for jti in added)
+    false_positives = sum(str(uuid.uuid4()) in bloom for _ in range(10000))
+    assert false_positives < 300
+
+    for capacity, error_rate in [(0,0.01),(10,0),(10,1)]:
+        with pytest.raises(ValueError):
+            BloomFilter(capacity,error_rate)
+
+def test_bloom_denylist_counters():
+    backend = MemoryDenylist()
+    denylist = BloomDenylist(backend,capacity=100,error_rate=0.01)
+
+    denylist.revoke({'jti':'a'})
+    assert backend.is_revoked('a')
+    assert denylist({'jti':'a'}) is True
+    assert denylist({'jti':'b'}) is False
+    assert denylist.info() == (1,1,0,1,100)
+
+    # an unrevoked jti stays in the filter and is answered by the backend
+    denylist.unrevoke({'jti':'a'})
+    assert denylist({'jti':'a'}) is False
+    info = denylist.info()
+    assert info.passes == 2 and info.false_positives == 1
+
+    denylist.rebuild()
+    assert denylist.info().count == 0
+    assert denylist({'jti':'a'}) is False
+    assert denylist.info().hits == 2
+
+def test_bloom_denylist_rebuild():
+    backend = MemoryDenylist()
+    backend.revoke_jti('old')
+
+    # the jtis already in the backend are loaded when it can be iterated
+    denylist = BloomDenylist(backend,capacity=2)
+    assert denylist.is_revoked('old')
+
+    denylist.revoke_jti('new')
+    denylist.revoke_jti('newer')
+    # the filter is rebuilt bigger once more jtis than its capacity are revoked
+    assert denylist.info().count == 3
+    assert denylist.info().capacity == 6
+    assert all(denylist.is_revoked(jti) for jti in ['old','new','newer'])
+
+    denylist.rebuild(['other'],capacity=10)
+    assert denylist.info()[3:] == (1,10)
+    assert not denylist.is_revoked('old')
+
+def test_bloom_denylist_registered(denylist_config,Authorize):
+    denylist = BloomDenylist(MemoryDenylist())
+    AuthJWT.token_in_denylist_loader(denylist)
+    assert AuthJWT._token_in_denylist_callback_is_async is False
+
+    token = Authorize.create_access_token(subject='test')
+    AuthJWT().jwt_required("websocket",token=token)
+
+    denylist.revoke_until_exp(Authorize.get_raw_jwt(token))
+    with pytest.raises(RevokedTokenError) as err:
+        AuthJWT().jwt_required("websocket",token=token)
+    assert err.value.message == "Token has been revoked"
+    assert denylist.info()[:3] == (1,1,0)
+
+def test_async_bloom_denylist(denylist_config):
+    calls = []
+
+    class AsyncDenylist(MemoryDenylist):
+        async def __call__(self, raw_token):
+            calls.append(raw_token['jti'])
+            return self.is_revoked(raw_token['jti'])
+
+    denylist = AsyncBloomDenylist(AsyncDenylist())
+    AuthJWT.token_in_denylist_loader(denylist)
+    assert AuthJWT._token_in_denylist_callback_is_async is True
+
+    run(denylist.revoke_jti('a'))
+    assert run(denylist({'jti':'a'})) is True
+    assert run(denylist({'jti':'b'})) is False
+    # the backend is only awaited when the filter says maybe
+    assert calls == ['a']
+
+def test_bloom_denylist_revocation_during_rebuild():
+    class SlowDenylist(MemoryDenylist):
+        def __iter__(self):
+            jtis = list(super().__iter__())
+            # revoked after the jtis of the backend were read, before the new filter is swapped in
+            if 'victim' not in jtis and denylist is not None:
+                denylist.revoke_jti('victim')
+            return iter(jtis)
+
+    # the rebuild made by __init__ runs before there is a denylist to revoke with
+    denylist = None
+    denylist = BloomDenylist(SlowDenylist(),capacity=100)
+    denylist.rebuild()
+    assert denylist.backend.is_revoked('victim')
+    assert denylist.is_revoked('victim')
+    assert denylist._rebuilding == []
+
+@pytest.mark.parametrize("stored_first",[False,True])
+def test_bloom_denylist_rebuild_inside_revoke(stored_first):
+    class RebuildingDenylist(MemoryDenylist):
+        def revoke_jti(self, jti, expires_at=None):
+            # a rebuild begins between the steps of the revoke, before or after the backend has the jti
+            if stored_first:
+                super().revoke_jti(jti,expires_at)
+            denylist.rebuild()
+            if not stored_first:
+                super().revoke_jti(jti,expires_at)
+
+    denylist = BloomDenylist(RebuildingDenylist(),capacity=100)
+    denylist.revoke_jti('victim')
+    assert denylist.backend.is_revoked('victim')
+    assert denylist.is_revoked('victim')
+
+@pytest.mark.parametrize("stored_first",[False,True])
+def test_async_bloom_denylist_rebuild_inside_revoke(stored_first):
+    class AsyncDenylist(MemoryDenylist):
+        async def __call__(self, raw_token):
+            return self.is_revoked(raw_token['jti'])
+
+        async def jtis(self):
+            return list(self)
+
+        async def revoke_jti(self, jti, expires_at=None):
+            if stored_first:
+                super().revoke_jti(jti,expires_at)
+            await denylist.rebuild_async()
+            if not stored_first:
+                super().revoke_jti(jti,expires_at)
+
+    denylist = AsyncBloomDenylist(AsyncDenylist(),capacity=100)
+    run(denylist.revoke_jti('victim'))
+    assert denylist.backend.is_revoked('victim')
+    assert run(denylist({'jti':'victim'})) is True
+
+def test_bloom_denylist_rebuild_interval():
+    backend = MemoryDenylist()
+    denylist = BloomDenylist(backend,capacity=100,rebuild_interval=0.01)
+    # revoked by another process, the filter doesn't know it yet
+    backend.revoke_jti('a')
+    assert not denylist.is_revoked('a')
+
+    deadline = time.time() + 2
+    while not denylist.is_revoked('a') and time.time() < deadline:
+        time.sleep(0.01)
+    denylist.close()
+    assert denylist.is_revoked('a')
+
+def test_async_bloom_denylist_rebuild_interval():
+    class AsyncDenylist(MemoryDenylist):
+        async def __call__(self, raw_token):
+            return self.is_revoked(raw_token['jti'])
+
+        async def jtis(self):
+            return list(self)
+
+    backend = AsyncDenylist()
+    denylist = AsyncBloomDenylist(backend,capacity=100,rebuild_interval=0)
+
+    async def check():
+        backend.revoke_jti('a')
+        # the lookup that finds the interval passed starts a rebuild on the event loop
+        first = await denylist({'jti':'a'})
+        await asyncio.sleep(0.01)
+        return first, await denylist({'jti':'a'})
+
+    assert run(check()) == (False, True)
+    assert denylist.last_error is None
@@ -0,0 +1,146 @@
+import pytest, time
+from fastapi_jwt_auth import AuthJWT
+from fastapi_jwt_auth.cache import DenylistCache, invalidate_denylist_caches
+from fastapi_jwt_auth.denylist import MemoryDenylist, MemoryWatermarks
+from fastapi_jwt_auth.exceptions import AuthJWTException
+from fastapi import FastAPI, Depends, Request
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+from pydantic import ValidationError
+
+@pytest.fixture(scope='function')
+def denylist_cache():
+    @AuthJWT.load_config
+    def get_settings():
+        return [
+            ("authjwt_secret_key","secret"),
+            ("authjwt_denylist_enabled",True),
+            ("authjwt_denylist_cache_enabled",True),
+            ("authjwt_denylist_cache_ttl",5)
+        ]
+
+    yield
+
+    @AuthJWT.load_config
+    def get_secret_key():
+        return [("authjwt_secret_key","secret")]
+
+    AuthJWT._token_in_denylist_callback = None
+    AuthJWT._token_in_denylist_callback_is_async = False
+
+@pytest.fixture(scope='function')
+def client():
+    app = FastAPI()
+
+    @app.exception_handler(AuthJWTException)
+    def authjwt_exception_handler(request: Request, exc: AuthJWTException):
+        return JSONResponse(
+            status_code=exc.status_code,
+            content={"detail": exc.message}
+        )
+
+    @app.get('/jwt-required')
+    def jwt_required(Authorize: AuthJWT = Depends()):
+        Authorize.jwt_required()
+        return {'hello':'world'}
+
+    @app.get('/jwt-required-async')
+    async def jwt_required_async(Authorize: AuthJWT = Depends()):
+        await Authorize.jwt_required_async()
+        return {'hello':'world'}
+
+    client = TestClient(app)
+    return client
+
+def test_denylist_cache_hit(client,denylist_cache,monkeypatch,Authorize):
+    calls = []
+    denylist = set()
+
+    @AuthJWT.token_in_denylist_loader
+    def check_if_token_in_denylist(decrypted_token):
+        calls.append(decrypted_token['jti'])
+        return decrypted_token['jti'] in denylist
+
+    token = Authorize.create_access_token(subject='test')
+    headers = {"Authorization":f"Bearer {token}"}
+    for url in ['/jwt-required','/jwt-required-async'] * 3:
+        assert client.get(url,headers=headers).status_code == 200
+
+    assert len(calls) == 1
+    assert AuthJWT.denylist_cache_info() == (5,1,1024,1)
+
+    # a revocation the library doesn't see is picked up once the verdict expires
+    denylist.add(Authorize.get_jti(token))
+    assert client.get('/jwt-required',headers=headers).status_code == 200
+
+    now = time.time() + 5
+    with monkeypatch.context() as patch:
+        patch.setattr(time,'time',lambda: now)
+        response = client.get('/jwt-required',headers=headers)
+    assert response.status_code == 401
+    assert response.json() == {'detail':'Token has been revoked'}
+    assert len(calls) == 2
+
+@pytest.mark.parametrize("url",['/jwt-required','/jwt-required-async'])
+def test_denylist_cache_invalidated_by_backend(client,denylist_cache,url,Authorize):
+    denylist = MemoryDenylist()
+    AuthJWT.token_in_denylist_loader(MemoryWatermarks(denylist=denylist))
+
+    token = Authorize.create_access_token(subject='test')
+    headers = {"Authorization":f"Bearer {token}"}
+    assert client.get(url,headers=headers).status_code == 200
+
+    # revocations made through the backends are seen at once
+    denylist.revoke_until_exp(Authorize.get_raw_jwt(token))
+    assert client.get(url,headers=headers).status_code == 401
+    denylist.unrevoke(Authorize.get_raw_jwt(token))
+    assert client.get(url,headers=headers).status_code == 200
+
+    AuthJWT._token_in_denylist_callback.revoke_subject('test',Authorize.get_raw_jwt(token)['iat'] + 1)
+    assert client.get(url,headers=headers).status_code == 401
+    assert AuthJWT.denylist_cache_info().hits == 0
+
+def test_denylist_cache_disabled(client,Authorize):
+    @AuthJWT.load_config
+    def get_settings():
+        return [("authjwt_secret_key","secret"),("authjwt_denylist_enabled",True)]
+
+    calls = []
+
+    @AuthJWT.token_in_denylist_loader
+    def check_if_token_in_denylist(decrypted_token):
+        calls.append(decrypted_token['jti'])
+        return False
+
+    token = Authorize.create_access_token(subject='test')
+    for _ in range(3):
+        assert client.get('/jwt-required',headers={"Authorization":f"Bearer {token}"}).status_code == 200
+    assert len(calls) == 3
+    assert AuthJWT.denylist_cache_info().currsize == 0
+
+    @AuthJWT.load_config
+    def get_secret_key():
+        return [("authjwt_secret_key","secret")]
+
+    AuthJWT._token_in_denylist_callback = None
+
+def test_denylist_cache_generation():
+    cache = DenylistCache(10)
+    generation = cache.generation
+
+    # a verdict looked up before an invalidation is not stored
+    invalidate_denylist_caches('a')
+    cache.set_if_current('a',False,time.time() + 10,generation)
+    assert cache.get('a') is None
+
+    cache.set_if_current('a',False,time.time() + 10,cache.generation)
+    assert cache.get('a') is False
+    invalidate_denylist_caches()
+    assert len(cache) == 0
+
+def test_denylist_cache_config():
+    for name, value in [("authjwt_denylist_cache_size",0),("authjwt_denylist_cache_ttl",0)]:
+        with pytest.raises(ValidationError,match=name):
+            @AuthJWT.load_config
+            def get_invalid_config():
+                return [(name,value)]
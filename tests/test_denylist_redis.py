@@ -0,0 +1,148 @@
+import pytest, time, asyncio
+from fastapi_jwt_auth import AuthJWT
+from fastapi_jwt_auth.denylist import AsyncBloomDenylist, AsyncRedisDenylist, RedisDenylist
+from fastapi_jwt_auth.exceptions import AuthJWTException
+from fastapi import FastAPI, Depends, Request
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+from .resp_server import RespServer
+from .event_loop import run
+
+pytest.importorskip("redis")
+
+@pytest.fixture(scope='module')
+def server():
+    server = RespServer().start()
+    yield server
+    server.stop()
+
+@pytest.fixture(scope='function')
+def denylist_config(server):
+    secret_key = AuthJWT._secret_key
+    AuthJWT._secret_key = "secret"
+    AuthJWT._denylist_enabled = True
+    server.data.clear()
+
+    yield
+
+    AuthJWT._secret_key = secret_key
+    AuthJWT._denylist_enabled = False
+    AuthJWT._token_in_denylist_callback = None
+    AuthJWT._token_in_denylist_callback_is_async = False
+
+@pytest.fixture(scope='function')
+def client():
+    app = FastAPI()
+
+    @app.exception_handler(AuthJWTException)
+    def authjwt_exception_handler(request: Request, exc: AuthJWTException):
+        return JSONResponse(
+            status_code=exc.status_code,
+            content={"detail": exc.message}
+        )
+
+    @app.get('/jwt-required')
+    def jwt_required(Authorize: AuthJWT = Depends()):
+        Authorize.jwt_required()
+        return {'hello':'world'}
+
+    @app.get('/jwt-required-async')
+    async def jwt_required_async(Authorize: AuthJWT = Depends()):
+        await Authorize.jwt_required_async()
+        return {'hello':'world'}
+
+    client = TestClient(app)
+    return client
+
+def test_redis_denylist(client,server,denylist_config,Authorize):
+    denylist = RedisDenylist(url=server.url,max_connections=4)
+    AuthJWT.token_in_denylist_loader(denylist)
+
+    token = Authorize.create_access_token(subject='test')
+    headers = {"Authorization":f"Bearer {token}"}
+    assert client.get('/jwt-required',headers=headers).status_code == 200
+
+    raw_token = Authorize.get_raw_jwt(token)
+    denylist.revoke_until_exp(raw_token)
+    for url in ['/jwt-required','/jwt-required-async']:
+        response = client.get(url,headers=headers)
+        assert response.status_code == 401
+        assert response.json() == {'detail':'Token has been revoked'}
+
+    # the key expires with the token
+    key = ("authjwt:denylist:" + raw_token['jti']).encode()
+    assert server.data[key][1] == pytest.approx(raw_token['exp'],abs=1)
+    assert list(denylist) == [raw_token['jti']]
+
+    denylist.unrevoke(raw_token)
+    assert client.get('/jwt-required',headers=headers).status_code == 200
+    denylist.close()
+
+def test_redis_denylist_ttl(server,denylist_config):
+    denylist = RedisDenylist(url=server.url,prefix="app[1]:",leeway=10)
+    now = int(time.time())
+
+    denylist.revoke({'jti':'forever'})
+    denylist.revoke_until_exp({'jti':'a','exp':now + 100})
+    # already expired tokens are not stored
+    denylist.revoke_until_exp({'jti':'old','exp':now - 20})
+
+    assert denylist.client.ttl("app[1]:forever") == -1
+    assert 105 <= denylist.client.ttl("app[1]:a") <= 110
+    assert not denylist.is_revoked('old')
+    assert sorted(denylist) == ['a','forever']
+
+    server.data[b"other:b"] = (b"1",None)
+    assert sorted(denylist) == ['a','forever']
+
+def test_redis_denylist_pipeline(server,denylist_config):
+    denylist = RedisDenylist(url=server.url)
+    now = int(time.time())
+    server.commands.clear()
+
+    denylist.revoke_many_until_exp([{'jti':str(i),'exp':now + 60} for i in range(50)] + [{'jti':'old','exp':now - 1}])
+    assert server.commands.count('SET') == 50
+    assert all(denylist.is_revoked(str(i)) for i in range(50))
+
+def test_async_redis_denylist(client,server,denylist_config,Authorize):
+    denylist = AsyncRedisDenylist(url=server.url)
+    AuthJWT.token_in_denylist_loader(denylist)
+    assert AuthJWT._token_in_denylist_callback_is_async is True
+
+    token = Authorize.create_access_token(subject='test')
+    headers = {"Authorization":f"Bearer {token}"}
+    assert client.get('/jwt-required-async',headers=headers).status_code == 200
+
+    # a client belongs to the event loop it was first used on, the
+    # TestClient and asyncio.run don't run on the same one
+    async def revoke():
+        writer = AsyncRedisDenylist(url=server.url)
+        await writer.revoke_until_exp(Authorize.get_raw_jwt(token))
+        await writer.revoke_many([('a',None),('b',int(time.time()) + 60)])
+        jtis = await writer.jtis()
+        await writer.close()
+        return jtis
+
+    assert sorted(run(revoke())) == sorted(['a','b',Authorize.get_jti(token)])
+
+    AuthJWT.token_in_denylist_loader(AsyncRedisDenylist(url=server.url))
+    response = client.get('/jwt-required-async',headers=headers)
+    assert response.status_code == 401
+    assert response.json() == {'detail':'Token has been revoked'}
+
+def test_async_bloom_redis_denylist(server,denylist_config):
+    async def check():
+        backend = AsyncRedisDenylist(url=server.url)
+        await backend.revoke_jti('a')
+
+        denylist = AsyncBloomDenylist(backend)
+        denylist.rebuild(await backend.jtis())
+        await denylist.revoke_jti('b')
+
+        results = [await denylist({'jti':jti}) for jti in ['a','b','c']]
+        await backend.close()
+        return results, denylist.info()
+
+    results, info = run(check())
+    assert results == [True,True,False]
+    assert info.hits == 1
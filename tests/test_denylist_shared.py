@@ -0,0 +1,103 @@
+import pytest, time, multiprocessing
+from fastapi_jwt_auth import AuthJWT
+from fastapi_jwt_auth.denylist import SharedMemoryDenylist
+from fastapi_jwt_auth.exceptions import RevokedTokenError
+
+@pytest.fixture(scope='function')
+def path(tmp_path):
+    return str(tmp_path / "denylist")
+
+def revoke_in_other_process(path, jti):
+    SharedMemoryDenylist(path,capacity=16).revoke_jti(jti)
+
+def test_shared_denylist_across_processes(path,Authorize):
+    secret_key = AuthJWT._secret_key
+    AuthJWT._secret_key = "secret"
+    AuthJWT._denylist_enabled = True
+
+    denylist = SharedMemoryDenylist(path,capacity=16)
+    AuthJWT.token_in_denylist_loader(denylist)
+    token = Authorize.create_access_token(subject='test')
+    AuthJWT().jwt_required("websocket",token=token)
+
+    # a revocation made by another worker is seen without reopening the file
+    process = multiprocessing.get_context("fork").Process(
+        target=revoke_in_other_process,
+        args=(path,Authorize.get_jti(token))
+    )
+    process.start()
+    process.join()
+    assert process.exitcode == 0
+
+    with pytest.raises(RevokedTokenError) as err:
+        AuthJWT().jwt_required("websocket",token=token)
+    assert err.value.message == "Token has been revoked"
+
+    denylist.unrevoke(Authorize.get_raw_jwt(token))
+    AuthJWT().jwt_required("websocket",token=token)
+    denylist.close()
+
+    AuthJWT._secret_key = secret_key
+    AuthJWT._denylist_enabled = False
+    AuthJWT._token_in_denylist_callback = None
+
+def test_shared_denylist_expiry(path,monkeypatch):
+    now = 1000000
+    monkeypatch.setattr(time,'time',lambda: now)
+
+    denylist = SharedMemoryDenylist(path,capacity=4,leeway=5)
+    denylist.revoke_until_exp({'jti':'a','exp':now + 10})
+    denylist.revoke({'jti':'forever'})
+    # already expired tokens are not stored
+    denylist.revoke({'jti':'old'},now - 1)
+
+    assert denylist.is_revoked('a') and denylist.is_revoked('forever')
+    assert not denylist.is_revoked('old') and not denylist.is_revoked('missing')
+    assert len(denylist) == 2
+
+    now = 1000015
+    assert not denylist.is_revoked('a')
+    assert len(denylist) == 1
+
+    # revoking again updates the slot in place
+    denylist.revoke_jti('a',now + 10)
+    assert denylist.is_revoked('a')
+    assert denylist._get_header() == (0,2)
+
+def test_shared_denylist_capacity(path,monkeypatch):
+    now = 1000000
+    monkeypatch.setattr(time,'time',lambda: now)
+
+    denylist = SharedMemoryDenylist(path,capacity=4)
+    assert denylist._slots == 8
+    for jti in 'abcd':
+        denylist.revoke_jti(jti,now + 10)
+    denylist.unrevoke_jti('a')
+    assert denylist._get_header() == (0,4)
+
+    # the live jtis move to the other table when the active one has no room left
+    denylist.revoke_jti('e')
+    assert denylist._get_header() == (1,4)
+    assert [denylist.is_revoked(jti) for jti in 'abcde'] == [False,True,True,True,True]
+
+    with pytest.raises(RuntimeError,match=r"full"):
+        denylist.revoke_jti('f')
+
+    # expired jtis are dropped too, the failed revocation already moved them back to the first table
+    now = 1000010
+    denylist.revoke_jti('f')
+    assert denylist._get_header() == (1,2)
+    assert [denylist.is_revoked(jti) for jti in 'bef'] == [False,True,True]
+
+def test_shared_denylist_file(path):
+    SharedMemoryDenylist(path,capacity=16).close()
+    with pytest.raises(ValueError,match=r"capacity"):
+        SharedMemoryDenylist(path,capacity=1000)
+
+    with open(path,'r+b') as f:
+        f.write(b'X')
+    with pytest.raises(ValueError,match=r"not a shared denylist"):
+        SharedMemoryDenylist(path,capacity=16)
+
+    with pytest.raises(ValueError,match=r"capacity"):
+        SharedMemoryDenylist(path + "2",capacity=0)
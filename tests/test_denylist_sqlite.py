@@ -0,0 +1,95 @@
+import pytest, time, sqlite3
+from fastapi_jwt_auth import AuthJWT
+from fastapi_jwt_auth.denylist import SQLiteDenylist
+from fastapi_jwt_auth.exceptions import RevokedTokenError
+
+@pytest.fixture(scope='function')
+def path(tmp_path):
+    return str(tmp_path / "denylist.db")
+
+def test_sqlite_denylist_registered(path,Authorize):
+    secret_key = AuthJWT._secret_key
+    AuthJWT._secret_key = "secret"
+    AuthJWT._denylist_enabled = True
+
+    denylist = SQLiteDenylist(path)
+    AuthJWT.token_in_denylist_loader(denylist)
+    token = Authorize.create_access_token(subject='test')
+    AuthJWT().jwt_required("websocket",token=token)
+
+    denylist.revoke_until_exp(Authorize.get_raw_jwt(token))
+    with pytest.raises(RevokedTokenError) as err:
+        AuthJWT().jwt_required("websocket",token=token)
+    assert err.value.message == "Token has been revoked"
+
+    # the database is shared with other processes and survives restarts
+    denylist.close()
+    other = SQLiteDenylist(path)
+    assert other.is_revoked(Authorize.get_jti(token))
+    other.unrevoke(Authorize.get_raw_jwt(token))
+    assert not denylist.is_revoked(Authorize.get_jti(token))
+    other.close()
+
+    AuthJWT._secret_key = secret_key
+    AuthJWT._denylist_enabled = False
+    AuthJWT._token_in_denylist_callback = None
+
+def test_sqlite_denylist_expiry(path,monkeypatch):
+    now = 1000000
+    monkeypatch.setattr(time,'time',lambda: now)
+
+    denylist = SQLiteDenylist(path,compact_interval=None,compact_batch_size=2,leeway=5)
+    denylist.revoke_many_until_exp([{'jti':str(i),'exp':now + i} for i in range(1,6)] + [{'jti':'forever'}])
+    # already expired tokens are not stored
+    denylist.revoke({'jti':'old'},now - 1)
+
+    assert sorted(denylist) == ['1','2','3','4','5','forever']
+    assert denylist.is_revoked('1')
+
+    now = 1000008
+    assert not denylist.is_revoked('1') and not denylist.is_revoked('3')
+    assert denylist.is_revoked('4') and denylist.is_revoked('forever')
+    assert len(denylist) == 3
+
+    # expired rows stay until they are compacted
+    count = "SELECT COUNT(*) FROM authjwt_denylist"
+    assert denylist._connection().execute(count).fetchone()[0] == 6
+    assert denylist.compact() == 3
+    assert denylist._connection().execute(count).fetchone()[0] == 3
+
+    # revoking again moves the expiry
+    denylist.revoke({'jti':'4'})
+    now = 1000100
+    assert sorted(denylist) == ['4','forever']
+
+def test_sqlite_denylist_wal_and_index(path):
+    denylist = SQLiteDenylist(path,table="revoked")
+    connection = denylist._connection()
+    assert connection.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    plan = connection.execute(
+        "EXPLAIN QUERY PLAN DELETE FROM revoked WHERE jti IN (SELECT jti FROM revoked WHERE expires_at <= 1 LIMIT 10)"
+    ).fetchall()
+    assert any("revoked_expires_at" in row[-1] for row in plan)
+
+    with pytest.raises(ValueError,match=r"table"):
+        SQLiteDenylist(path,table="revoked; DROP TABLE revoked")
+
+def test_sqlite_denylist_background_compaction(path):
+    denylist = SQLiteDenylist(path,compact_interval=0.01)
+    denylist.revoke_jti('a',time.time() + 1)
+    denylist.revoke_jti('b')
+
+    connection = sqlite3.connect(path)
+    deadline = time.time() + 5
+    while time.time() < deadline:
+        if connection.execute("SELECT COUNT(*) FROM authjwt_denylist").fetchone()[0] == 1:
+            break
+        time.sleep(0.05)
+    assert connection.execute("SELECT jti FROM authjwt_denylist").fetchall() == [('b',)]
+    assert denylist._compactor.name == "authjwt-sqlite-compactor"
+
+    denylist.close()
+    denylist._compactor.join(1)
+    assert not denylist._compactor.is_alive()
+    connection.close()
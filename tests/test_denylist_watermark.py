@@ -0,0 +1,180 @@
+import pytest, time
+from fastapi_jwt_auth import AuthJWT
+from fastapi_jwt_auth.denylist import (
+    AsyncRedisDenylist, AsyncRedisWatermarks, MemoryDenylist,
+    MemoryWatermarks, RedisWatermarks, SubjectWatermarks
+)
+from fastapi_jwt_auth.exceptions import AuthJWTException, RevokedTokenError
+from fastapi import FastAPI, Depends, Request
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+from .resp_server import RespServer
+from .event_loop import run
+
+@pytest.fixture(scope='function')
+def denylist_config():
+    secret_key = AuthJWT._secret_key
+    AuthJWT._secret_key = "secret"
+    AuthJWT._denylist_enabled = True
+
+    yield
+
+    AuthJWT._secret_key = secret_key
+    AuthJWT._denylist_enabled = False
+    AuthJWT._token_in_denylist_callback = None
+    AuthJWT._token_in_denylist_callback_is_async = False
+
+@pytest.fixture(scope='function')
+def client():
+    app = FastAPI()
+
+    @app.exception_handler(AuthJWTException)
+    def authjwt_exception_handler(request: Request, exc: AuthJWTException):
+        return JSONResponse(
+            status_code=exc.status_code,
+            content={"detail": exc.message}
+        )
+
+    @app.get('/jwt-required')
+    def jwt_required(Authorize: AuthJWT = Depends()):
+        Authorize.jwt_required()
+        return {'hello':'world'}
+
+    @app.get('/jwt-required-async')
+    async def jwt_required_async(Authorize: AuthJWT = Depends()):
+        await Authorize.jwt_required_async()
+        return {'hello':'world'}
+
+    @app.delete('/logout-everywhere')
+    def logout_everywhere(Authorize: AuthJWT = Depends()):
+        Authorize.jwt_required()
+        # the tokens were issued in this second too
+        AuthJWT._token_in_denylist_callback.revoke_subject(Authorize.get_jwt_subject(),int(time.time()) + 1)
+        return {'detail':'revoked'}
+
+    client = TestClient(app)
+    return client
+
+def test_memory_watermarks_logout_everywhere(client,denylist_config,Authorize):
+    watermarks = MemoryWatermarks()
+    AuthJWT.token_in_denylist_loader(watermarks)
+
+    tokens = [Authorize.create_access_token(subject=1) for _ in range(3)]
+    other = Authorize.create_access_token(subject=2)
+    assert client.get('/jwt-required',headers={"Authorization":f"Bearer {tokens[0]}"}).status_code == 200
+
+    # one write revokes every token of the subject
+    assert client.delete('/logout-everywhere',headers={"Authorization":f"Bearer {tokens[0]}"}).status_code == 200
+    assert len(watermarks) == 1
+    for token in tokens:
+        for url in ['/jwt-required','/jwt-required-async']:
+            response = client.get(url,headers={"Authorization":f"Bearer {token}"})
+            assert response.status_code == 401
+            assert response.json() == {'detail':'Token has been revoked'}
+    assert client.get('/jwt-required',headers={"Authorization":f"Bearer {other}"}).status_code == 200
+
+    # tokens issued after the watermark are accepted
+    watermarks.revoke_subject(1,Authorize.get_raw_jwt(tokens[0])['iat'] - 1)
+    assert client.get('/jwt-required',headers={"Authorization":f"Bearer {tokens[1]}"}).status_code == 200
+
+    watermarks.revoke_subject(1)
+    watermarks.unrevoke_subject(1)
+    assert client.get('/jwt-required',headers={"Authorization":f"Bearer {tokens[2]}"}).status_code == 200
+
+def test_memory_watermarks_login_after_revoke(client,denylist_config,Authorize):
+    watermarks = MemoryWatermarks()
+    AuthJWT.token_in_denylist_loader(watermarks)
+
+    # a login in the same second as the revocation, like right after a password reset
+    watermarks.revoke_subject('test')
+    token = Authorize.create_access_token(subject='test')
+    assert Authorize.get_raw_jwt(token)['iat'] >= watermarks.get_watermark('test')
+    assert client.get('/jwt-required',headers={"Authorization":f"Bearer {token}"}).status_code == 200
+
+def test_memory_watermarks_rules(monkeypatch):
+    now = 1000000
+    monkeypatch.setattr(time,'time',lambda: now)
+    denylist = MemoryDenylist()
+    watermarks = MemoryWatermarks(denylist=denylist,ttl=100)
+
+    watermarks.revoke_subject('test')
+    assert watermarks.get_watermark('test') == now
+    assert watermarks({'jti':'a','sub':'test','iat':now - 1}) is True
+    # issued in the second of the revocation, it may be the login that followed it
+    assert watermarks({'jti':'a','sub':'test','iat':now}) is False
+    assert watermarks({'jti':'a','sub':'test','iat':now + 1}) is False
+    # a token without iat can't be shown to be issued after the watermark
+    assert watermarks({'jti':'a','sub':'test'}) is True
+
+    # the wrapped denylist answers for the tokens the watermark doesn't revoke
+    denylist.revoke_jti('b')
+    assert watermarks({'jti':'b','sub':'test','iat':now + 1}) is True
+    assert watermarks({'jti':'b'}) is True
+    assert watermarks({'jti':'c'}) is False
+
+    # the watermark is forgotten after ttl seconds
+    now = 1000100
+    assert watermarks.get_watermark('test') is None
+    assert len(watermarks) == 0
+
+def test_subject_watermarks_interface():
+    watermarks = SubjectWatermarks()
+    for call in [
+        lambda: watermarks({'jti':'a','sub':'test'}),
+        lambda: watermarks.revoke_subject('test'),
+        lambda: watermarks.unrevoke_subject('test')
+    ]:
+        with pytest.raises(NotImplementedError):
+            call()
+
+@pytest.fixture(scope='module')
+def server():
+    pytest.importorskip("redis")
+    server = RespServer().start()
+    yield server
+    server.stop()
+
+def test_redis_watermarks(server,denylist_config,Authorize):
+    watermarks = RedisWatermarks(url=server.url,ttl=900)
+    AuthJWT.token_in_denylist_loader(watermarks)
+    token = Authorize.create_access_token(subject='test')
+
+    AuthJWT().jwt_required("websocket",token=token)
+    watermarks.revoke_subject('test',int(time.time()) + 1)
+    with pytest.raises(RevokedTokenError) as err:
+        AuthJWT().jwt_required("websocket",token=token)
+    assert err.value.message == "Token has been revoked"
+
+    # kept ttl seconds after the watermark
+    assert 895 <= watermarks.client.ttl("authjwt:watermark:test") <= 901
+    # a watermark that would already be forgotten is not stored
+    watermarks.revoke_subject('old',int(time.time()) - 1000)
+    assert watermarks.get_watermark('old') is None
+
+    watermarks.unrevoke_subject('test')
+    AuthJWT().jwt_required("websocket",token=token)
+    watermarks.close()
+
+def test_async_redis_watermarks(server,denylist_config,Authorize):
+    token = Authorize.create_access_token(subject='test')
+    raw_token = Authorize.get_raw_jwt(token)
+
+    async def check():
+        denylist = AsyncRedisDenylist(url=server.url)
+        watermarks = AsyncRedisWatermarks(denylist=denylist,url=server.url)
+        results = [await watermarks(raw_token)]
+
+        await denylist.revoke_until_exp(raw_token)
+        results.append(await watermarks(raw_token))
+        await denylist.unrevoke(raw_token)
+
+        await watermarks.revoke_subject('test',raw_token['iat'] + 1)
+        results.append(await watermarks(raw_token))
+        await watermarks.unrevoke_subject('test')
+        results.append(await watermarks.get_watermark('test'))
+
+        await denylist.close()
+        await watermarks.close()
+        return results
+
+    assert run(check()) == [False,True,True,None]
@@ -0,0 +1,125 @@
+import pytest, jwt, time
+from fastapi_jwt_auth import AuthJWT
+from fastapi_jwt_auth.jws import HMACEngine, encode_signing_input, encode_token
+from fastapi_jwt_auth.exceptions import AuthJWTException
+from jwt.exceptions import InvalidKeyError
+from pydantic import BaseSettings
+
+@pytest.fixture(scope='function')
+def fast_path():
+    class Settings(BaseSettings):
+        authjwt_secret_key: str = "secret-key"
+        authjwt_decode_algorithms: list = ['HS256','HS384','HS512']
+        authjwt_hmac_fast_path: bool = True
+
+    @AuthJWT.load_config
+    def get_settings():
+        return Settings()
+
+    yield
+
+    AuthJWT._hmac_fast_path = False
+
+@pytest.mark.parametrize("algorithm",["HS256","HS384","HS512"])
+@pytest.mark.parametrize("payload,headers",[
+    ({'sub':'test'},None),
+    ({'sub':'tëst','roles':['a','b'],'nested':{'x':1.5,'y':None,'z':True}},None),
+    ({'sub':1,'exp':4102444800,'aud':['foo','bar']},{'kid':'key-1'}),
+    ({'sub':'test'},{'kid':'key-1','alg':'none','typ':'at+jwt','x5t':'abc'}),
+])
+@pytest.mark.parametrize("secret_key",["secret-key",b"\x00\xffsecret-key"])
+def test_engine_same_token_as_pyjwt(algorithm,payload,headers,secret_key):
+    engine = HMACEngine(secret_key)
+    signing_input = encode_signing_input(payload,algorithm,headers)
+    token = encode_token(signing_input,engine.sign(algorithm,signing_input))
+
+    assert token == jwt.encode(payload,secret_key,algorithm=algorithm,headers=headers).decode('utf-8')
+    assert engine.verify(algorithm,signing_input,engine.sign(algorithm,signing_input))
+    assert not engine.verify(algorithm,signing_input,b"\x00" * 32)
+
+def test_engine_reject_same_keys_as_pyjwt():
+    secret_key = "-----BEGIN PUBLIC KEY-----\nMIIBIjAN\n-----END PUBLIC KEY-----"
+    with pytest.raises(InvalidKeyError):
+        jwt.encode({'sub':'test'},secret_key,algorithm='HS256')
+    with pytest.raises(InvalidKeyError):
+        HMACEngine(secret_key)
+
+@pytest.mark.parametrize("algorithm",["HS256","HS384","HS512"])
+def test_create_token_same_as_pyjwt(fast_path,algorithm,Authorize):
+    for token in [
+        Authorize.create_access_token(subject='test',algorithm=algorithm,user_claims={'roles':['a']}),
+        Authorize.create_refresh_token(subject='test',algorithm=algorithm,headers={'kid':'key-1'}),
+        Authorize.create_access_token(subject='test',algorithm=algorithm,fresh=True,audience='foo',expires_time=60)
+    ]:
+        header = jwt.get_unverified_header(token)
+        claims = jwt.decode(token,verify=False)
+        extra = {k: v for k, v in header.items() if k not in ('typ','alg')}
+        expected = jwt.encode(claims,'secret-key',algorithm=algorithm,headers=extra or None).decode('utf-8')
+        assert token == expected
+
+def test_create_token_invalid_headers(fast_path,Authorize):
+    with pytest.raises(ValueError,match=r"dictionary update sequence element"):
+        Authorize.create_access_token(subject='test',headers="test")
+
+    with pytest.raises(jwt.exceptions.InvalidTokenError,match=r"Key ID header parameter must be a string"):
+        Authorize.create_access_token(subject='test',headers={'kid':1})
+
+now = int(time.time())
+
+@pytest.mark.parametrize("token",[
+    "test",
+    "eyJhbGciOiJIUzI1NiJ9.e30.c2ln",
+    jwt.encode({'sub':'test','type':'access'},'secret-key',algorithm='HS256').decode('utf-8'),
+    jwt.encode({'sub':'test','type':'access'},'secret-key',algorithm='HS384').decode('utf-8'),
+    jwt.encode({'sub':'test','type':'access'},'secret-key',algorithm='HS512').decode('utf-8'),
+    jwt.encode({'sub':'test','type':'access'},'other-key',algorithm='HS256').decode('utf-8'),
+    jwt.encode({'sub':'test','type':'access'},'secret-key',algorithm='HS256').decode('utf-8')[:-2],
+    jwt.encode({'sub':'test','exp':now - 1},'secret-key',algorithm='HS256').decode('utf-8'),
+    jwt.encode({'sub':'test','exp':now + 60},'secret-key',algorithm='HS256').decode('utf-8'),
+    jwt.encode({'sub':'test','nbf':now + 60},'secret-key',algorithm='HS256').decode('utf-8'),
+    jwt.encode({'sub':'test','iat':'now'},'secret-key',algorithm='HS256').decode('utf-8'),
+    jwt.encode({'sub':'test','iss':'urn:foo'},'secret-key',algorithm='HS256').decode('utf-8'),
+    jwt.encode({'sub':'test','iss':'urn:bar'},'secret-key',algorithm='HS256').decode('utf-8'),
+    jwt.encode({'sub':'test','aud':'foo'},'secret-key',algorithm='HS256').decode('utf-8'),
+    jwt.encode({'sub':'test','aud':['bar','foo']},'secret-key',algorithm='HS256').decode('utf-8'),
+    jwt.encode({'sub':'test','aud':1},'secret-key',algorithm='HS256').decode('utf-8'),
+    jwt.encode({'sub':'test'},None,algorithm='none').decode('utf-8'),
+])
+@pytest.mark.parametrize("issuer,audience",[(None,None),("urn:foo",None),(None,"foo"),("urn:foo",["foo","baz"])])
+def test_decode_token_same_as_pyjwt(fast_path,token,issuer,audience):
+    AuthJWT._decode_audience = audience
+
+    try:
+        jwt.get_unverified_header(token)
+        expected = jwt.decode(
+            token,
+            'secret-key',
+            algorithms=['HS256','HS384','HS512'],
+            issuer=issuer,
+            audience=audience
+        )
+    except Exception as err:
+        expected = str(err)
+
+    for enabled in [True, False]:
+        AuthJWT._hmac_fast_path = enabled
+        try:
+            result = AuthJWT()._verified_token(token,issuer)
+        except AuthJWTException as err:
+            result = err.message
+        assert result == expected
+
+    AuthJWT._decode_audience = None
+
+def test_engine_follow_secret_key(fast_path,Authorize):
+    token = Authorize.create_access_token(subject='test')
+    engine = AuthJWT._hmac_engine
+    assert Authorize.get_raw_jwt(token)['sub'] == 'test'
+    assert AuthJWT._hmac_engine is engine
+
+    AuthJWT._secret_key = "new-secret"
+    with pytest.raises(AuthJWTException) as err:
+        AuthJWT().get_raw_jwt(token)
+    assert err.value.message == 'Signature verification failed'
+    assert AuthJWT._hmac_engine is not engine
+    assert AuthJWT._hmac_engine.secret_key == "new-secret"
@@ -0,0 +1,156 @@
+import pytest, jwt, json, enum, uuid
+from datetime import datetime, timezone
+from fastapi_jwt_auth import AuthJWT
+from fastapi_jwt_auth.codec import JSONCodec, OrjsonCodec, get_default_json_codec
+from fastapi_jwt_auth.exceptions import AuthJWTException
+from pydantic import ValidationError
+
+orjson = pytest.importorskip("orjson")
+
+class Color(enum.Enum):
+    red = "red"
+
+class Level(enum.IntEnum):
+    high = 1
+
+# deeper than orjson nests
+deep = []
+for _ in range(300):
+    deep = [deep]
+
+def stdlib_dumps(obj):
+    return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+@pytest.mark.parametrize("obj",[
+    {'sub':'test','roles':['a','b'],'tenants':{'t1':{'admin':True,'quota':None}}},
+    {'sub':'test','del':'\x7f','tilde':'~'},
+    {'sub':'tëst','emoji':'\U0001f600','escape':'"\\\n\t\x00'},
+    {'sub':1,'float':1.5,'small':1e-07,'big':1e16,'nan':float('nan'),'inf':float('inf')},
+    {'sub':'test','int':2**63,'bigger':2**70,'negative':-2**64},
+    {'sub':'test','tuple':(1,2),'nested':[[[]]]},
+    {1:'int key',True:'bool key',None:'none key'},
+    {'enum':Level.high},
+    {'deep':deep},
+])
+def test_dumps_same_as_stdlib(obj):
+    assert OrjsonCodec().dumps(obj) == stdlib_dumps(obj)
+
+@pytest.mark.parametrize("obj",[
+    {'enum':Color.red},
+    {'uuid':uuid.uuid4()},
+    {'datetime':datetime.now(timezone.utc)},
+    {'set':{1,2}},
+])
+def test_dumps_same_errors_as_stdlib(obj):
+    with pytest.raises(TypeError) as expected:
+        stdlib_dumps(obj)
+    with pytest.raises(TypeError) as err:
+        OrjsonCodec().dumps(obj)
+    assert str(err.value) == str(expected.value)
+
+@pytest.mark.parametrize("data",[
+    b'{"sub":"test","roles":["a","b"],"tenants":{"t1":{"admin":true,"quota":null}}}',
+    b'{"sub":"t\\u00ebst","raw":"t\xc3\xabst"}',
+    b'{"a":1,"a":2}',
+    b' {"a" : [1 , 2.5e3] } \n',
+    b'{"a":18446744073709551615,"b":123456789012345678901234,"c":-9223372036854775809}',
+    b'{"a":1e400,"b":NaN,"c":-Infinity}',
+    b'{"a":"\\ud800"}',
+    b'{"a":0.1,"b":-0.0,"c":1.7976931348623157e308}',
+])
+def test_loads_same_as_stdlib(data):
+    result = OrjsonCodec().loads(data)
+    expected = json.loads(data.decode('utf-8'))
+    assert repr(result) == repr(expected)
+    assert [type(v) for v in result.values()] == [type(v) for v in expected.values()]
+
+@pytest.mark.parametrize("data",[
+    b'\xef\xbb\xbf{}',
+    b'{"a":1',
+    b'{"a":"\xff"}',
+    b"{'a':1}",
+    b'',
+])
+def test_loads_same_errors_as_stdlib(data):
+    with pytest.raises(ValueError) as expected:
+        json.loads(data.decode('utf-8'))
+    with pytest.raises(ValueError) as err:
+        OrjsonCodec().loads(data)
+    assert str(err.value) == str(expected.value)
+
+@pytest.fixture(scope='function')
+def codec_config():
+    def load(codec):
+        @AuthJWT.load_config
+        def get_settings():
+            return [("authjwt_secret_key","secret"),("authjwt_json_codec",codec)]
+
+    yield load
+
+    AuthJWT._json_codec = get_default_json_codec()
+
+@pytest.mark.parametrize("user_claims",[
+    {},
+    {'roles':['admin'] * 50,'tenants':{str(i):{'name':'tenant','level':i} for i in range(20)}},
+    {'name':'tëst','ratio':0.5,'big':2**80},
+])
+def test_tokens_same_for_every_codec(codec_config,user_claims,Authorize):
+    codec_config("orjson")
+    token = Authorize.create_access_token(subject='test',user_claims=user_claims)
+    header = jwt.get_unverified_header(token)
+    claims = jwt.decode(token,'secret',algorithms=['HS256'])
+
+    expected = jwt.encode(claims,'secret',algorithm='HS256').decode('utf-8')
+    assert token == expected
+    assert header == {'typ':'JWT','alg':'HS256'}
+
+    for codec in ["orjson","json"]:
+        codec_config(codec)
+        assert Authorize.get_raw_jwt(token) == claims
+        assert Authorize.get_unverified_jwt_headers(token) == header
+
+def test_datetime_time_claims_same_as_pyjwt(codec_config,Authorize):
+    codec_config("orjson")
+    exp = datetime(2100,1,1,tzinfo=timezone.utc)
+    token = Authorize.create_access_token(subject='test',user_claims={'exp':exp})
+    assert Authorize.get_raw_jwt(token)['exp'] == 4102444800
+
+def test_invalid_payload_same_error_for_every_codec(codec_config):
+    token = jwt.api_jws.encode(b'{"sub":"test"',"secret",algorithm="HS256").decode('utf-8')
+    messages = []
+    for codec in ["orjson","json"]:
+        codec_config(codec)
+        with pytest.raises(AuthJWTException) as err:
+            AuthJWT().get_raw_jwt(token)
+        messages.append(err.value.message)
+
+    assert messages[0] == messages[1]
+    assert messages[0].startswith("Invalid payload string: ")
+
+def test_custom_codec(codec_config):
+    class CountingCodec(JSONCodec):
+        calls = []
+
+        def dumps(self, obj):
+            self.calls.append('dumps')
+            return super().dumps(obj)
+
+        def loads(self, data):
+            self.calls.append('loads')
+            return super().loads(data)
+
+    codec_config(CountingCodec())
+    token = AuthJWT().create_access_token(subject='test')
+    assert AuthJWT().get_raw_jwt(token)['sub'] == 'test'
+    assert CountingCodec.calls == ['dumps','dumps','loads','loads']
+
+def test_json_codec_config():
+    with pytest.raises(ValidationError,match=r"authjwt_json_codec"):
+        @AuthJWT.load_config
+        def get_invalid_codec():
+            return [("authjwt_json_codec","ujson")]
+
+    with pytest.raises(ValidationError,match=r"authjwt_json_codec"):
+        @AuthJWT.load_config
+        def get_invalid_codec_type():
+            return [("authjwt_json_codec",object())]
@@ -0,0 +1,166 @@
+import pytest, os, json, time, pickle
+from fastapi_jwt_auth import AuthJWT
+from fastapi_jwt_auth.jwks import JWKS, JWKSet
+from fastapi_jwt_auth.exceptions import JWTDecodeError
+from cryptography.hazmat.backends import default_backend
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, rsa
+from jwt.algorithms import RSAAlgorithm
+from jwt.exceptions import InvalidKeyError
+from jwt.utils import to_base64url_uint
+from pydantic import ValidationError
+from .jwks_server import JWKSServer
+
+def read_key(name):
+    with open(os.path.join(os.path.dirname(__file__),name)) as f:
+        return f.read()
+
+def pem(private_key):
+    return private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption()
+    ).decode('utf-8')
+
+def rsa_jwk(private_pem, kid):
+    private_key = serialization.load_pem_private_key(private_pem.encode('utf-8'),None,default_backend())
+    jwk = json.loads(RSAAlgorithm.to_jwk(private_key.public_key()))
+    jwk.update(kid=kid,use='sig',alg='RS256')
+    return jwk
+
+def ec_jwk(private_key, kid):
+    numbers = private_key.public_key().public_numbers()
+    return {
+        'kty': 'EC', 'crv': 'P-256', 'kid': kid,
+        'x': to_base64url_uint(numbers.x).decode(), 'y': to_base64url_uint(numbers.y).decode()
+    }
+
+KEY_A = read_key('private_key.txt')
+KEY_B = pem(rsa.generate_private_key(65537,2048,default_backend()))
+KEY_EC = ec.generate_private_key(ec.SECP256R1(),default_backend())
+
+def load(jwks, **settings):
+    @AuthJWT.load_config
+    def get_settings():
+        return [
+            ("authjwt_algorithm","RS256"),
+            ("authjwt_decode_algorithms",["RS256","ES256"]),
+            ("authjwt_private_key",KEY_A),
+            ("authjwt_jwks",jwks),
+            *settings.items()
+        ]
+
+def token_with(private_key, kid=None, algorithm="RS256"):
+    AuthJWT._private_key = private_key
+    AuthJWT._prepared_keys = {}
+    headers = {'kid': kid} if kid is not None else None
+    return AuthJWT().create_access_token(subject='test',algorithm=algorithm,headers=headers)
+
+def verify(token):
+    return AuthJWT().get_raw_jwt(token)['sub']
+
+def test_jwks_file_kid_lookup(restore_config,tmpdir):
+    path = tmpdir.join('jwks.json')
+    path.write(json.dumps({'keys': [rsa_jwk(KEY_A,'a'),rsa_jwk(KEY_B,'b'),{'kty':'oct','k':'c2VjcmV0'}]}))
+    load(str(path))
+    assert len(AuthJWT._jwks.key_set) == 2
+
+    assert verify(token_with(KEY_A,'a')) == 'test'
+    assert verify(token_with(KEY_B,'b')) == 'test'
+
+    for token, message in [
+        (token_with(KEY_A,'b'),"Signature verification failed"),
+        (token_with(KEY_A,'c'),"Unknown key id c"),
+        (token_with(KEY_A),"The token has no kid header"),
+        (token_with(KEY_EC,'a',"ES256"),"The key a can't be used with algorithm ES256")
+    ]:
+        with pytest.raises(JWTDecodeError) as err:
+            verify(token)
+        assert err.value.message == message
+
+    # the keys are swapped in when the file changes
+    context = AuthJWT()._get_decoding_context()
+    path.write(json.dumps({'keys': [rsa_jwk(KEY_B,'b'),ec_jwk(KEY_EC,'c')]}))
+    os.utime(str(path),(time.time() + 5,time.time() + 5))
+    assert AuthJWT._jwks.refresh() is True
+    assert verify(token_with(KEY_EC,'c',"ES256")) == 'test'
+    with pytest.raises(JWTDecodeError):
+        verify(token_with(KEY_A,'a'))
+    assert AuthJWT()._get_decoding_context() != context
+
+def test_jwks_without_kid(restore_config,tmpdir):
+    path = tmpdir.join('jwks.json')
+    path.write(json.dumps({'keys': [rsa_jwk(KEY_B,'b')]}))
+
+    # a token without kid is verified with the only key of the set
+    load(str(path))
+    assert verify(token_with(KEY_B)) == 'test'
+
+    # or with authjwt_public_key
+    path.write(json.dumps({'keys': [rsa_jwk(KEY_B,'b'),rsa_jwk(KEY_B,'c')]}))
+    load(str(path),authjwt_public_key=read_key('public_key.txt'))
+    assert verify(token_with(KEY_A)) == 'test'
+    assert verify(token_with(KEY_B,'c')) == 'test'
+
+@pytest.fixture(scope='function')
+def server():
+    server = JWKSServer({'keys': [rsa_jwk(KEY_A,'a')]}).start()
+    yield server
+    server.stop()
+
+def test_jwks_url_etag_and_max_age(restore_config,server):
+    server.max_age = 120
+    load(server.url)
+    jwks = AuthJWT._jwks
+    key_set = jwks.key_set
+    assert verify(token_with(KEY_A,'a')) == 'test'
+    assert 110 < jwks._next_refresh - time.time() <= 120
+
+    # not modified, the keys stay the same objects
+    assert jwks.refresh() is True
+    assert server.requests[-1] is not None
+    assert jwks.key_set is key_set
+
+    # the keys are still used while the identity provider is down
+    server.status = 500
+    assert jwks.refresh() is False
+    assert isinstance(jwks.last_error,Exception)
+    assert verify(token_with(KEY_A,'a')) == 'test'
+
+    # until max_stale has passed
+    jwks._stale_at = time.time() - 1
+    with pytest.raises(JWTDecodeError) as err:
+        verify(token_with(KEY_A,'a'))
+    assert "could not be refreshed" in err.value.message
+
+def test_jwks_unknown_kid_refreshes_in_background(server):
+    jwks = JWKS(server.url,refresh_interval=300,min_refresh_interval=0).load()
+    server.document = {'keys': [rsa_jwk(KEY_A,'a'),rsa_jwk(KEY_B,'b')]}
+
+    requests = len(server.requests)
+    with pytest.raises(InvalidKeyError):
+        jwks.get_key('b','RS256')
+    # the lookup didn't fetch, the background thread does
+    deadline = time.time() + 5
+    while 'b' not in jwks.key_set.keys and time.time() < deadline:
+        time.sleep(0.01)
+    assert jwks.get_key('b','RS256') is not None
+    assert len(server.requests) == requests + 1
+    jwks.close()
+
+def test_jwks_pickle(tmpdir):
+    path = tmpdir.join('jwks.json')
+    path.write(json.dumps({'keys': [rsa_jwk(KEY_A,'a'),ec_jwk(KEY_EC,'e')]}))
+    jwks = pickle.loads(pickle.dumps(JWKS(str(path)).load()))
+    assert jwks.get_key('e','ES256').public_numbers() == KEY_EC.public_key().public_numbers()
+    assert jwks._thread is None
+
+def test_jwks_config(restore_config,tmpdir):
+    with pytest.raises(ValidationError):
+        load(str(tmpdir.join('jwks.json')),authjwt_jwks_refresh_interval=0)
+    with pytest.raises(ValueError,match="JWKS could not be loaded"):
+        load(str(tmpdir.join('missing.json')))
+    with pytest.raises(ValueError):
+        JWKSet.from_document({'keys': None})
+    with pytest.raises(InvalidKeyError):
+        JWKSet.from_document({'keys': [{'kty':'RSA','n':'AQAB','e':'AQAB','d':'AQAB','kid':'a'}]})
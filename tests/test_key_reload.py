@@ -0,0 +1,128 @@
+import pytest, os, time
+from fastapi_jwt_auth import AuthJWT
+from fastapi_jwt_auth.keyfiles import KeySnapshot
+from fastapi_jwt_auth.exceptions import JWTDecodeError
+from fastapi import Request
+from cryptography.hazmat.backends import default_backend
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+def read_key(name):
+    with open(os.path.join(os.path.dirname(__file__),name)) as f:
+        return f.read()
+
+def load(**settings):
+    @AuthJWT.load_config
+    def get_settings():
+        return list(settings.items())
+
+def rewrite(path, content):
+    # like the orchestrator, a new file is moved over the old one
+    tmp = str(path) + '.tmp'
+    with open(tmp,'w') as f:
+        f.write(content)
+    os.replace(tmp,str(path))
+
+def test_reload_secret_key_file(restore_config,tmpdir):
+    path = tmpdir.join('secret')
+    path.write("first-secret\n")
+    load(authjwt_secret_key_file=str(path),authjwt_key_reload_interval=60)
+    assert AuthJWT()._secret_key == "first-secret"
+
+    in_flight = AuthJWT(req=Request({'type': 'http', 'headers': []}))
+    long_lived = AuthJWT()
+    old_token = in_flight.create_access_token(subject='test')
+    assert AuthJWT._key_watcher.check() is False
+
+    rewrite(path,"second-secret")
+    assert AuthJWT._key_watcher.check() is True
+    assert AuthJWT._key_watcher.reloads == 1
+
+    # a request that started before the reload keeps its keys
+    assert in_flight.get_raw_jwt(old_token)['sub'] == 'test'
+    assert AuthJWT()._secret_key == "second-secret"
+    with pytest.raises(JWTDecodeError) as err:
+        AuthJWT().get_raw_jwt(old_token)
+    assert err.value.message == "Signature verification failed"
+    assert AuthJWT().get_raw_jwt(AuthJWT().create_access_token(subject='new'))['sub'] == 'new'
+
+    # an instance made without a request before the reload follows it, like the class
+    assert AuthJWT._secret_key == "second-secret"
+    assert long_lived._secret_key == "second-secret"
+    assert long_lived.get_raw_jwt(AuthJWT().create_access_token(subject='new'))['sub'] == 'new'
+    assert long_lived.verify_many([AuthJWT().create_access_token(subject='new')])[0]['sub'] == 'new'
+
+    with pytest.raises(AttributeError):
+        AuthJWT._key_snapshot.version = None
+
+def test_reload_key_pair_in_background(restore_config,tmpdir):
+    private_path, public_path = tmpdir.join('private.pem'), tmpdir.join('public.pem')
+    private_path.write(read_key('private_key.txt'))
+    public_path.write(read_key('public_key.txt'))
+    load(
+        authjwt_algorithm="RS256",
+        authjwt_private_key_file=str(private_path),
+        authjwt_public_key_file=str(public_path),
+        authjwt_key_reload_interval=0.01
+    )
+    snapshot = AuthJWT._key_snapshot
+    old_token = AuthJWT().create_access_token(subject='test')
+
+    key = rsa.generate_private_key(65537,2048,default_backend())
+    rewrite(private_path,key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption()
+    ).decode('utf-8'))
+    rewrite(public_path,key.public_key().public_bytes(
+        serialization.Encoding.PEM,
+        serialization.PublicFormat.SubjectPublicKeyInfo
+    ).decode('utf-8'))
+
+    deadline = time.time() + 5
+    while AuthJWT._key_snapshot.attributes['_public_key'] == snapshot.attributes['_public_key'] and time.time() < deadline:
+        time.sleep(0.01)
+
+    # the keys are parsed by the watcher, never by a request
+    assert {family for family in AuthJWT._key_snapshot.attributes['_prepared_keys']} == {('RSA','encode'),('RSA','decode')}
+    assert AuthJWT().get_raw_jwt(AuthJWT().create_access_token(subject='new'))['sub'] == 'new'
+    with pytest.raises(JWTDecodeError):
+        AuthJWT().get_raw_jwt(old_token)
+
+def test_reload_keeps_keys_that_fail_to_parse(restore_config,tmpdir):
+    path = tmpdir.join('public.pem')
+    path.write(read_key('public_key.txt'))
+    load(
+        authjwt_algorithm="RS256",
+        authjwt_private_key=read_key('private_key.txt'),
+        authjwt_public_key_file=str(path)
+    )
+    snapshot = AuthJWT._key_snapshot
+    token = AuthJWT().create_access_token(subject='test')
+
+    # a file caught halfway through a rewrite
+    rewrite(path,read_key('public_key.txt')[:100])
+    assert AuthJWT._key_watcher.check() is False
+    assert isinstance(AuthJWT._key_watcher.last_error,ValueError)
+    assert AuthJWT._key_snapshot is snapshot
+    assert AuthJWT().get_raw_jwt(token)['sub'] == 'test'
+
+    rewrite(path,read_key('public_key.txt'))
+    assert AuthJWT._key_watcher.check() is True
+    assert AuthJWT._key_watcher.last_error is None
+
+def test_key_files_config(restore_config,tmpdir):
+    path = tmpdir.join('secret')
+    path.write("secret")
+    with pytest.raises(ValueError,match="authjwt_secret_key and authjwt_secret_key_file"):
+        load(authjwt_secret_key="secret",authjwt_secret_key_file=str(path))
+    with pytest.raises(ValueError,match="could not be read"):
+        load(authjwt_secret_key_file=str(tmpdir.join('missing')))
+
+    # without a reload interval the files are read once
+    load(authjwt_secret_key_file=str(path),authjwt_key_reload_interval=None)
+    assert isinstance(AuthJWT._key_snapshot,KeySnapshot)
+    assert AuthJWT._key_watcher is None
+
+    load(authjwt_secret_key="secret")
+    assert AuthJWT._key_snapshot is None
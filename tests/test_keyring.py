@@ -0,0 +1,107 @@
+import pytest, os, pickle
+from fastapi_jwt_auth import AuthJWT
+from fastapi_jwt_auth.keyring import Keyring
+from fastapi_jwt_auth.exceptions import JWTDecodeError
+from cryptography.hazmat.backends import default_backend
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+def read_key(name):
+    with open(os.path.join(os.path.dirname(__file__),name)) as f:
+        return f.read()
+
+OTHER_KEY = rsa.generate_private_key(65537,2048,default_backend())
+OTHER_PRIVATE = OTHER_KEY.private_bytes(
+    serialization.Encoding.PEM,
+    serialization.PrivateFormat.PKCS8,
+    serialization.NoEncryption()
+).decode('utf-8')
+OTHER_PUBLIC = OTHER_KEY.public_key().public_bytes(
+    serialization.Encoding.PEM,
+    serialization.PublicFormat.SubjectPublicKeyInfo
+).decode('utf-8')
+
+def load(**settings):
+    @AuthJWT.load_config
+    def get_settings():
+        return list(settings.items())
+
+def signed_with(key_id, algorithm="HS256", **keys):
+    # a token of an instance that still has the signing key from before the rotation
+    auth = AuthJWT()
+    auth._key_id = key_id
+    for name, value in keys.items():
+        setattr(auth,name,value)
+    return auth.create_access_token(subject='test',algorithm=algorithm)
+
+def verify(token):
+    return AuthJWT().get_raw_jwt(token)['sub']
+
+@pytest.mark.parametrize("hmac_fast_path",[False,True])
+def test_keyring_symmetric_rotation(restore_config,hmac_fast_path,Authorize):
+    load(
+        authjwt_secret_key="new-secret",
+        authjwt_key_id="2024-02",
+        authjwt_verify_keys={"2024-01":"old-secret"},
+        authjwt_hmac_fast_path=hmac_fast_path
+    )
+
+    token = AuthJWT().create_access_token(subject='test')
+    assert AuthJWT().get_unverified_jwt_headers(token)['kid'] == "2024-02"
+    assert verify(token) == 'test'
+    assert verify(signed_with("2024-01",_secret_key="old-secret")) == 'test'
+
+    for token, message in [
+        (signed_with("2024-01",_secret_key="new-secret"),"Signature verification failed"),
+        (signed_with("2023-12",_secret_key="old-secret"),"Unknown key id 2023-12"),
+        (signed_with(None,_secret_key="other-secret"),"Signature verification failed")
+    ]:
+        with pytest.raises(JWTDecodeError) as err:
+            verify(token)
+        assert err.value.message == message
+
+    # tokens without kid are tried with the key that last verified one first
+    assert AuthJWT._keyring.last_kid == "2024-02"
+    assert verify(signed_with(None,_secret_key="old-secret")) == 'test'
+    assert AuthJWT._keyring.last_kid == "2024-01"
+    assert [kid for kid, _ in AuthJWT._keyring.get_fallback_keys("HS256")] == ["2024-01","2024-02"]
+    assert verify(signed_with(None,_secret_key="new-secret")) == 'test'
+    assert AuthJWT._keyring.last_kid == "2024-02"
+
+def test_keyring_asymmetric_rotation(restore_config):
+    load(
+        authjwt_algorithm="RS256",
+        authjwt_private_key=read_key('private_key.txt'),
+        authjwt_public_key=read_key('public_key.txt'),
+        authjwt_key_id="current",
+        authjwt_verify_keys={"previous":OTHER_PUBLIC,"hmac":"secret"}
+    )
+
+    assert verify(AuthJWT().create_access_token(subject='test')) == 'test'
+    assert verify(signed_with("previous","RS256",_private_key=OTHER_PRIVATE)) == 'test'
+    assert verify(signed_with(None,"RS256",_private_key=OTHER_PRIVATE)) == 'test'
+    assert AuthJWT._keyring.last_kid == "previous"
+
+    with pytest.raises(JWTDecodeError) as err:
+        verify(signed_with("hmac","RS256",_private_key=OTHER_PRIVATE))
+    assert err.value.message == "The key hmac can't be used with algorithm RS256"
+
+def test_keyring_config(restore_config):
+    with pytest.raises(ValueError,match="must not be one of"):
+        load(authjwt_secret_key="secret",authjwt_key_id="a",authjwt_verify_keys={"a":"old"})
+    with pytest.raises(ValueError,match="The key b could not be loaded"):
+        load(authjwt_secret_key="secret",authjwt_verify_keys={"b":"-----BEGIN PUBLIC KEY-----\nnope\n-----END PUBLIC KEY-----"})
+
+    # without kid of its own the signing key has none in the keyring
+    load(authjwt_secret_key="secret",authjwt_verify_keys={"old":"old-secret"})
+    token = AuthJWT().create_access_token(subject='test')
+    assert 'kid' not in AuthJWT().get_unverified_jwt_headers(token)
+    assert verify(token) == 'test'
+    assert AuthJWT._keyring.last_kid is None
+
+def test_keyring_pickle():
+    keyring = Keyring({"a":"secret","b":[read_key('public_key.txt')]},active="a")
+    keyring.last_kid = "b"
+    copy = pickle.loads(pickle.dumps(keyring))
+    assert copy.active == "a" and copy.last_kid == "b"
+    assert copy.has_key_for("RS256") and copy.has_key_for("HS512") and not copy.has_key_for("ES256")
@@ -0,0 +1,165 @@
+import pytest
+from fastapi_jwt_auth import AuthJWT
+from fastapi_jwt_auth.auth_config import _profiles
+from fastapi_jwt_auth.auth_jwt import _verify_token_in_worker
+from fastapi_jwt_auth.exceptions import AuthJWTException
+from fastapi import FastAPI, Depends, Request
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+
+def load(config, **settings):
+    @config.load_config
+    def get_settings():
+        return list(settings.items())
+
+@pytest.fixture(scope='function')
+def client(restore_config):
+    load(AuthJWT,authjwt_secret_key="default-secret")
+    load(AuthJWT.profile("tenant-a"),authjwt_secret_key="secret-a",
+        authjwt_encode_issuer="tenant-a",authjwt_decode_issuer="tenant-a")
+    load(AuthJWT.profile("tenant-b"),authjwt_secret_key="secret-b",authjwt_header_name="X-Tenant-Token")
+
+    app = FastAPI()
+
+    @app.exception_handler(AuthJWTException)
+    def authjwt_exception_handler(request: Request, exc: AuthJWTException):
+        return JSONResponse(status_code=exc.status_code,content={"detail": exc.message})
+
+    @app.get('/a')
+    def tenant_a(Authorize: AuthJWT = Depends(AuthJWT.profile("tenant-a"))):
+        Authorize.jwt_required()
+        return {'subject': Authorize.get_jwt_subject()}
+
+    @app.get('/b')
+    def tenant_b(Authorize: AuthJWT = Depends(AuthJWT.profile("tenant-b"))):
+        Authorize.jwt_required()
+        return {'subject': Authorize.get_jwt_subject()}
+
+    @app.get('/default')
+    def default(Authorize: AuthJWT = Depends()):
+        Authorize.jwt_required()
+        return {'subject': Authorize.get_jwt_subject()}
+
+    return TestClient(app)
+
+def test_profile_is_cached(restore_config):
+    profile = AuthJWT.profile("tenant-a")
+    assert profile is AuthJWT.profile("tenant-a")
+    assert issubclass(profile,AuthJWT)
+    assert profile.__name__ == "AuthJWT[tenant-a]"
+    assert profile._profile_name == "tenant-a"
+    assert AuthJWT._profile_name is None
+
+    with pytest.raises(KeyError):
+        AuthJWT.profile("tenant-c",create=False)
+    assert (AuthJWT,"tenant-c") not in _profiles
+
+def test_profiles_verify_own_tokens(client):
+    token_a = AuthJWT.profile("tenant-a")().create_access_token(subject='alice')
+    token_b = AuthJWT.profile("tenant-b")().create_access_token(subject='bob')
+    token = AuthJWT().create_access_token(subject='test')
+
+    response = client.get('/a',headers={"Authorization": "Bearer " + token_a})
+    assert response.status_code == 200
+    assert response.json() == {'subject': 'alice'}
+
+    response = client.get('/b',headers={"X-Tenant-Token": "Bearer " + token_b})
+    assert response.status_code == 200
+    assert response.json() == {'subject': 'bob'}
+
+    response = client.get('/default',headers={"Authorization": "Bearer " + token})
+    assert response.status_code == 200
+
+    for url, header, token in [
+        ('/a',"Authorization",token_b),
+        ('/b',"X-Tenant-Token",token_a),
+        ('/default',"Authorization",token_a)
+    ]:
+        response = client.get(url,headers={header: "Bearer " + token})
+        assert response.status_code == 422
+        assert response.json() == {'detail': 'Signature verification failed'}
+
+    # tenant-b reads its own header name
+    response = client.get('/b',headers={"Authorization": "Bearer " + token_b})
+    assert response.status_code == 401
+
+def test_profiles_keep_own_caches(restore_config):
+    load(AuthJWT,authjwt_secret_key="default-secret",authjwt_token_cache_enabled=True)
+    profile = AuthJWT.profile("tenant-a")
+    load(profile,authjwt_secret_key="secret-a",authjwt_token_cache_enabled=True)
+
+    token = profile().create_access_token(subject='test')
+    for _ in range(3):
+        assert profile().get_raw_jwt(token)['sub'] == 'test'
+
+    assert profile.token_cache_info().hits == 2
+    assert profile.token_cache_info().currsize == 1
+    assert AuthJWT.token_cache_info().currsize == 0
+    assert AuthJWT._compiled_config.attributes['_secret_key'] == "default-secret"
+    assert profile._compiled_config.attributes['_secret_key'] == "secret-a"
+
+def test_profile_follows_config_until_loaded(restore_config):
+    load(AuthJWT,authjwt_secret_key="default-secret",authjwt_access_token_expires=60)
+    profile = AuthJWT.profile("tenant-a")
+
+    token = profile().create_access_token(subject='test')
+    assert AuthJWT().get_raw_jwt(token)['sub'] == 'test'
+
+    AuthJWT._secret_key = "new-secret"
+    assert profile()._secret_key == "new-secret"
+
+    load(profile,authjwt_secret_key="secret-a")
+    AuthJWT._secret_key = "other-secret"
+    assert profile()._secret_key == "secret-a"
+    assert profile()._access_token_expires.seconds == 900
+
+def test_verify_many_with_profile(restore_config):
+    load(AuthJWT,authjwt_secret_key="default-secret")
+    profile = AuthJWT.profile("tenant-a")
+    load(profile,authjwt_secret_key="secret-a",authjwt_verify_max_workers=2)
+
+    Authorize = profile()
+    tokens = [Authorize.create_access_token(subject=str(i)) for i in range(4)]
+    tokens.append(AuthJWT().create_access_token(subject='default'))
+
+    results = Authorize.verify_many(tokens,executor=Authorize._get_executor("verify",2))
+    assert [raw_token['sub'] for raw_token in results[:4]] == ['0','1','2','3']
+    assert results[4].message == "Signature verification failed"
+
+def test_verify_many_never_registers_profile(restore_config):
+    class MyAuth(AuthJWT):
+        pass
+
+    load(AuthJWT,authjwt_secret_key="default-secret")
+    profile = MyAuth.profile("tenant-a")
+    load(profile,authjwt_secret_key="secret-a",authjwt_verify_max_workers=2)
+
+    Authorize = profile()
+    token = Authorize.create_access_token(subject='test')
+    assert Authorize.verify_many([token])[0]['sub'] == 'test'
+    assert Authorize.verify_many([token],executor=Authorize._get_executor("verify",2))[0]['sub'] == 'test'
+    assert list(_profiles) == [(MyAuth,"tenant-a")]
+
+    # in another process the profile is looked up on the class it was made from
+    config = Authorize._get_worker_config()
+    assert config["_profile_base"] is MyAuth
+    assert _verify_token_in_worker(config,token)[0]['sub'] == 'test'
+    _profiles.clear()
+    assert _verify_token_in_worker(config,token)[0]['sub'] == 'test'
+    assert _profiles == {}
+
+def test_profiles_keep_own_thread_pools(restore_config):
+    load(AuthJWT,authjwt_secret_key="default-secret")
+    load(AuthJWT.profile("tenant-a"),authjwt_secret_key="secret-a",authjwt_async_max_workers=2)
+    load(AuthJWT.profile("tenant-b"),authjwt_secret_key="secret-b",authjwt_async_max_workers=3)
+
+    executors = []
+    for _ in range(3):
+        for name in ["tenant-a","tenant-b"]:
+            Authorize = AuthJWT.profile(name)()
+            executors.append(Authorize._get_executor("async",Authorize._async_max_workers))
+
+    # every profile gets its pool back, none is shut down and made again
+    assert executors[:2] * 3 == executors
+    assert [executor._max_workers for executor in executors[:2]] == [2,3]
+    assert executors[0].submit(lambda: 'ok').result() == 'ok'
@@ -0,0 +1,179 @@
+import pytest, os, time, asyncio, threading
+from fastapi_jwt_auth import AuthJWT
+from fastapi_jwt_auth.exceptions import AuthJWTException, JWTDecodeError, RevokedTokenError
+from fastapi_jwt_auth.singleflight import AsyncSingleFlight, SingleFlight
+from .event_loop import run
+
+def read_key(name):
+    with open(os.path.join(os.path.dirname(__file__),name)) as f:
+        return f.read()
+
+@pytest.fixture(scope='function')
+def singleflight_config():
+    names = ['_secret_key','_public_key','_private_key','_algorithm','_prepared_keys','_decode_algorithms','_decode_audience']
+    saved = {name: getattr(AuthJWT,name) for name in names}
+    AuthJWT._secret_key = "secret"
+    AuthJWT._singleflight_enabled = True
+    AuthJWT._denylist_enabled = True
+
+    yield
+
+    for name, value in saved.items():
+        setattr(AuthJWT,name,value)
+    AuthJWT._singleflight_enabled = False
+    AuthJWT._denylist_enabled = False
+    AuthJWT._token_in_denylist_callback = None
+    AuthJWT._token_in_denylist_callback_is_async = False
+
+@pytest.fixture(scope='function')
+def rsa_keys():
+    AuthJWT._algorithm = "RS256"
+    AuthJWT._public_key = read_key('public_key.txt')
+    AuthJWT._private_key = read_key('private_key.txt')
+    AuthJWT._prepared_keys = {}
+
+@pytest.fixture(scope='function')
+def decode_delay():
+    # callers overlap while the first one decodes
+    return 0.2
+
+def run_threads(count, target):
+    results = [None] * count
+
+    def run(index):
+        try:
+            target()
+            results[index] = 'ok'
+        except AuthJWTException as err:
+            results[index] = err.message
+
+    threads = [threading.Thread(target=run,args=(index,)) for index in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+def test_threads_share_one_verification(singleflight_config,decode_calls,Authorize):
+    checks = []
+
+    @AuthJWT.token_in_denylist_loader
+    def check_if_token_in_denylist(decrypted_token):
+        checks.append(decrypted_token['jti'])
+        time.sleep(0.2)
+        return False
+
+    token = Authorize.create_access_token(subject='test')
+    results = run_threads(8,lambda: AuthJWT().jwt_required("websocket",token=token))
+
+    assert results == ['ok'] * 8
+    assert len(decode_calls) == 1
+    assert len(checks) == 1
+    # nothing is kept once the calls have finished
+    assert len(AuthJWT._singleflight) == 0
+
+    # every caller has its own claims
+    Authorize._verified_claims = None
+    raw_token = Authorize.get_raw_jwt(token)
+    raw_token['sub'] = 'changed'
+    assert AuthJWT().get_raw_jwt(token)['sub'] == 'test'
+
+def test_threads_share_with_list_options(singleflight_config,decode_calls,Authorize):
+    # lists of the config are part of the key of the call
+    AuthJWT._decode_algorithms = ["HS256"]
+    AuthJWT._decode_audience = ["foo","bar"]
+    AuthJWT.token_in_denylist_loader(lambda decrypted_token: False)
+
+    token = Authorize.create_access_token(subject='test',audience="foo")
+    results = run_threads(4,lambda: AuthJWT().jwt_required("websocket",token=token))
+
+    assert results == ['ok'] * 4
+    assert len(decode_calls) == 1
+    assert AuthJWT().get_raw_jwt(token)['sub'] == 'test'
+
+def test_threads_share_errors(singleflight_config,decode_calls,Authorize):
+    AuthJWT.token_in_denylist_loader(lambda decrypted_token: True)
+
+    token = Authorize.create_access_token(subject='test')
+    assert run_threads(4,lambda: AuthJWT().jwt_required("websocket",token=token)) == ['Token has been revoked'] * 4
+    decode_calls.clear()
+
+    invalid = token[:-4] + ('aaaa' if not token.endswith('aaaa') else 'bbbb')
+    assert run_threads(4,lambda: AuthJWT().jwt_required("websocket",token=invalid)) == ['Signature verification failed'] * 4
+    assert len(decode_calls) == 1
+
+def test_async_share_one_verification(singleflight_config,rsa_keys,decode_calls,Authorize):
+    checks = []
+
+    @AuthJWT.token_in_denylist_loader
+    async def check_if_token_in_denylist(decrypted_token):
+        checks.append(decrypted_token['jti'])
+        await asyncio.sleep(0.1)
+        return False
+
+    token = Authorize.create_access_token(subject='test')
+
+    async def verify():
+        Authorize = AuthJWT()
+        await Authorize.jwt_required_async("websocket",token=token)
+        return Authorize.get_raw_jwt(token)['sub']
+
+    async def check():
+        return await asyncio.gather(*[verify() for _ in range(8)])
+
+    assert run(check()) == ['test'] * 8
+    # one thread of the pool verified the token for every request
+    assert len(decode_calls) == 1 and decode_calls[0].startswith("authjwt-async")
+    assert len(checks) == 1
+    assert len(AuthJWT._async_singleflight) == 0
+
+def test_revocation_during_check(singleflight_config,Authorize):
+    revoked = set()
+    started = threading.Event()
+
+    @AuthJWT.token_in_denylist_loader
+    def check_if_token_in_denylist(decrypted_token):
+        result = decrypted_token['jti'] in revoked
+        started.set()
+        time.sleep(0.2)
+        return result
+
+    token = Authorize.create_access_token(subject='test')
+    first = threading.Thread(target=lambda: AuthJWT().jwt_required("websocket",token=token))
+    first.start()
+    started.wait()
+
+    # a check that starts after the revocation doesn't join the one from before
+    revoked.add(Authorize.get_jti(token))
+    AuthJWT._denylist_cache.invalidate(Authorize.get_jti(token))
+    with pytest.raises(RevokedTokenError):
+        AuthJWT().jwt_required("websocket",token=token)
+    first.join()
+
+def test_singleflight():
+    flight = SingleFlight()
+    assert flight.do('key',lambda value: value * 2,21) == 42
+    def invalid():
+        raise JWTDecodeError(status_code=422,message="invalid")
+
+    with pytest.raises(JWTDecodeError):
+        flight.do('key',invalid)
+    assert len(flight) == 0
+
+    async def check():
+        flight = AsyncSingleFlight()
+        calls = []
+
+        async def work():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return 'done'
+
+        waiter = asyncio.ensure_future(flight.do('key',work))
+        await asyncio.sleep(0)
+        results = asyncio.gather(*[flight.do('key',work) for _ in range(3)])
+        # a cancelled caller doesn't cancel the call for the others
+        waiter.cancel()
+        return await results, len(calls), len(flight)
+
+    assert run(check()) == (['done'] * 3, 1, 0)
@@ -0,0 +1,227 @@
+import pytest, jwt, time
+from fastapi_jwt_auth import AuthJWT
+from fastapi_jwt_auth.exceptions import AuthJWTException
+from fastapi import FastAPI, Depends, Request
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+from pydantic import BaseSettings, ValidationError
+
+# setting for denylist token
+denylist = set()
+
+@pytest.fixture(scope='function')
+def client():
+    app = FastAPI()
+
+    @app.exception_handler(AuthJWTException)
+    def authjwt_exception_handler(request: Request, exc: AuthJWTException):
+        return JSONResponse(
+            status_code=exc.status_code,
+            content={"detail": exc.message}
+        )
+
+    @app.get('/protected')
+    def protected(Authorize: AuthJWT = Depends()):
+        Authorize.jwt_required()
+        return Authorize.get_jwt_subject()
+
+    client = TestClient(app)
+    return client
+
+@pytest.fixture(scope='function')
+def token_cache():
+    class Settings(BaseSettings):
+        authjwt_secret_key: str = "secret"
+        authjwt_token_cache_enabled: bool = True
+        authjwt_token_cache_size: int = 2
+
+    @AuthJWT.load_config
+    def get_settings():
+        return Settings()
+
+    yield AuthJWT._token_cache
+
+    AuthJWT._token_cache_enabled = False
+
+def test_token_cache_disabled_by_default(client,decode_calls,Authorize):
+    @AuthJWT.load_config
+    def get_settings():
+        return [("authjwt_secret_key","secret")]
+
+    token = Authorize.create_access_token(subject='test')
+    for _ in range(3):
+        response = client.get('/protected',headers={"Authorization":f"Bearer {token}"})
+        assert response.status_code == 200
+
+    assert len(decode_calls) == 3
+    assert AuthJWT.token_cache_info().currsize == 0
+
+def test_token_cache_hit_and_miss(client,decode_calls,token_cache,Authorize):
+    token = Authorize.create_access_token(subject='test')
+    for _ in range(3):
+        response = client.get('/protected',headers={"Authorization":f"Bearer {token}"})
+        assert response.status_code == 200
+        assert response.json() == 'test'
+
+    assert len(decode_calls) == 1
+    info = AuthJWT.token_cache_info()
+    assert info.hits == 2
+    assert info.misses == 1
+    assert info.currsize == 1
+
+    # least recently used token is evicted
+    for subject in ['a','b']:
+        other = Authorize.create_access_token(subject=subject)
+        client.get('/protected',headers={"Authorization":f"Bearer {other}"})
+    assert AuthJWT.token_cache_info().currsize == 2
+
+    client.get('/protected',headers={"Authorization":f"Bearer {token}"})
+    assert len(decode_calls) == 4
+
+def test_token_cache_never_outlive_exp(client,decode_calls,token_cache,Authorize):
+    token = Authorize.create_access_token(subject='test',expires_time=1)
+    response = client.get('/protected',headers={"Authorization":f"Bearer {token}"})
+    assert response.status_code == 200
+
+    time.sleep(2)
+    response = client.get('/protected',headers={"Authorization":f"Bearer {token}"})
+    assert response.status_code == 422
+    assert response.json() == {'detail': 'Signature has expired'}
+    assert len(decode_calls) == 2
+
+    # with leeway the token isn't cached for longer than exp - leeway
+    AuthJWT._decode_leeway = 10
+    token = Authorize.create_access_token(subject='test',expires_time=5)
+    for _ in range(2):
+        response = client.get('/protected',headers={"Authorization":f"Bearer {token}"})
+        assert response.status_code == 200
+    assert len(decode_calls) == 4
+    AuthJWT._decode_leeway = 0
+
+def test_token_cache_invalidated_by_load_config(client,decode_calls,token_cache,Authorize):
+    token = Authorize.create_access_token(subject='test')
+    client.get('/protected',headers={"Authorization":f"Bearer {token}"})
+    assert AuthJWT.token_cache_info().currsize == 1
+
+    class Settings(BaseSettings):
+        authjwt_secret_key: str = "new-secret"
+        authjwt_token_cache_enabled: bool = True
+
+    @AuthJWT.load_config
+    def get_settings():
+        return Settings()
+
+    assert AuthJWT.token_cache_info().currsize == 0
+    response = client.get('/protected',headers={"Authorization":f"Bearer {token}"})
+    assert response.status_code == 422
+    assert response.json() == {'detail': 'Signature verification failed'}
+
+    # changing key directly also skip the cached entries
+    token = Authorize.create_access_token(subject='test')
+    client.get('/protected',headers={"Authorization":f"Bearer {token}"})
+    AuthJWT._secret_key = "secret"
+    response = client.get('/protected',headers={"Authorization":f"Bearer {token}"})
+    assert response.status_code == 422
+    assert response.json() == {'detail': 'Signature verification failed'}
+
+def test_token_cache_denylist_checked_on_hit(client,token_cache,Authorize):
+    AuthJWT._denylist_enabled = True
+
+    @AuthJWT.token_in_denylist_loader
+    def check_if_token_in_denylist(decrypted_token):
+        return decrypted_token['jti'] in denylist
+
+    token = Authorize.create_access_token(subject='test')
+    response = client.get('/protected',headers={"Authorization":f"Bearer {token}"})
+    assert response.status_code == 200
+
+    denylist.add(Authorize.get_jti(token))
+    response = client.get('/protected',headers={"Authorization":f"Bearer {token}"})
+    assert response.status_code == 401
+    assert response.json() == {'detail': 'Token has been revoked'}
+    assert AuthJWT.token_cache_info().hits >= 1
+
+    AuthJWT._denylist_enabled = False
+
+def test_token_cache_issuer(client,token_cache,Authorize):
+    token = Authorize.create_access_token(subject='test')
+    client.get('/protected',headers={"Authorization":f"Bearer {token}"})
+
+    AuthJWT._decode_issuer = "urn:foo"
+    response = client.get('/protected',headers={"Authorization":f"Bearer {token}"})
+    assert response.status_code == 422
+    assert response.json() == {'detail': 'Token is missing the "iss" claim'}
+    AuthJWT._decode_issuer = None
+
+def test_token_cache_entries_not_shared(token_cache,Authorize):
+    token = jwt.encode({'sub':'test','type':'access','roles':['a']},'secret',algorithm='HS256').decode('utf-8')
+    AuthJWT().get_raw_jwt(token)['sub'] = 'changed'
+    assert AuthJWT().get_raw_jwt(token)['sub'] == 'test'
+
+def test_token_cache_size_config():
+    with pytest.raises(ValidationError,match=r"authjwt_token_cache_size"):
+        @AuthJWT.load_config
+        def get_invalid_size():
+            return [("authjwt_token_cache_size",0)]
+
+@pytest.fixture(scope='function')
+def rejected_token_cache():
+    class Settings(BaseSettings):
+        authjwt_secret_key: str = "secret"
+        authjwt_rejected_token_cache_enabled: bool = True
+        authjwt_rejected_token_cache_ttl: int = 1
+
+    @AuthJWT.load_config
+    def get_settings():
+        return Settings()
+
+    yield AuthJWT._rejected_token_cache
+
+    AuthJWT._rejected_token_cache_enabled = False
+
+@pytest.mark.parametrize("token,message",[
+    ("test","Not enough segments"),
+    (jwt.encode({'sub':'test','type':'access'},'other',algorithm='HS256').decode('utf-8'),"Signature verification failed"),
+    (jwt.encode({'sub':'test','type':'access','exp':1},'secret',algorithm='HS256').decode('utf-8'),"Signature has expired"),
+])
+def test_rejected_token_cache_replay(client,decode_calls,rejected_token_cache,token,message):
+    for _ in range(3):
+        response = client.get('/protected',headers={"Authorization":f"Bearer {token}"})
+        assert response.status_code == 422
+        assert response.json() == {'detail': message}
+
+    assert len(decode_calls) == 1
+    info = AuthJWT.rejected_token_cache_info()
+    assert info.hits == 2
+    assert info.currsize == 1
+
+    # entries live for authjwt_rejected_token_cache_ttl seconds
+    time.sleep(1.1)
+    response = client.get('/protected',headers={"Authorization":f"Bearer {token}"})
+    assert response.json() == {'detail': message}
+    assert len(decode_calls) == 2
+
+def test_rejected_token_cache_skip_not_yet_valid(client,decode_calls,rejected_token_cache):
+    token = jwt.encode({'sub':'test','type':'access','nbf':int(time.time()) + 60},'secret',algorithm='HS256').decode('utf-8')
+    for _ in range(2):
+        response = client.get('/protected',headers={"Authorization":f"Bearer {token}"})
+        assert response.json() == {'detail': 'The token is not yet valid (nbf)'}
+
+    assert len(decode_calls) == 2
+    assert AuthJWT.rejected_token_cache_info().currsize == 0
+
+def test_rejected_token_cache_follow_config(client,decode_calls,rejected_token_cache,Authorize):
+    token = jwt.encode({'sub':'test','type':'access'},'new-secret',algorithm='HS256').decode('utf-8')
+    response = client.get('/protected',headers={"Authorization":f"Bearer {token}"})
+    assert response.status_code == 422
+
+    AuthJWT._secret_key = "new-secret"
+    response = client.get('/protected',headers={"Authorization":f"Bearer {token}"})
+    assert response.status_code == 200
+
+    # rejection with an issuer doesn't apply without it
+    AuthJWT._decode_issuer = "urn:foo"
+    response = client.get('/protected',headers={"Authorization":f"Bearer {token}"})
+    assert response.json() == {'detail': 'Token is missing the "iss" claim'}
+    AuthJWT._decode_issuer = None
+    assert Authorize.get_raw_jwt(token)['sub'] == 'test'
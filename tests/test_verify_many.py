@@ -0,0 +1,154 @@
+import pytest, jwt, os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from fastapi_jwt_auth import AuthJWT
+from fastapi_jwt_auth.exceptions import (
+    JWTDecodeError,
+    InvalidHeaderError,
+    RevokedTokenError,
+    AccessTokenRequired,
+    RefreshTokenRequired,
+    FreshTokenRequired
+)
+from pydantic import BaseSettings, ValidationError
+
+# setting for denylist token
+denylist = set()
+
+def read_key(name):
+    with open(os.path.join(os.path.dirname(__file__),name)) as f:
+        return f.read()
+
+@pytest.fixture(scope='function')
+def rsa_config():
+    class Settings(BaseSettings):
+        authjwt_algorithm: str = "RS256"
+        authjwt_public_key: str = read_key('public_key.txt')
+        authjwt_private_key: str = read_key('private_key.txt')
+        authjwt_verify_max_workers: int = 2
+
+    @AuthJWT.load_config
+    def get_settings():
+        return Settings()
+
+    yield
+
+    AuthJWT._verify_max_workers = None
+
+def test_verify_many_results(rsa_config,Authorize):
+    access_token = Authorize.create_access_token(subject='test',fresh=True)
+    refresh_token = Authorize.create_refresh_token(subject='test')
+    expired_token = Authorize.create_access_token(subject='test',expires_time=-10)
+
+    results = Authorize.verify_many([access_token,"test",refresh_token,expired_token,access_token[:-4]])
+    assert len(results) == 5
+    assert results[0] == Authorize.get_raw_jwt(access_token)
+
+    for result, error, message in [
+        (results[1],InvalidHeaderError,"Not enough segments"),
+        (results[2],AccessTokenRequired,"Only access tokens are allowed"),
+        (results[3],JWTDecodeError,"Signature has expired"),
+        (results[4],JWTDecodeError,"Signature verification failed"),
+    ]:
+        assert isinstance(result,error)
+        assert result.message == message
+        assert result.status_code == 422
+
+    # verified on the thread pool of authjwt_verify_max_workers threads
+    assert AuthJWT._executors[('verify',2)]._max_workers == 2
+
+def test_verify_many_token_type_and_fresh(rsa_config,Authorize):
+    access_token = Authorize.create_access_token(subject='test')
+    refresh_token = Authorize.create_refresh_token(subject='test')
+
+    results = Authorize.verify_many([access_token,refresh_token],type_token='refresh')
+    assert isinstance(results[0],RefreshTokenRequired)
+    assert results[1]['type'] == 'refresh'
+
+    results = Authorize.verify_many([access_token],fresh=True)
+    assert isinstance(results[0],FreshTokenRequired)
+    assert results[0].status_code == 401
+
+    with pytest.raises(ValueError,match=r"type_token"):
+        Authorize.verify_many([access_token],type_token='id')
+
+def test_verify_many_denylist(rsa_config,Authorize):
+    AuthJWT._denylist_enabled = True
+
+    @AuthJWT.token_in_denylist_loader
+    def check_if_token_in_denylist(decrypted_token):
+        return decrypted_token['jti'] in denylist
+
+    tokens = [Authorize.create_access_token(subject='test') for _ in range(3)]
+    denylist.add(Authorize.get_jti(tokens[1]))
+
+    results = Authorize.verify_many(tokens)
+    assert results[0]['sub'] == 'test'
+    assert isinstance(results[1],RevokedTokenError)
+    assert results[1].message == "Token has been revoked"
+    assert results[2]['sub'] == 'test'
+
+    AuthJWT._denylist_enabled = False
+
+def test_verify_many_async_denylist(rsa_config,Authorize):
+    AuthJWT._denylist_enabled = True
+
+    @AuthJWT.token_in_denylist_loader
+    async def check_if_token_in_denylist(decrypted_token):
+        return decrypted_token['jti'] in denylist
+
+    tokens = [Authorize.create_access_token(subject='test') for _ in range(2)]
+    with pytest.raises(RuntimeError,match="verify_many can't call an async token_in_denylist_callback"):
+        Authorize.verify_many(tokens)
+
+    # without the denylist the callback is never called
+    AuthJWT._denylist_enabled = False
+    assert [raw_token['sub'] for raw_token in Authorize.verify_many(tokens)] == ['test','test']
+    AuthJWT._token_in_denylist_callback = None
+    AuthJWT._token_in_denylist_callback_is_async = False
+
+def test_verify_many_issuer(rsa_config,Authorize):
+    access_token = Authorize.create_access_token(subject='test')
+    refresh_token = Authorize.create_refresh_token(subject='test')
+
+    AuthJWT._decode_issuer = "urn:foo"
+    results = Authorize.verify_many([access_token])
+    assert results[0].message == 'Token is missing the "iss" claim'
+
+    # only access token have issuer claim
+    results = Authorize.verify_many([refresh_token],type_token='refresh')
+    assert results[0]['type'] == 'refresh'
+    AuthJWT._decode_issuer = None
+
+def test_verify_many_process_pool(rsa_config,Authorize):
+    tokens = [Authorize.create_access_token(subject=str(i)) for i in range(8)]
+    tokens.append(jwt.encode({'sub':'test','type':'access'},'secret',algorithm='HS256').decode('utf-8'))
+
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        results = Authorize.verify_many(tokens,executor=executor)
+
+    assert [result['sub'] for result in results[:-1]] == [str(i) for i in range(8)]
+    assert isinstance(results[-1],JWTDecodeError)
+    assert results[-1].message == 'The specified alg value is not allowed'
+
+def test_verify_many_symmetric_inline(monkeypatch,Authorize):
+    @AuthJWT.load_config
+    def get_settings():
+        return [("authjwt_secret_key","secret")]
+
+    def no_executor(self,name,max_workers):
+        raise AssertionError("HS tokens must be verified inline")
+
+    monkeypatch.setattr(AuthJWT,'_get_executor',no_executor)
+    tokens = [Authorize.create_access_token(subject='test') for _ in range(3)]
+    assert [result['sub'] for result in Authorize.verify_many(iter(tokens))] == ['test'] * 3
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        assert [result['sub'] for result in Authorize.verify_many(tokens,executor=executor)] == ['test'] * 3
+
+    assert Authorize.verify_many([]) == []
+
+def test_verify_max_workers_config():
+    with pytest.raises(ValidationError,match=r"authjwt_verify_max_workers"):
+        @AuthJWT.load_config
+        def get_invalid_workers():
+            return [("authjwt_verify_max_workers",0)]